@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+"""
+Bancs d'essai GARDIA-M
+Mesure hors ligne les performances du pipeline de messages et du serveur web, sans radio.
+
+Usage:
+    python3 benchmark.py compression [--count N] [--cpu-factor F] [--train]
+    python3 benchmark.py budget [--count N] [--limit OCTETS]
+    python3 benchmark.py static [--views N]
+    python3 benchmark.py gzip [--cpu-factor F]
+    python3 benchmark.py storage [--count N]
+"""
+
+import argparse
+import io
+import json
+import logging
+import os
+import random
+import re
+import tempfile
+import time
+import zlib
+from collections import Counter
+
+import yaml
+
+import emergency_server as es
+
+# === CORPUS D'ALERTES RÉALISTES ===
+
+PRENOMS = ['Jean', 'Marie', 'Pierre', 'Nathalie', 'Kévin', 'Léa', 'François', 'Hélène', 'Mohamed',
+           'Chloé', 'Stéphane', 'Agnès', 'Thierry', 'Inès', 'Jérôme', 'Éloïse']
+NOMS = ['Dupont', 'Martin', 'Lefebvre', 'Moreau', 'Leroy', 'Durand', 'Petit', 'Nguyen', 'Lemaître',
+        'Fournier', 'Girard', 'Benali', 'Lecœur', 'Hébert', 'Marchand', 'Vasseur']
+VOIES = ['rue', 'rue', 'rue', 'avenue', 'boulevard', 'place', 'chemin', 'impasse', 'allée', 'route',
+         'quai', 'résidence']
+NOMS_VOIES = ['de la Paix', 'du Général de Gaulle', 'Jean Jaurès', 'Victor Hugo', 'de la Gare',
+              'des Écoles', 'du Moulin', 'de l\'Église', 'Pasteur', 'de la République', 'des Tilleuls',
+              'du Château', 'Saint-Pierre', 'de la Libération', 'des Prés', 'Gambetta']
+COMMUNES = [('14000', 'Caen'), ('76000', 'Rouen'), ('76600', 'Le Havre'), ('76200', 'Dieppe'),
+            ('27000', 'Évreux'), ('50100', 'Cherbourg-en-Cotentin'), ('61000', 'Alençon'),
+            ('14400', 'Bayeux'), ('14100', 'Lisieux'), ('76400', 'Fécamp'), ('76190', 'Yvetot'),
+            ('14760', 'Bretteville-sur-Odon')]
+COMPLEMENTS = ['', '', '', 'bâtiment B, ', 'escalier 2, 3e étage, ', 'appartement 12, ',
+               'au fond de la cour, ', 'Résidence les Tilleuls, ', 'Zone Artisanale des Forges, ',
+               'Lieu-dit La Croix, ']
+DETAILS = ['', '', 'Deux victimes, une personne âgée bloquée au 2e étage',
+           'Feu de cheminée, fumée noire visible depuis la rue',
+           'Accident de la route, voiture dans le fossé, conducteur inconscient',
+           'Malaise, homme de 70 ans, respire difficilement',
+           'Chute dans l\'escalier, douleur à la jambe, ne peut pas se lever',
+           'Feu de végétation qui se propage vers les maisons, vent fort',
+           'Odeur de gaz dans l\'immeuble, habitants évacués',
+           'Enfant de 4 ans, forte fièvre et convulsions, accès par le portail côté parking']
+TYPES = ['Incendie', 'Secours à Personnes', 'Autre']
+
+def generate_corpus(count, seed=42):
+    """Génère un corpus déterministe d'alertes (nom, téléphone, adresse, type, détails)"""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(count):
+        cp, commune = rng.choice(COMMUNES)
+        adresse = (f"{rng.choice(COMPLEMENTS)}{rng.randint(1, 180)} {rng.choice(VOIES)} "
+                   f"{rng.choice(NOMS_VOIES)}, {cp} {commune}")
+        telephone = '0' + str(rng.choice([6, 7, 2])) + ''.join(
+            f".{rng.randint(0, 99):02d}" for _ in range(4))
+        corpus.append((f"{rng.choice(PRENOMS)} {rng.choice(NOMS)}", telephone, adresse,
+                       rng.choice(TYPES), rng.choice(DETAILS)))
+    return corpus
+
+# === DICTIONNAIRE DE COMPRESSION ===
+
+def train_dictionary(corpus, max_size=1350):
+    """Construit un dictionnaire deflate à partir des n-grammes de mots les plus rentables du corpus"""
+    counts = Counter()
+    for nom, _, adresse, type_sinistre, details in corpus:
+        for text in (nom, adresse, type_sinistre, details):
+            words = text.split()
+            for n in (1, 2, 3):
+                for i in range(len(words) - n + 1):
+                    counts[' '.join(words[i:i + n])] += 1
+
+    # Gain estimé: fréquence x octets économisés par référence (une référence coûte ~3 octets)
+    scored = sorted(((freq * (len(gram.encode('utf-8')) - 3), gram) for gram, freq in counts.items()
+                     if len(gram) > 3 and freq > 1), reverse=True)
+    chosen = []
+    size = 0
+    for _, gram in scored:
+        if any(gram in other for other in chosen):
+            continue
+        if size + len(gram.encode('utf-8')) + 1 > max_size:
+            break
+        chosen.append(gram)
+        size += len(gram.encode('utf-8')) + 1
+
+    # Les chaînes les plus rentables en fin de dictionnaire (distances de référence les plus courtes)
+    return ' '.join(reversed(chosen))
+
+# === MESURES ===
+
+def time_per_call(func, items, repeat=3):
+    """Temps CPU moyen par appel (microsecondes), meilleur de plusieurs passes"""
+    best = None
+    for _ in range(repeat):
+        start = time.process_time()
+        for item in items:
+            func(item)
+        elapsed = time.process_time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(items) * 1e6
+
+def json_message(alert, type_code):
+    """Message JSON compact tel que produit par format_emergency_message (sans troncature)"""
+    nom, telephone, adresse, _, details = alert
+    data = {"type": type_code, "nom": nom, "tel": telephone, "adresse": adresse}
+    if details:
+        data["details"] = details
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def bench_compression(args):
+    """Taux de compression, fréquence de troncature et coût CPU du pipeline binaire"""
+    corpus = generate_corpus(args.count)
+
+    if args.train:
+        # Corpus d'entraînement distinct du corpus de mesure
+        print(train_dictionary(generate_corpus(2000, seed=7)))
+        return
+
+    codes = {'Incendie': 1, 'Secours à Personnes': 2, 'Autre': 3}
+    limit = args.limit
+
+    def encode(alert, compress):
+        nom, telephone, adresse, type_sinistre, details = alert
+        return es.encode_binary_message(codes[type_sinistre], nom, telephone, adresse, details or None, compress)
+
+    def deflate_without_dictionary(alert):
+        body = encode(alert, False)
+        compressor = zlib.compressobj(9, zlib.DEFLATED, -15)
+        return compressor.compress(body) + compressor.flush()
+
+    variants = [
+        ('JSON (format actuel)', lambda alert: json_message(alert, codes[alert[3]])),
+        ('Binaire', lambda alert: encode(alert, False)),
+        ('Binaire + deflate sans dictionnaire', deflate_without_dictionary),
+        ('Binaire + dictionnaire partagé', lambda alert: encode(alert, True)),
+    ]
+
+    reference = sum(len(json_message(alert, codes[alert[3]])) for alert in corpus)
+    print(f"Corpus: {len(corpus)} alertes, limite {limit} octets, facteur CPU routeur x{args.cpu_factor}")
+    print(f"{'Variante':<38} {'Octets moy.':>11} {'Ratio':>7} {'> limite':>9} {'µs/msg':>8} {'µs routeur':>11}")
+    for name, func in variants:
+        sizes = [len(func(alert)) for alert in corpus]
+        over = sum(1 for size in sizes if size > limit)
+        cost = time_per_call(func, corpus)
+        print(f"{name:<38} {sum(sizes) / len(sizes):>11.1f} {sum(sizes) / reference:>7.2f} "
+              f"{over / len(corpus):>8.1%} {cost:>8.1f} {cost * args.cpu_factor:>11.0f}")
+
+    frames = [encode(alert, True) for alert in corpus]
+    cost = time_per_call(es.decode_binary_message, frames)
+    print(f"{'Décodage (binaire + dictionnaire)':<38} {'':>11} {'':>7} {'':>9} {cost:>8.1f} "
+          f"{cost * args.cpu_factor:>11.0f}")
+
+# === RÉPARTITION DU BUDGET D'OCTETS ===
+
+def legacy_format_message(nom_prenom, telephone, adresse, type_code, details, max_length):
+    """Cascade de troncature historique de format_emergency_message (journalisation retirée)"""
+    message_data = {"type": type_code, "nom": nom_prenom, "tel": telephone, "adresse": adresse}
+    if details and details.strip():
+        message_data["details"] = details.strip()
+    message = json.dumps(message_data, ensure_ascii=False, separators=(',', ':'))
+
+    if len(message) > max_length:
+        if details and len(details) > 30:
+            message_data["details"] = details[:27] + "..."
+            message = json.dumps(message_data, ensure_ascii=False, separators=(',', ':'))
+        if len(message) > max_length and len(nom_prenom) > 20:
+            message_data["nom"] = nom_prenom[:17] + "..."
+            message = json.dumps(message_data, ensure_ascii=False, separators=(',', ':'))
+        if len(message) > max_length and len(nom_prenom) > 10:
+            message_data["nom"] = nom_prenom[:7] + "..."
+            message = json.dumps(message_data, ensure_ascii=False, separators=(',', ':'))
+        if len(message) > max_length and "details" in message_data:
+            del message_data["details"]
+            message = json.dumps(message_data, ensure_ascii=False, separators=(',', ':'))
+        if len(message) > max_length:
+            message_data["nom"] = nom_prenom[:5] + "..." if len(nom_prenom) > 5 else nom_prenom
+            message = json.dumps(message_data, ensure_ascii=False, separators=(',', ':'))
+        if len(message) > max_length:
+            temp_data = {"type": type_code, "nom": message_data["nom"], "tel": telephone, "adresse": ""}
+            message_base = json.dumps(temp_data, ensure_ascii=False, separators=(',', ':'))
+            espace_disponible = max_length - len(message_base) + 2
+            if espace_disponible > 10:
+                message_data["adresse"] = adresse[:espace_disponible - 3] + "..."
+            else:
+                message_data["adresse"] = adresse[:35] + "..." if len(adresse) > 35 else adresse
+            message = json.dumps(message_data, ensure_ascii=False, separators=(',', ':'))
+        if len(message) > max_length:
+            message = message[:max_length - 3] + "..."
+    return message
+
+def worst_case_corpus(count, seed=11):
+    """Alertes pathologiques: très longs champs accentués, guillemets, emojis et retours à la ligne"""
+    rng = random.Random(seed)
+    alphabet = 'aeiouéèàçêôÉÀ "\\\n,.-0123456789😀'
+    def text(length):
+        return ''.join(rng.choice(alphabet) for _ in range(length))
+    return [(text(rng.randint(20, 80)), '06.12.34.56.78', text(rng.randint(150, 400)),
+             rng.choice(TYPES), text(rng.randint(0, 300))) for _ in range(count)]
+
+def bench_budget(args):
+    """Compare la cascade historique et la répartition en une passe (temps, validité, octets utiles)"""
+    # Application minimale: seule la configuration est nécessaire à format_emergency_message
+    logging.disable(logging.CRITICAL)
+    es.logger = logging.getLogger('benchmark')
+    app = es.EmergencyApp.__new__(es.EmergencyApp)
+    app.config = es.ConfigManager.__new__(es.ConfigManager)
+    app.config.snapshot = es.ConfigSnapshot(app.config.merge_config(es.DEFAULT_CONFIG, {
+        'meshtastic': {'max_message_length': args.limit, 'wire_format': 'json', 'oversize_mode': 'truncate'}}))
+    codes = app.config.get('alert_types')
+
+    def legacy(alert):
+        nom, telephone, adresse, type_sinistre, details = alert
+        return legacy_format_message(nom, telephone, adresse, codes[type_sinistre], details, args.limit)
+
+    def solver(alert):
+        nom, telephone, adresse, type_sinistre, details = alert
+        return app.format_emergency_message(nom, telephone, adresse, type_sinistre, details)[0]
+
+    corpora = [('réaliste', generate_corpus(args.count)),
+               ('réaliste, champs longs', [(nom, tel, f"{adresse}, {adresse}", type_sinistre, f"{details} {details}")
+                                           for nom, tel, adresse, type_sinistre, details in generate_corpus(args.count)]),
+               ('pire cas', worst_case_corpus(args.count))]
+
+    print(f"Limite: {args.limit} octets UTF-8")
+    print(f"{'Corpus':<24} {'Méthode':<10} {'µs/msg':>8} {'JSON valide':>12} {'<= limite':>10} {'Adresse gardée':>15}")
+    for corpus_name, corpus in corpora:
+        for method_name, func in (('cascade', legacy), ('une passe', solver)):
+            messages = [func(alert) for alert in corpus]
+            valid = 0
+            within = 0
+            kept = 0
+            for alert, message in zip(corpus, messages):
+                within += len(message.encode('utf-8')) <= args.limit
+                try:
+                    adresse = json.loads(message)['adresse']
+                    valid += 1
+                    kept += len(adresse.rstrip('.').encode('utf-8')) / max(len(alert[2].encode('utf-8')), 1)
+                except ValueError:
+                    pass
+            cost = time_per_call(func, corpus)
+            print(f"{corpus_name:<24} {method_name:<10} {cost:>8.1f} {valid / len(corpus):>12.1%} "
+                  f"{within / len(corpus):>10.1%} {kept / len(corpus):>15.1%}")
+
+# === OCTETS TRANSFÉRÉS PAR LE SERVEUR WEB ===
+
+def make_web_app(web_options, directory):
+    """EmergencyApp réelle sur les templates et fichiers statiques du dépôt, sans radio ni journal"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    with open(os.path.join(here, 'config.yaml'), encoding='utf-8') as f:
+        logos = yaml.safe_load(f).get('logos', {})
+    config = {
+        'web': dict({'template_dir': os.path.join(here, 'templates'), 'static_dir': os.path.join(here, 'static')},
+                    **web_options),
+        'meshtastic': {'device': os.path.join(directory, 'absent-radio'), 'devices': []},
+        'outbox': {'enabled': False},
+        'logging': {'level': 'ERROR'},
+        'logos': logos
+    }
+    config_file = os.path.join(directory, f"config-{len(os.listdir(directory))}.yaml")
+    with open(config_file, 'w', encoding='utf-8') as f:
+        yaml.safe_dump(config, f, allow_unicode=True)
+    return es.EmergencyApp(config_file)
+
+class SimulatedBrowser:
+    """Navigateur minimal: respecte Cache-Control max-age et ETag, accepte gzip"""
+    
+    ASSET_PATTERN = re.compile(r'(?:src|href)="(/static/[^"]+)"')
+    
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+        self.cache = {}  # url -> (ETag, expiration)
+        self.requests = 0
+        self.bytes = 0
+    
+    def get(self, url):
+        """Effectue une requête (si le cache ne suffit pas); retourne le corps reçu"""
+        etag, expires = self.cache.get(url, (None, 0))
+        if expires > time.time():
+            return b''
+        
+        path, _, query = url.partition('?')
+        headers = {'HTTP_HOST': 'gardia.local', 'HTTP_ACCEPT_ENCODING': 'gzip, deflate',
+                   'HTTP_USER_AGENT': 'Mozilla/5.0 (Linux; Android 13) Mobile'}
+        if etag:
+            headers['HTTP_IF_NONE_MATCH'] = etag
+        environ = dict(headers, REQUEST_METHOD='GET', PATH_INFO=path, QUERY_STRING=query, SERVER_NAME='gardia.local',
+                       SERVER_PORT='80', SERVER_PROTOCOL='HTTP/1.1', REMOTE_ADDR='192.168.1.20',
+                       **{'wsgi.input': io.BytesIO(), 'wsgi.errors': io.StringIO(), 'wsgi.url_scheme': 'http'})
+        captured = {}
+        
+        def start_response(status, response_headers, exc_info=None):
+            captured['status'] = status
+            captured['headers'] = response_headers
+        
+        body = b''.join(self.wsgi_app(environ, start_response))
+        response_headers = dict(captured['headers'])
+        
+        # Octets sur le fil: requête et réponse, lignes d'en-tête comprises
+        request_size = len(f"GET {url} HTTP/1.1\r\n") + sum(len(f"{name[5:]}: {value}\r\n") for name, value in headers.items()) + 2
+        response_size = (len(f"HTTP/1.1 {captured['status']}\r\n")
+                         + sum(len(f"{name}: {value}\r\n") for name, value in captured['headers']) + 2 + len(body))
+        self.requests += 1
+        self.bytes += request_size + response_size
+        
+        max_age = re.search(r'max-age=(\d+)', response_headers.get('Cache-Control', ''))
+        new_etag = response_headers.get('ETag') or response_headers.get('Etag') or etag
+        self.cache[url] = (new_etag, time.time() + int(max_age.group(1)) if max_age else 0)
+        if response_headers.get('Content-Encoding') == 'gzip':
+            body = zlib.decompress(body, 16 + zlib.MAX_WBITS)
+        return body
+    
+    def view(self, path):
+        """Consulte une page et les fichiers statiques qu'elle référence; retourne (requêtes, octets)"""
+        requests, size = self.requests, self.bytes
+        page = self.get(path).decode('utf-8', 'replace')
+        for url in self.ASSET_PATTERN.findall(page):
+            self.get(url)
+        return self.requests - requests, self.bytes - size
+
+def bench_static(args):
+    """Octets transférés par consultation de la page d'accueil: bottle.static_file, cache statique, bundle"""
+    logging.disable(logging.CRITICAL)
+    scenarios = [('Avant (static_file)', {'static_cache': False, 'compression': False}),
+                 ('Cache statique + gzip', {'static_cache': True}),
+                 ('Bundle', {'bundle': True})]
+    
+    print(f"{args.views} consultations par téléphone; navigateur sans cache heuristique (revalidation si pas de max-age)")
+    print(f"{'Configuration':<26} {'1re visite':>20} {'Visites suivantes':>24}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name, options in scenarios:
+            app = make_web_app(options, directory)
+            browser = SimulatedBrowser(app.wsgi)
+            first = browser.view('/')
+            repeats = [browser.view('/') for _ in range(args.views - 1)]
+            repeat_requests = sum(requests for requests, _ in repeats) / max(len(repeats), 1)
+            repeat_bytes = sum(size for _, size in repeats) / max(len(repeats), 1)
+            print(f"{name:<26} {first[1]:>10} o / {first[0]} req {repeat_bytes:>14.0f} o / {repeat_requests:.0f} req")
+            app.meshtastic_handler.close()
+
+def bench_gzip(args):
+    """Taille et coût CPU de la compression gzip des réponses générées, par niveau"""
+    logging.disable(logging.CRITICAL)
+    with tempfile.TemporaryDirectory() as directory:
+        app = make_web_app({'compression': False}, directory)
+        browser = SimulatedBrowser(app.app)
+        pages = [
+            ('Accueil (/)', browser.get('/')),
+            ('Page de secours', app.get_fallback_html('Fr-Emcom', 1, es.VERSION).encode('utf-8')),
+            ('Connexion admin', browser.get('/admin')),
+            ('/health (JSON)', browser.get('/health')),
+            ('/version (JSON)', browser.get('/version'))
+        ]
+        app.meshtastic_handler.close()
+
+    print(f"Facteur CPU routeur x{args.cpu_factor}; réponse en cache = empreinte SHA-1 seule")
+    print(f"{'Réponse':<18} {'Brut':>7} " + ' '.join(f"{f'niv. {level}':>9} {'µs rout.':>9}" for level in (1, 6, 9))
+          + f" {'µs cache':>9}")
+    for name, body in pages:
+        columns = []
+        for level in (1, 6, 9):
+            size = len(es.gzip.compress(body, compresslevel=level, mtime=0))
+            cost = time_per_call(lambda data: es.gzip.compress(data, compresslevel=level, mtime=0), [body] * 20)
+            columns.append(f"{size:>9} {cost * args.cpu_factor:>9.0f}")
+        cached = time_per_call(lambda data: es.hashlib.sha1(data).digest(), [body] * 20)
+        print(f"{name:<18} {len(body):>7} " + ' '.join(columns) + f" {cached * args.cpu_factor:>9.0f}")
+
+class CountingFileHandler(logging.FileHandler):
+    """FileHandler historique: un flush, donc une écriture disque, par enregistrement"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.writes = 0
+    
+    def flush(self):
+        self.writes += 1
+        super().flush()
+
+def alert_records(corpus):
+    """Enregistrements de log d'une rafale d'alertes, tels qu'émis par le serveur (bannière, file, émission)"""
+    for index, (nom, telephone, adresse, type_sinistre, details) in enumerate(corpus):
+        alert_id = f"{index:012x}"
+        context = {'alert_id': alert_id}
+        yield es.ALERT_LOG_BANNER, (nom, telephone, adresse, type_sinistre, details,
+                                    time.strftime('%d/%m/%Y %H:%M:%S'), '192.168.1.20'), context
+        message = json_message((nom, telephone, adresse, type_sinistre, details), 1).decode('utf-8')
+        yield "Message formaté (%d octets): %s", (len(message.encode('utf-8')), message), context
+        yield "Alerte %s (priorité %s) mise en file d'émission (position %s)", (alert_id, 1, 1), context
+        yield "✅ Alerte %s enregistrée - %s - %s", (alert_id, nom, type_sinistre), context
+        yield "📡 Message envoyé sur canal %s (%s) via %s", (0, 'Fr-Emcom', '/dev/ttyUSB0'), {}
+        yield "✅ Alerte %s transmise", (alert_id,), context
+
+def bench_storage(args):
+    """Écritures disque et octets conservés pour une rafale d'alertes: FileHandler contre journal segmenté"""
+    corpus = generate_corpus(args.count)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        # Chemin relatif, comme logging.file: app.log (segments listés sous ./)
+        os.chdir(directory)
+        store = es.SegmentedLogStore('segments.jsonl', flush_interval=3600)
+        scenarios = [('FileHandler', CountingFileHandler(os.path.join(directory, 'file.jsonl'), encoding='utf-8')),
+                     ('Journal segmenté', es.SegmentedLogHandler(store))]
+        
+        print(f"{args.count} alertes, journal JSON; écriture par taille (flush_size), intervalle désactivé")
+        print(f"{'Stockage':<18} {'Enreg.':>8} {'Écritures':>10} {'Écr./alerte':>12} {'Octets écrits':>14} "
+              f"{'Sur disque':>11} {'µs/enreg.':>10}")
+        for name, handler in scenarios:
+            handler.setFormatter(es.JsonLinesFormatter())
+            handler.addFilter(es.default_alert_id)
+            logger = logging.Logger('emergency_server')
+            logger.addHandler(handler)
+            records = 0
+            start = time.process_time()
+            for message, values, context in alert_records(corpus):
+                logger.info(message, *values, extra=context)
+                records += 1
+            handler.close()
+            elapsed = time.process_time() - start
+            
+            if isinstance(handler, CountingFileHandler):
+                writes = handler.writes
+                written = on_disk = os.path.getsize(handler.baseFilename)
+            else:
+                stats = store.stats()
+                writes, written = stats['writes'], stats['bytes_written']
+                on_disk = stats['segments_bytes'] + (os.path.getsize(store.path) if os.path.exists(store.path) else 0)
+            print(f"{name:<18} {records:>8} {writes:>10} {writes / args.count:>12.2f} {written:>14} "
+                  f"{on_disk:>11} {elapsed / records * 1e6:>10.1f}")
+        
+        # Contrôle de la rotation: segments numérotés à la suite, fichier courant borné, lecture dans l'ordre
+        stats = store.stats()
+        numbers = [number for number, _ in store.segments()]
+        alert_ids = [json.loads(line).get('alert_id') for line in store.read()]
+        alert_ids = [alert_id for alert_id in alert_ids if alert_id]
+        expected = 2 if stats['bytes_written'] >= 3 * store.segment_size else 0
+        first = numbers[0] if numbers else 1
+        ok = (stats['rotations'] >= expected and numbers == list(range(first, first + len(numbers)))
+              and (not os.path.exists(store.path) or os.path.getsize(store.path) < store.segment_size)
+              and alert_ids == sorted(alert_ids) and alert_ids[-1] == f"{args.count - 1:012x}")
+        print(f"Rotation: {stats['rotations']} segments créés, {stats['purged']} purgés, "
+              f"{len(numbers)} conservés - {'OK' if ok else 'ÉCHEC'}")
+        os.chdir(cwd)
+        if not ok:
+            raise SystemExit(1)
+
+def main():
+    parser = argparse.ArgumentParser(description="Bancs d'essai GARDIA-M")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    compression = commands.add_parser('compression', help="Compression des trames binaires")
+    compression.add_argument('--count', type=int, default=2000, help="Nombre d'alertes du corpus")
+    compression.add_argument('--limit', type=int, default=200, help="Limite de taille d'un message (octets)")
+    compression.add_argument('--cpu-factor', type=float, default=25,
+                             help="Ralentissement estimé d'un CPU de routeur (MIPS ~1 GHz) par rapport à cette machine")
+    compression.add_argument('--train', action='store_true',
+                             help="Affiche un dictionnaire entraîné sur un corpus d'exemple au lieu de mesurer")
+    compression.set_defaults(func=bench_compression)
+
+    budget = commands.add_parser('budget', help="Troncature JSON: cascade historique contre répartition en une passe")
+    budget.add_argument('--count', type=int, default=2000, help="Nombre d'alertes par corpus")
+    budget.add_argument('--limit', type=int, default=200, help="Limite de taille d'un message (octets)")
+    budget.set_defaults(func=bench_budget)
+
+    static = commands.add_parser('static', help="Octets transférés par page vue: fichiers statiques, cache, bundle")
+    static.add_argument('--views', type=int, default=10, help="Consultations de la page d'accueil par téléphone")
+    static.set_defaults(func=bench_static)
+
+    compression_http = commands.add_parser('gzip', help="Compression gzip des pages et réponses JSON")
+    compression_http.add_argument('--cpu-factor', type=float, default=25,
+                                  help="Ralentissement estimé d'un CPU de routeur (MIPS ~1 GHz) par rapport à cette machine")
+    compression_http.set_defaults(func=bench_gzip)
+
+    storage = commands.add_parser('storage', help="Écritures sur la mémoire flash: FileHandler contre journal segmenté")
+    storage.add_argument('--count', type=int, default=2000, help="Nombre d'alertes de la rafale")
+    storage.set_defaults(func=bench_storage)
+
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
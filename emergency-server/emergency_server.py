@@ -14,49 +14,153 @@ VERSION = "1.0.0"
 BUILD_DATE = "2025-07-16"
 
 import logging
+import logging.handlers
+import atexit
 import yaml
 import time
 import json
 import hashlib
 import base64
+import zlib
 import urllib.parse
-from bottle import Bottle, request, response, run, static_file, template, redirect
+import glob
+import re
+import html
+import gzip
+import mimetypes
+import email.utils
+import shutil
+from bottle import Bottle, ServerAdapter, HTTPError, HTTPResponse, request, response, run, static_file, template, redirect
 import meshtastic
 import meshtastic.serial_interface
+import meshtastic.tcp_interface
 from pubsub import pub
 import os
 import sys
+import threading
+import queue
+import socket
+import select
+from wsgiref.simple_server import WSGIServer, WSGIRequestHandler, ServerHandler
+import uuid
+import unicodedata
+import heapq
+from collections import deque, OrderedDict
+from collections.abc import Mapping
 
 # Configuration par défaut
 DEFAULT_CONFIG = {
     'app': {
         'name': 'Emergency Meshtastic Server',
         'version': VERSION,
-        'build_date': BUILD_DATE
+        'build_date': BUILD_DATE,
+        'config_watch_interval': 5  # Période de détection des modifications de config.yaml (secondes, 0: désactivée)
     },
     'web': {
         'host': '0.0.0.0',
         'port': 8080,
         'debug': False,
         'template_dir': './templates',
-        'static_dir': './static'
+        'static_dir': './static',
+        'server': 'threaded',  # 'threaded' (intégré), 'wsgiref' (historique) ou adaptateur Bottle (waitress, cheroot, gevent...)
+        'workers': 8,  # Threads de traitement des requêtes (taille du pool)
+        'max_pending': 32,  # Connexions acceptées en attente d'un thread; au-delà, réponse 503
+        'backlog': 64,  # File d'attente d'écoute du noyau (listen)
+        'request_timeout': 30,  # Délai maximal de lecture/écriture d'une requête (secondes)
+        'keepalive_timeout': 5,  # Attente d'une requête suivante sur une connexion HTTP/1.1 (secondes)
+        'keepalive_requests': 100,  # Requêtes servies au maximum sur une même connexion
+        'server_options': {},  # Options transmises telles quelles à un adaptateur Bottle externe
+        'static_cache': True,  # Fichiers statiques servis depuis la mémoire (ETag, variantes gzip)
+        'static_max_size': 524288,  # Au-delà (octets), le fichier est lu sur disque à chaque requête
+        'static_check_interval': 5,  # Période minimale de vérification des fichiers modifiés (secondes)
+        'compression': True,  # Compression gzip des pages HTML et réponses JSON générées
+        'compression_level': 6,  # 1 (rapide) à 9 (compact): à baisser sur un CPU de routeur lent
+        'compression_min_size': 512,  # En dessous (octets), la réponse part telle quelle
+        'compression_cache': 32,  # Corps compressés conservés en mémoire (0 pour désactiver)
+        'bundle': False,  # Page d'accueil autonome (CSS, JS et logos intégrés) servie en une seule requête
+        'bundle_inline_max': 32768,  # Taille maximale d'un fichier intégré en data URI (octets)
+        'idempotency_ttl': 86400,  # Durée de mémorisation des clés d'idempotence (secondes)
+        'idempotency_max_keys': 2000  # Nombre maximal de clés mémorisées
     },
     'admin': {
         'enabled': True,
         'username': 'admin',
         'password': 'admin123',  # À changer impérativement !
-        'session_timeout': 3600  # 1 heure en secondes
+        'session_timeout': 3600,  # 1 heure en secondes
+        'session_sliding': True,  # L'expiration court depuis la dernière activité (sinon depuis la connexion)
+        'max_sessions': 64,  # Sessions simultanées au maximum (la moins récemment utilisée est évincée)
+        'session_sweep_interval': 60,  # Période maximale du balayage des sessions expirées (secondes)
+        'session_file': ''  # Fichier de persistance des sessions entre deux redémarrages (vide: désactivé)
     },
     'meshtastic': {
         'device': '/dev/ttyUSB0',
+        'devices': [],  # Pool de radios: chemins série ou 'tcp://hôte[:port]' (vide: device seul)
+        'discover': False,  # Sonde en parallèle les /dev/ttyUSB* et /dev/ttyACM* au démarrage
+        'discover_timeout': 20,  # Attente maximale des sondes de connexion (secondes)
+        'device_cooldown': 30,  # Premier délai avant nouvel essai d'une radio défaillante (secondes)
+        'max_backoff': 300,  # Plafond du recul exponentiel entre deux essais (secondes)
+        'hotplug_interval': 5,  # Période de détection des radios branchées ou débranchées (secondes)
         'channel_index': 1,
         'channel_name': 'Fr-Emcom',
-        'max_message_length': 200
+        'max_message_length': 200,
+        'wire_format': 'json',  # 'json' (texte) ou 'binary' (trame compacte versionnée)
+        'binary_port': 256,  # Port Meshtastic des trames binaires (PRIVATE_APP)
+        'compression': True,  # Compression à dictionnaire partagé des trames binaires (si elle réduit la taille)
+        'truncation': {  # Conservation par priorité (1 = conservé en premier) et longueur minimale (octets)
+            'adresse': {'priority': 1, 'min_length': 40},
+            'nom': {'priority': 2, 'min_length': 8},
+            'details': {'priority': 3, 'min_length': 20}  # Optionnel: supprimé plutôt que réduit sous ce seuil
+        },
+        'oversize_mode': 'truncate',  # 'truncate' ou 'fragment' (découpage en plusieurs paquets numérotés)
+        'max_fragments': 8,  # Au-delà, retour à la troncature (15 au maximum)
+        'fragment_delay': 2,  # Pause entre deux fragments d'une même alerte (secondes)
+        'queue_size': 50,  # Nombre maximal d'alertes en attente d'émission
+        'history_size': 200  # Nombre d'états d'alertes conservés pour le suivi
+    },
+    'scheduler': {
+        'duty_cycle': 0.1,  # Part maximale du temps d'antenne (10% sur la bande 869.4-869.65 MHz)
+        'burst_airtime': 10,  # Capacité du seau à jetons (secondes d'antenne)
+        'byte_airtime_ms': 7.5,  # Temps d'antenne par octet (LongFast ~1 kbit/s)
+        'packet_overhead_ms': 300,  # Préambule et en-têtes LoRa/Meshtastic par paquet
+        'aging_seconds': 60  # Une attente de cette durée fait gagner un niveau de priorité
+    },
+    'outbox': {
+        'enabled': True,
+        'file': './outbox.journal',  # Journal des alertes non encore transmises
+        'commit_delay': 0.02,  # Fenêtre de regroupement des écritures avant fsync (secondes)
+        'compact_size': 65536,  # Taille du journal déclenchant son compactage (octets)
+        'retry_interval': 30  # Délai entre deux tentatives de réémission (secondes)
+    },
+    'rate_limit': {
+        'enabled': True,
+        'max_clients': 4096,  # Clients suivis au maximum (les plus anciens inactifs sont oubliés)
+        'routes': {  # Requêtes autorisées par adresse IP sur une fenêtre glissante (secondes)
+            '/submit': {'requests': 6, 'window': 60},
+            '/api/alerts': {'requests': 6, 'window': 60},
+            '/admin/login': {'requests': 10, 'window': 300}
+        }
+    },
+    'admission': {
+        'max_backlog': 30,  # Au-delà de ce nombre d'alertes en file, les nouvelles alertes sont refusées (503)
+        'always_admit_priority': 1  # Priorités admises malgré tout (jusqu'à queue_size): 1 = Incendie
+    },
+    'dedup': {
+        'enabled': True,
+        'window': 600,  # Durée pendant laquelle un signalement identique est regroupé (secondes)
+        'merge': True  # Regrouper les signalements d'autres témoins (même adresse et type) en une émission
     },
     'logging': {
         'level': 'INFO',
         'format': '%(asctime)s - %(levelname)s - %(message)s',
-        'log_all_data': True
+        'log_all_data': True,
+        'file': '',  # Journal texte sur disque, au format de 'format' (vide: désactivé)
+        'json_file': '',  # Journal structuré, un enregistrement JSON par ligne (vide: désactivé)
+        'queue_size': 10000,  # Enregistrements en attente d'écriture au maximum (au-delà: abandonnés et comptés)
+        'flush_interval': 30,  # Écriture groupée des journaux sur disque au plus tard toutes les N secondes
+        'flush_size': 65536,  # ... ou dès que N octets attendent en mémoire
+        'segment_size': 262144,  # Taille du fichier courant déclenchant sa compression en segment .gz (octets)
+        'max_size': 2097152,  # Taille totale maximale d'un journal, segments compressés compris (octets)
+        'compress_level': 6  # Niveau gzip des segments (1 à 9)
     },
     'alert_types': {
         'Incendie': 1,
@@ -83,29 +187,810 @@ DEFAULT_CONFIG = {
     }
 }
 
+# Champs d'une alerte (formulaire et API JSON); details est optionnel
+ALERT_FIELDS = ('nom_prenom', 'telephone', 'adresse', 'type_sinistre', 'details')
+
+# Libellés des états de transmission d'une alerte
+ALERT_STATES = {
+    'queued': "En file d'attente",
+    'sending': "Transmission en cours",
+    'sent': "Transmise sur le réseau Meshtastic",
+    'failed': "Échec de transmission, nouvelle tentative au retour de la radio"
+}
+
+# === FORMAT BINAIRE COMPACT ===
+# Trame: en-tête (0xC0 | version), drapeaux, code type (varint), téléphone (BCD ou texte),
+# puis nom, adresse et détails éventuels en UTF-8 préfixés par leur longueur (varint).
+# Les octets 0xC0/0xC1 n'apparaissent jamais en UTF-8: une trame ne peut pas être confondue avec du JSON.
+# Trame compressée: après les drapeaux, l'identifiant du dictionnaire (varint) puis le corps en deflate brut.
+BINARY_FORMAT_VERSION = 1
+BINARY_HEADER_MASK = 0xC0
+BINARY_FLAG_DETAILS = 0x01  # Champ détails présent
+BINARY_FLAG_PHONE_TEXT = 0x02  # Téléphone non numérique, transmis en texte
+BINARY_FLAG_COMPRESSED = 0x04  # Corps compressé avec un dictionnaire partagé
+BINARY_MAX_BODY = 8192  # Corps décompressé maximal: bien au-delà d'une alerte réelle, même fragmentée
+# Dictionnaires de compression partagés avec les récepteurs (ne jamais modifier un dictionnaire publié:
+# en ajouter un nouveau avec un nouvel identifiant). Les chaînes les plus fréquentes sont placées à la fin,
+# là où deflate les référence au moindre coût. Candidat entraîné: python3 benchmark.py compression --train
+COMPRESSION_DICTIONARY_ID = 1
+COMPRESSION_DICTIONARIES = {
+    1: (
+        'Zone Industrielle, Zone Artisanale, Lieu-dit Hameau Lotissement Résidence Bâtiment Escalier '
+        'Appartement étage Centre Commercial Parking Gare Mairie École Collège Lycée Église Stade Salle '
+        'des fêtes Ferme Chemin des Impasse des Allée des Quai Cours Route Départementale Place du '
+        'Marché Boulevard Saint-Sainte-Général de Gaulle Jean Jaurès Victor Hugo Pasteur Gambetta '
+        'Clemenceau Maréchal Foch de la République de la Libération Caen Rouen Le Havre Dieppe Évreux '
+        'Cherbourg Alençon Bayeux Lisieux Fécamp Yvetot 14000 Caen 76000 Rouen 76600 Le Havre 27000 '
+        'Évreux 50100 Cherbourg 61000 Alençon Monsieur Madame Marie Pierre Michel Philippe Nathalie '
+        'Isabelle Martin Bernard Dubois Thomas Robert Petit Durand Leroy Moreau Lefebvre inconscient '
+        'conscient ne respire pas, respire difficilement, malaise chute douleur thoracique saigne '
+        'beaucoup personne âgée enfant bébé femme enceinte homme accident de la route voiture moto vélo '
+        'camion feu de cheminée feu de poubelle feu de végétation fumée noire flammes visibles odeur de '
+        'gaz maison appartement immeuble bloquée au étage, blessés légers, blessé grave, victimes, une '
+        "victime, deux victimes, trois Incendie Secours à Personnes rue de l'Église, rue du Général, "
+        'avenue de la Gare, place de la Mairie, route de Paris, chemin du Moulin, rue Jean 06.07. rue de '
+        'la avenue du , 14'
+    ).encode('utf-8')
+}
+
+BCD_DIGITS = '0123456789+*#'
+PHONE_SEPARATORS = ' .-/()'
+
+def encode_varint(value):
+    """Encode un entier positif en varint (7 bits par octet, bit de poids fort = suite)"""
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+def decode_varint(data, pos):
+    """Décode un varint à la position donnée, retourne (valeur, nouvelle position)"""
+    result = 0
+    shift = 0
+    while True:
+        if pos >= len(data):
+            raise ValueError("Trame binaire tronquée (varint)")
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+def encode_text_field(text):
+    """Encode un champ texte: longueur (varint) puis UTF-8"""
+    raw = text.encode('utf-8')
+    return encode_varint(len(raw)) + raw
+
+def decode_text_field(data, pos):
+    """Décode un champ texte préfixé par sa longueur"""
+    length, pos = decode_varint(data, pos)
+    if pos + length > len(data):
+        raise ValueError("Trame binaire tronquée (texte)")
+    return data[pos:pos + length].decode('utf-8'), pos + length
+
+def encode_phone_bcd(telephone):
+    """Encode un numéro en BCD (deux chiffres par octet), None s'il n'est pas numérique"""
+    digits = [c for c in telephone if c not in PHONE_SEPARATORS]
+    if not digits or any(c not in BCD_DIGITS for c in digits):
+        return None
+    
+    nibbles = [BCD_DIGITS.index(c) for c in digits]
+    if len(nibbles) % 2:
+        nibbles.append(0x0F)  # Quartet de bourrage
+    packed = bytes((nibbles[i] << 4) | nibbles[i + 1] for i in range(0, len(nibbles), 2))
+    return encode_varint(len(digits)) + packed
+
+def decode_phone_bcd(data, pos):
+    """Décode un numéro BCD, retourne (numéro, nouvelle position)"""
+    count, pos = decode_varint(data, pos)
+    size = (count + 1) // 2
+    if pos + size > len(data):
+        raise ValueError("Trame binaire tronquée (téléphone)")
+    
+    digits = []
+    for i in range(count):
+        byte = data[pos + i // 2]
+        nibble = byte & 0x0F if i % 2 else byte >> 4
+        if nibble >= len(BCD_DIGITS):
+            raise ValueError("Chiffre BCD invalide")
+        digits.append(BCD_DIGITS[nibble])
+    return ''.join(digits), pos + size
+
+def compress_payload(body, dictionary_id=COMPRESSION_DICTIONARY_ID):
+    """Compresse en deflate brut (sans en-tête zlib) avec un dictionnaire prédéfini"""
+    compressor = zlib.compressobj(9, zlib.DEFLATED, -15, 9, zlib.Z_DEFAULT_STRATEGY,
+                                  COMPRESSION_DICTIONARIES[dictionary_id])
+    return compressor.compress(body) + compressor.flush()
+
+def decompress_payload(data, dictionary_id, max_size=BINARY_MAX_BODY):
+    """Décompresse un corps deflate brut avec le dictionnaire indiqué, sans dépasser max_size octets"""
+    if dictionary_id not in COMPRESSION_DICTIONARIES:
+        raise ValueError(f"Dictionnaire de compression inconnu: {dictionary_id}")
+    decompressor = zlib.decompressobj(-15, zdict=COMPRESSION_DICTIONARIES[dictionary_id])
+    # Décompression bornée: une trame forgée (bombe deflate) ne peut pas épuiser la mémoire du routeur
+    body = decompressor.decompress(data, max_size)
+    if decompressor.unconsumed_tail:
+        raise ValueError(f"Corps décompressé trop long (plus de {max_size} octets)")
+    if not decompressor.eof:
+        raise ValueError("Corps compressé tronqué")
+    return body
+
+def encode_binary_message(type_code, nom, telephone, adresse, details=None, compress=False):
+    """Encode une alerte au format binaire compact, compressée seulement si c'est plus court"""
+    flags = 0
+    phone = encode_phone_bcd(telephone)
+    if phone is None:
+        flags |= BINARY_FLAG_PHONE_TEXT
+        phone = encode_text_field(telephone)
+    if details:
+        flags |= BINARY_FLAG_DETAILS
+    
+    body = encode_varint(type_code) + phone + encode_text_field(nom) + encode_text_field(adresse)
+    if details:
+        body += encode_text_field(details)
+    
+    if compress:
+        compressed = encode_varint(COMPRESSION_DICTIONARY_ID) + compress_payload(body)
+        if len(compressed) < len(body):
+            flags |= BINARY_FLAG_COMPRESSED
+            body = compressed
+    
+    return bytes([BINARY_HEADER_MASK | BINARY_FORMAT_VERSION, flags]) + body
+
+def decode_binary_message(data):
+    """Décode une trame binaire vers la même structure que le message JSON"""
+    if len(data) < 2 or data[0] & 0xF0 != BINARY_HEADER_MASK:
+        raise ValueError("Trame binaire GARDIA-M non reconnue")
+    version = data[0] & 0x0F
+    if version != BINARY_FORMAT_VERSION:
+        raise ValueError(f"Version de trame binaire non supportée: {version}")
+    
+    flags = data[1]
+    pos = 2
+    if flags & BINARY_FLAG_COMPRESSED:
+        dictionary_id, pos = decode_varint(data, pos)
+        data = decompress_payload(data[pos:], dictionary_id)
+        pos = 0
+    
+    type_code, pos = decode_varint(data, pos)
+    if flags & BINARY_FLAG_PHONE_TEXT:
+        telephone, pos = decode_text_field(data, pos)
+    else:
+        telephone, pos = decode_phone_bcd(data, pos)
+    nom, pos = decode_text_field(data, pos)
+    adresse, pos = decode_text_field(data, pos)
+    
+    message = {"type": type_code, "nom": nom, "tel": telephone, "adresse": adresse}
+    if flags & BINARY_FLAG_DETAILS:
+        message["details"], pos = decode_text_field(data, pos)
+    return message
+
+def truncate_utf8(text, max_bytes, suffix='...'):
+    """Tronque un texte à max_bytes octets UTF-8 sans couper de caractère"""
+    raw = text.encode('utf-8')
+    if len(raw) <= max_bytes:
+        return text
+    if max_bytes <= len(suffix):
+        return suffix[:max(max_bytes, 0)]
+    return raw[:max_bytes - len(suffix)].decode('utf-8', 'ignore') + suffix
+
+# === FRAGMENTATION DES MESSAGES TROP LONGS ===
+# Fragment texte (JSON): "#F<id 4 hex>:<index>/<total>|<morceau>", index à partir de 1.
+# Fragment binaire: en-tête (0xD0 | version), id (2 octets), (index << 4 | total), morceau.
+FRAGMENT_TEXT_PREFIX = '#F'
+FRAGMENT_HEADER_MASK = 0xD0
+FRAGMENT_FORMAT_VERSION = 1
+MAX_FRAGMENTS = 15
+
+def split_utf8(text, max_bytes):
+    """Découpe un texte en morceaux d'au plus max_bytes octets UTF-8 sans couper de caractère"""
+    chunks = []
+    current = []
+    size = 0
+    for char in text:
+        char_size = len(char.encode('utf-8'))
+        if size + char_size > max_bytes and current:
+            chunks.append(''.join(current))
+            current = []
+            size = 0
+        current.append(char)
+        size += char_size
+    if current:
+        chunks.append(''.join(current))
+    return chunks
+
+def fragment_count(message, max_length):
+    """Nombre de fragments nécessaires pour un message (texte ou trame binaire)"""
+    if isinstance(message, bytes):
+        room = max_length - 4
+        return -(-len(message) // room)
+    room = max_length - len(f"{FRAGMENT_TEXT_PREFIX}0000:{MAX_FRAGMENTS}/{MAX_FRAGMENTS}|")
+    return len(split_utf8(message, room))
+
+def fragment_message(message, max_length, message_id=None):
+    """Découpe un message trop long en fragments numérotés partageant un identifiant"""
+    if message_id is None:
+        message_id = int.from_bytes(os.urandom(2), 'big')
+    
+    if isinstance(message, bytes):
+        room = max_length - 4
+        chunks = [message[i:i + room] for i in range(0, len(message), room)]
+        if len(chunks) > MAX_FRAGMENTS:
+            raise ValueError(f"Message trop long pour {MAX_FRAGMENTS} fragments")
+        header = bytes([FRAGMENT_HEADER_MASK | FRAGMENT_FORMAT_VERSION]) + message_id.to_bytes(2, 'big')
+        return [header + bytes([(index << 4) | len(chunks)]) + chunk
+                for index, chunk in enumerate(chunks, 1)]
+    
+    room = max_length - len(f"{FRAGMENT_TEXT_PREFIX}0000:{MAX_FRAGMENTS}/{MAX_FRAGMENTS}|")
+    chunks = split_utf8(message, room)
+    if len(chunks) > MAX_FRAGMENTS:
+        raise ValueError(f"Message trop long pour {MAX_FRAGMENTS} fragments")
+    return [f"{FRAGMENT_TEXT_PREFIX}{message_id:04x}:{index}/{len(chunks)}|{chunk}"
+            for index, chunk in enumerate(chunks, 1)]
+
+def parse_fragment(fragment):
+    """Analyse un fragment, retourne (id, index, total, morceau) ou None si ce n'en est pas un"""
+    if isinstance(fragment, bytes):
+        if len(fragment) < 4 or fragment[0] != FRAGMENT_HEADER_MASK | FRAGMENT_FORMAT_VERSION:
+            return None
+        return int.from_bytes(fragment[1:3], 'big'), fragment[3] >> 4, fragment[3] & 0x0F, fragment[4:]
+    
+    if not fragment.startswith(FRAGMENT_TEXT_PREFIX):
+        return None
+    try:
+        header, chunk = fragment[len(FRAGMENT_TEXT_PREFIX):].split('|', 1)
+        message_id, position = header.split(':')
+        index, total = position.split('/')
+        return int(message_id, 16), int(index), int(total), chunk
+    except ValueError:
+        return None
+
+class FragmentReassembler:
+    """Réassemblage côté récepteur des fragments d'alerte (implémentation de référence)"""
+    
+    def __init__(self, timeout=120):
+        self.timeout = timeout
+        self.partial = {}  # id -> {'received': temps, 'total': n, 'chunks': {index: morceau}}
+    
+    def add(self, fragment, now=None):
+        """Ajoute un paquet reçu; retourne le message complet dès qu'il est reconstitué.
+        
+        Un paquet qui n'est pas un fragment est retourné tel quel.
+        """
+        now = now or time.time()
+        self.expire(now)
+        
+        parsed = parse_fragment(fragment)
+        if parsed is None:
+            return fragment
+        message_id, index, total, chunk = parsed
+        if not 1 <= index <= total:
+            return None
+        
+        entry = self.partial.setdefault(message_id, {'received': now, 'total': total, 'chunks': {}})
+        entry['chunks'][index] = chunk  # Les doublons (réémissions) écrasent simplement le morceau
+        if len(entry['chunks']) < entry['total']:
+            return None
+        
+        del self.partial[message_id]
+        chunks = [entry['chunks'][i] for i in range(1, entry['total'] + 1)]
+        return b''.join(chunks) if isinstance(chunk, bytes) else ''.join(chunks)
+    
+    def expire(self, now=None):
+        """Abandonne les messages incomplets trop anciens"""
+        now = now or time.time()
+        for message_id in [key for key, entry in self.partial.items() if now - entry['received'] > self.timeout]:
+            del self.partial[message_id]
+
+# === RÉPARTITION DU BUDGET D'OCTETS ENTRE LES CHAMPS ===
+
+# Encodeur JSON compact partagé (évite de reconstruire un encodeur à chaque json.dumps)
+COMPACT_JSON = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+def json_string_cost(text):
+    """Coût en octets d'un texte échappé en JSON (UTF-8), guillemets exclus"""
+    return len(json.encoder.encode_basestring(text).encode('utf-8')) - 2
+
+def truncate_to_cost(text, budget, suffix='...'):
+    """Tronque un texte pour que son coût JSON encodé tienne dans budget (suffixe compris).
+    
+    Le coût d'un préfixe croît avec sa longueur: recherche dichotomique du plus long préfixe admissible.
+    """
+    if json_string_cost(text) <= budget:
+        return text
+    if budget <= len(suffix):
+        return suffix[:max(budget, 0)]
+    limit = budget - len(suffix)
+    low, high = 0, min(len(text), limit)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if json_string_cost(text[:middle]) <= limit:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low] + suffix
+
+def allocate_field_budgets(fields, budget):
+    """Répartit un budget d'octets entre des champs tronquables, en une seule passe.
+    
+    fields: dictionnaires {'name', 'cost', 'priority', 'min_length', 'optional', 'key_cost'}, où cost est
+    le coût encodé complet du champ et key_cost le coût de sa clé (champs optionnels uniquement).
+    Chaque champ, par ordre de priorité, prend ce dont il a besoin en laissant leur minimum aux champs
+    obligatoires suivants. Un champ optionnel qui ne peut recevoir son minimum est abandonné.
+    Retourne {nom: octets alloués}; un champ abandonné est absent du résultat.
+    """
+    ordered = sorted(fields, key=lambda field: field['priority'])
+    floors = {field['name']: min(field['cost'], field['min_length']) for field in ordered}
+    reserve = sum(floors[field['name']] for field in ordered if not field['optional'])
+    remaining = budget
+    allocation = {}
+    
+    for field in ordered:
+        name = field['name']
+        if field['optional']:
+            available = remaining - reserve - field['key_cost']
+            if available < floors[name] or available <= 0:
+                continue
+            remaining -= field['key_cost']
+        else:
+            reserve -= floors[name]
+            available = max(remaining - reserve, min(floors[name], remaining))
+        
+        allocation[name] = max(min(field['cost'], available), 0)
+        remaining -= allocation[name]
+    return allocation
+
+# === JOURNALISATION ASYNCHRONE ===
+
+def alert_context(alert_id):
+    """Champ structuré alert_id d'un enregistrement de log (argument extra)"""
+    return {'alert_id': alert_id} if alert_id else None
+
+def default_alert_id(record):
+    """Filtre: alert_id toujours défini, utilisable dans logging.format (%(alert_id)s)"""
+    if not hasattr(record, 'alert_id'):
+        record.alert_id = ''
+    return True
+
+class JsonLinesFormatter(logging.Formatter):
+    """Un enregistrement par ligne JSON: date, niveau, thread, message et ID d'alerte éventuel"""
+    
+    def format(self, record):
+        entry = {'ts': round(record.created, 3), 'level': record.levelname, 'logger': record.name,
+                 'thread': record.threadName, 'msg': record.getMessage()}
+        if record.alert_id:
+            entry['alert_id'] = record.alert_id
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return COMPACT_JSON.encode(entry)
+
+class SegmentedLogStore:
+    """Journal en segments ménageant la mémoire flash: tampon en RAM, écritures groupées, rotation gzip.
+    
+    Les lignes restent en mémoire jusqu'à flush_interval secondes ou flush_size octets, puis sont
+    ajoutées au fichier courant en une seule écriture. Au-delà de segment_size octets, le fichier
+    courant est compressé en segment {path}.NNNNNN.gz; les plus anciens segments sont supprimés
+    au-delà de max_size octets au total. Une coupure de courant perd au plus le contenu du tampon.
+    """
+    
+    def __init__(self, path, flush_interval=30, flush_size=65536, segment_size=262144,
+                 max_size=2097152, compress_level=6):
+        self.path = path
+        self.directory = os.path.dirname(path) or '.'
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.segment_size = segment_size
+        self.max_size = max_size
+        self.compress_level = compress_level
+        self.buffer = []
+        self.buffered = 0
+        self.lock = threading.Condition()  # Tampon
+        self.io_lock = threading.Lock()  # Écriture, rotation et purge des fichiers
+        self.counters = {'records': 0, 'writes': 0, 'bytes_written': 0, 'rotations': 0, 'purged': 0}
+        self.running = True
+        
+        os.makedirs(self.directory, exist_ok=True)
+        for leftover in glob.glob(f"{glob.escape(path)}.*.tmp"):
+            os.remove(leftover)  # Compression interrompue: le fichier courant est encore intact
+        self.flusher = threading.Thread(target=self.flush_loop, name=f'log-flush-{os.path.basename(path)}', daemon=True)
+        self.flusher.start()
+    
+    def append(self, line):
+        """Ajoute une ligne au tampon (aucune écriture disque ici)"""
+        data = line.encode('utf-8') if isinstance(line, str) else line
+        with self.lock:
+            self.buffer.append(data)
+            self.buffered += len(data)
+            self.counters['records'] += 1
+            if self.buffered >= self.flush_size:
+                self.lock.notify()
+    
+    def flush_loop(self):
+        """Thread d'écriture: vide le tampon à intervalle régulier ou dès qu'il atteint flush_size"""
+        while True:
+            with self.lock:
+                if self.running and self.buffered < self.flush_size:
+                    self.lock.wait(self.flush_interval)
+                running = self.running
+            try:
+                self.flush()
+            except Exception as e:
+                # Pas de logger ici: ce code s'exécute pour le compte de la journalisation
+                sys.stderr.write(f"Erreur écriture du journal {self.path}: {e}\n")
+            if not running:
+                return
+    
+    def flush(self):
+        """Écrit le tampon en un seul appel, puis compresse le fichier courant s'il est plein"""
+        with self.io_lock:
+            with self.lock:
+                data = b''.join(self.buffer)
+                self.buffer, self.buffered = [], 0
+            if not data:
+                return
+            with open(self.path, 'ab') as f:
+                f.write(data)
+                size = f.tell()
+            self.counters['writes'] += 1
+            self.counters['bytes_written'] += len(data)
+            if size >= self.segment_size:
+                self.rotate()
+    
+    def segments(self):
+        """Segments compressés (numéro, chemin), du plus ancien au plus récent"""
+        prefix = os.path.basename(self.path) + '.'
+        found = []
+        for name in os.listdir(self.directory):
+            number = name[len(prefix):-3]
+            if name.startswith(prefix) and name.endswith('.gz') and number.isdigit():
+                found.append((int(number), os.path.join(self.directory, name)))
+        return sorted(found)
+    
+    def rotate(self):
+        """Compresse le fichier courant en nouveau segment et purge les plus anciens (io_lock détenu)"""
+        found = self.segments()
+        number = found[-1][0] + 1 if found else 1
+        segments = [path for _, path in found]
+        segment = f"{self.path}.{number:06d}.gz"
+        with open(self.path, 'rb') as source, gzip.open(f"{segment}.tmp", 'wb', self.compress_level) as target:
+            shutil.copyfileobj(source, target, 65536)
+        os.replace(f"{segment}.tmp", segment)
+        os.remove(self.path)
+        self.counters['rotations'] += 1
+        
+        segments.append(segment)
+        total = sum(os.path.getsize(path) for path in segments)
+        while len(segments) > 1 and total > self.max_size:
+            oldest = segments.pop(0)
+            total -= os.path.getsize(oldest)
+            os.remove(oldest)
+            self.counters['purged'] += 1
+    
+    def read(self):
+        """Lignes du journal en flux, des segments les plus anciens aux plus récentes (tampon compris)"""
+        self.flush()
+        for _, segment in self.segments():
+            try:
+                with gzip.open(segment, 'rt', encoding='utf-8', errors='replace') as f:
+                    yield from f
+            except FileNotFoundError:
+                continue  # Segment purgé pendant la lecture
+        try:
+            with open(self.path, 'r', encoding='utf-8', errors='replace') as f:
+                yield from f
+        except FileNotFoundError:
+            pass
+    
+    def close(self):
+        """Écrit le tampon et arrête le thread d'écriture"""
+        with self.lock:
+            self.running = False
+            self.lock.notify()
+        self.flusher.join(10)
+        self.flush()
+    
+    def stats(self):
+        segments = [path for _, path in self.segments()]
+        with self.lock:
+            return dict(self.counters, path=self.path, buffered=self.buffered, segments=len(segments),
+                        segments_bytes=sum(os.path.getsize(path) for path in segments))
+
+class SegmentedLogHandler(logging.Handler):
+    """Handler écrivant les enregistrements formatés dans un SegmentedLogStore"""
+    
+    def __init__(self, store):
+        super().__init__()
+        self.store = store
+    
+    def emit(self, record):
+        try:
+            self.store.append(self.format(record) + '\n')
+        except Exception:
+            self.handleError(record)
+    
+    def flush(self):
+        self.store.flush()
+    
+    def close(self):
+        self.store.close()
+        super().close()
+
+class LogQueueHandler(logging.handlers.QueueHandler):
+    """Dépose les enregistrements, non formatés, dans une file bornée sans jamais attendre.
+    
+    Le message (arguments %) n'est assemblé que par le thread d'écriture. Les arguments ne doivent
+    donc pas être modifiés après l'appel. File pleine: l'enregistrement est abandonné et compté.
+    """
+    
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+    
+    def prepare(self, record):
+        return record
+    
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class LogListener(logging.handlers.QueueListener):
+    """Thread d'écriture des logs"""
+    
+    def enqueue_sentinel(self):
+        # Attente d'une place: le signal d'arrêt ne doit pas être abandonné comme un enregistrement
+        self.queue.put(self._sentinel)
+
+class LogPipeline:
+    """Journalisation hors du chemin des requêtes: file bornée vidée par un thread d'écriture.
+    
+    Les destinations (stderr, journaux texte et JSON) peuvent être reconfigurées à chaud; les enregistrements
+    émis pendant le remplacement attendent dans la file. La file est vidée à l'arrêt du programme.
+    """
+    
+    def __init__(self, queue_size=10000):
+        self.queue = queue.Queue(queue_size)
+        self.handler = LogQueueHandler(self.queue)
+        self.listener = None
+        self.stores = {}  # 'file' / 'json_file' -> SegmentedLogStore
+        self.lock = threading.Lock()
+        atexit.register(self.stop)
+    
+    def configure(self, level, format_str, log_file=None, json_file=None, storage=None):
+        """(Re)définit le niveau, le format texte et les journaux sur disque optionnels (texte, JSON)"""
+        console = logging.StreamHandler()
+        console.setFormatter(logging.Formatter(format_str))
+        handlers = [console]
+        stores = {}
+        for name, path, formatter in (('file', log_file, logging.Formatter(format_str)),
+                                      ('json_file', json_file, JsonLinesFormatter())):
+            if path:
+                stores[name] = SegmentedLogStore(path, **(storage or {}))
+                handler = SegmentedLogHandler(stores[name])
+                handler.setFormatter(formatter)
+                handlers.append(handler)
+        for handler in handlers:
+            handler.addFilter(default_alert_id)
+        
+        with self.lock:
+            previous = self.listener
+            if previous:
+                previous.stop()  # Écrit d'abord les enregistrements déjà en file
+                for handler in previous.handlers:
+                    handler.close()  # Tampons écrits avant qu'un nouveau journal reprenne le même fichier
+            self.listener = LogListener(self.queue, *handlers)
+            self.listener.start()
+            self.stores = stores
+        
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            if handler is not self.handler:
+                root.removeHandler(handler)
+        if self.handler not in root.handlers:
+            root.addHandler(self.handler)
+        root.setLevel(level)
+    
+    def stop(self):
+        """Écrit les enregistrements en attente puis arrête le thread d'écriture"""
+        with self.lock:
+            if self.listener:
+                self.listener.stop()
+                for handler in self.listener.handlers:
+                    handler.flush()
+                self.listener = None
+    
+    def stats(self):
+        return {'queued': self.queue.qsize(), 'capacity': self.queue.maxsize, 'dropped': self.handler.dropped,
+                'files': {name: store.stats() for name, store in self.stores.items()}}
+
+log_pipeline = None  # Créé au premier setup_logging
+
+# === INSTANTANÉ DE CONFIGURATION ===
+
+def freeze_config(value):
+    """Copie immuable d'une valeur de configuration (dict -> ConfigSection, liste -> tuple)"""
+    if isinstance(value, dict):
+        return ConfigSection(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze_config(item) for item in value)
+    return value
+
+def validate_config(config, defaults=DEFAULT_CONFIG, path=''):
+    """Vérifie le type de chaque paramètre connu par rapport à la valeur par défaut; retourne les erreurs"""
+    errors = []
+    for key, default in defaults.items():
+        if key not in config or default is None:
+            continue
+        value, name = config[key], f"{path}{key}"
+        if isinstance(default, dict):
+            if not isinstance(value, dict):
+                errors.append(f"{name}: section attendue")
+            elif key not in ('server_options', 'alert_types', 'routes'):
+                errors.extend(validate_config(value, default, f"{name}."))
+        elif isinstance(default, bool):
+            if not isinstance(value, bool):
+                errors.append(f"{name}: booléen attendu ({value!r})")
+        elif isinstance(default, (int, float)):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                errors.append(f"{name}: nombre attendu ({value!r})")
+        elif isinstance(default, str):
+            # Valeur vide en YAML (None) admise: emplacement laissé vide
+            if value is not None and not isinstance(value, str):
+                errors.append(f"{name}: texte attendu ({value!r})")
+        elif isinstance(default, list) and not isinstance(value, list):
+            errors.append(f"{name}: liste attendue ({value!r})")
+    return errors
+
+class ConfigSection(Mapping):
+    """Section de configuration immuable, accessible par clé (section['port']) ou par attribut (section.port)"""
+    __slots__ = ('_values',)
+    
+    def __init__(self, values):
+        object.__setattr__(self, '_values', {key: freeze_config(value) for key, value in values.items()})
+    
+    def __getitem__(self, key):
+        return self._values[key]
+    
+    def __iter__(self):
+        return iter(self._values)
+    
+    def __len__(self):
+        return len(self._values)
+    
+    def __getattr__(self, name):
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(f"Paramètre de configuration inconnu: {name}") from None
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("Configuration en lecture seule")
+    
+    def __repr__(self):
+        return f"ConfigSection({self._values!r})"
+
+class ConfigSnapshot(ConfigSection):
+    """Configuration validée et figée, avec les valeurs dérivées calculées une fois.
+    
+    Un instantané n'est jamais modifié: ConfigManager le remplace d'un bloc. Un traitement qui lit
+    config.snapshot une seule fois travaille donc sur une configuration cohérente de bout en bout.
+    """
+    __slots__ = ('flat', 'alert_codes', 'max_message_length', 'max_fragments', 'wire_format', 'oversize_mode',
+                 'truncation')
+    
+    def __init__(self, config):
+        errors = validate_config(config)
+        if errors:
+            raise ValueError(f"configuration invalide: {'; '.join(errors)}")
+        super().__init__(config)
+        
+        # Tous les chemins pointés ('web', 'web.port'...) -> valeur, pour ConfigManager.get
+        flat = {}
+        pending = [('', self)]
+        while pending:
+            prefix, section = pending.pop()
+            for key, value in section.items():
+                path = f"{prefix}{key}"
+                flat[path] = value
+                if isinstance(value, ConfigSection):
+                    pending.append((f"{path}.", value))
+        object.__setattr__(self, 'flat', flat)
+        
+        meshtastic = self.get('meshtastic', {})
+        defaults = DEFAULT_CONFIG['meshtastic']
+        object.__setattr__(self, 'alert_codes', self.get('alert_types') or
+                           ConfigSection({'Incendie': 1, 'Secours à Personnes': 2, 'Autre': 3}))
+        object.__setattr__(self, 'max_message_length', meshtastic.get('max_message_length', 200))
+        object.__setattr__(self, 'max_fragments', min(meshtastic.get('max_fragments', 8), MAX_FRAGMENTS))
+        object.__setattr__(self, 'wire_format', meshtastic.get('wire_format', 'json'))
+        object.__setattr__(self, 'oversize_mode', meshtastic.get('oversize_mode', 'truncate'))
+        
+        # Règles de troncature complétées par les valeurs par défaut
+        rules = meshtastic.get('truncation', {})
+        object.__setattr__(self, 'truncation', ConfigSection({
+            name: {option: (rules.get(name) or {}).get(option, default[option]) for option in default}
+            for name, default in defaults['truncation'].items()
+        }))
+
+# Paramètres pris en compte seulement au démarrage (socket d'écoute, routes, journal...)
+RESTART_REQUIRED = ('web.host', 'web.port', 'web.server', 'web.workers', 'web.max_pending', 'web.backlog',
+                    'web.request_timeout', 'web.keepalive_timeout', 'web.keepalive_requests', 'web.server_options',
+                    'web.compression', 'outbox.enabled', 'outbox.file', 'outbox.commit_delay', 'outbox.compact_size',
+                    'admin.enabled', 'admin.session_file', 'logging.queue_size')
+
+def restart_required(changed):
+    """Paramètres modifiés qui ne prendront effet qu'au prochain démarrage"""
+    return sorted(path for path in changed if any(path == key or path.startswith(key + '.') for key in RESTART_REQUIRED))
+
+def config_changes(old, new):
+    """Chemins des paramètres (feuilles) ajoutés, supprimés ou modifiés entre deux instantanés"""
+    old_values = {path: value for path, value in old.flat.items() if not isinstance(value, ConfigSection)}
+    new_values = {path: value for path, value in new.flat.items() if not isinstance(value, ConfigSection)}
+    return {path for path in old_values.keys() | new_values.keys()
+            if path not in old_values or path not in new_values or old_values[path] != new_values[path]}
+
 class ConfigManager:
     def __init__(self, config_file='config.yaml'):
         self.config_file = config_file
-        self.config = self.load_config()
+        self.stamp = None  # (date, taille) du fichier lu, pour détecter ses modifications
+        self.snapshot = self.load_config()
+    
+    @property
+    def config(self):
+        """Configuration courante (instantané immuable)"""
+        return self.snapshot
     
     def load_config(self):
-        """Charge la configuration depuis le fichier YAML"""
+        """Charge la configuration depuis le fichier YAML.
+        
+        Un fichier illisible ou invalide arrête le démarrage: le serveur ne tourne jamais
+        silencieusement avec la configuration par défaut (mauvais canal, mot de passe d'usine...).
+        """
         if os.path.exists(self.config_file):
             try:
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    config = yaml.safe_load(f)
-                    # Fusion avec la configuration par défaut
-                    merged_config = self.merge_config(DEFAULT_CONFIG, config)
-                    print(f"✅ Configuration chargée depuis {self.config_file}")
-                    return merged_config
+                snapshot = self.read_config()
             except Exception as e:
-                print(f"❌ Erreur lors du chargement de {self.config_file}: {e}")
-                print("📝 Utilisation de la configuration par défaut")
+                raise SystemExit(f"❌ Configuration {self.config_file} refusée, démarrage interrompu: {e}") from e
+            print(f"✅ Configuration chargée depuis {self.config_file}")
+            return snapshot
         else:
             print(f"📝 Fichier {self.config_file} non trouvé, création avec la configuration par défaut")
             self.save_default_config()
         
-        return DEFAULT_CONFIG
+        return ConfigSnapshot(DEFAULT_CONFIG)
+    
+    def read_config(self):
+        """Lit, fusionne avec les valeurs par défaut et valide le fichier YAML (exception si invalide)"""
+        self.stamp = self.file_stamp()
+        with open(self.config_file, 'r', encoding='utf-8') as f:
+            config = yaml.safe_load(f) or {}
+        if not isinstance(config, dict):
+            raise ValueError("configuration invalide: section racine attendue")
+        return ConfigSnapshot(self.merge_config(DEFAULT_CONFIG, config))
+    
+    def file_stamp(self):
+        """Date de modification et taille du fichier (None s'il est absent)"""
+        try:
+            stat = os.stat(self.config_file)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+    
+    def reload(self):
+        """Relit le fichier et remplace l'instantané d'un bloc; retourne les chemins modifiés.
+        
+        Si le fichier est illisible ou invalide, l'exception remonte et l'instantané courant est conservé.
+        """
+        snapshot = self.read_config()
+        previous, self.snapshot = self.snapshot, snapshot
+        return config_changes(previous, snapshot)
     
     def merge_config(self, default, custom):
         """Fusionne la configuration personnalisée avec celle par défaut"""
@@ -127,88 +1012,2741 @@ class ConfigManager:
             print(f"❌ Erreur lors de la création du fichier de configuration: {e}")
     
     def get(self, key_path, default=None):
-        """Récupère une valeur de configuration par chemin (ex: 'web.port')"""
-        keys = key_path.split('.')
-        value = self.config
-        for key in keys:
-            if isinstance(value, dict) and key in value:
-                value = value[key]
-            else:
-                return default
-        return value
+        """Récupère une valeur de configuration par chemin (ex: 'web.port'); préférer config.snapshot.web.port"""
+        return self.snapshot.flat.get(key_path, default)
 
-class MeshtasticHandler:
-    def __init__(self, config_manager):
-        self.config = config_manager
-        self.interface = None
-        self.device_path = self.config.get('meshtastic.device')
-        self.channel_index = self.config.get('meshtastic.channel_index')
-        self.channel_name = self.config.get('meshtastic.channel_name')
-        self.connect()
+class AlertOutbox:
+    """Journal d'écriture anticipée des alertes: chaque message est persisté avant émission.
     
-    def connect(self):
-        """Connexion au module Meshtastic"""
-        try:
-            self.interface = meshtastic.serial_interface.SerialInterface(self.device_path)
-            logger.info(f"Connexion Meshtastic établie sur {self.device_path}")
-            return True
-        except Exception as e:
-            logger.error(f"Erreur connexion Meshtastic: {e}")
-            return False
+    L'acquittement d'une alerte dont l'ID dérive d'une clé d'idempotence est conservé ack_ttl secondes
+    (max_acks au plus): un renvoi de la même clé après un redémarrage n'est pas réémis.
+    """
+    
+    def __init__(self, path, commit_delay=0.02, compact_size=65536, ack_ttl=86400, max_acks=2000):
+        self.path = path
+        self.commit_delay = commit_delay
+        self.compact_size = compact_size
+        self.ack_ttl = ack_ttl
+        self.max_acks = max_acks
+        self.compacted_size = 0  # Taille du journal au dernier compactage (acquittements conservés)
+        self.entries = OrderedDict()  # alert_id -> enregistrement non acquitté
+        self.acknowledged = OrderedDict()  # alert_id idempotent -> instant d'acquittement, du plus ancien au plus récent
+        self.buffer = []
+        self.seq = 0  # Dernier enregistrement ajouté au tampon
+        self.synced_seq = 0  # Dernier enregistrement traité par le thread d'écriture (synchronisé ou en échec)
+        self.waiters = set()  # Enregistrements dont un appelant attend la synchronisation
+        self.errors = {}  # seq -> erreur d'écriture à remonter à l'appelant en attente
+        self.lock = threading.Condition()
+        self.running = True
+        
+        self.load()
+        self.file = open(self.path, 'ab')
+        self.writer = threading.Thread(target=self.writer_loop, name='outbox-writer', daemon=True)
+        self.writer.start()
+    
+    def load(self):
+        """Relit le journal et reconstruit la liste des alertes non acquittées"""
+        if not os.path.exists(self.path):
+            return
+        
+        with open(self.path, 'rb') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Ligne incomplète (coupure pendant l'écriture): ignorée
+                    logger.warning(f"Enregistrement illisible ignoré dans {self.path}")
+                    continue
+                if record.get('op') == 'add':
+                    self.entries[record['id']] = record
+                elif record.get('op') == 'done':
+                    self.entries.pop(record['id'], None)
+                    if 'ts' in record:
+                        self.acknowledged[record['id']] = record['ts']
+                        self.acknowledged.move_to_end(record['id'])
+        
+        self.trim_acknowledged()
+        self.compact()
+        if self.entries:
+            logger.info(f"📬 {len(self.entries)} alerte(s) non transmise(s) retrouvée(s) dans {self.path}")
     
-    def send_message(self, message):
-        """Envoie un message sur le canal spécifié"""
+    def compact(self):
+        """Réécrit le journal avec les seules alertes en attente et les acquittements conservés (remplacement atomique)"""
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'wb') as f:
+            for alert_id, ts in self.acknowledged.items():
+                f.write(self.encode({'op': 'done', 'id': alert_id, 'ts': ts}))
+            for record in self.entries.values():
+                f.write(self.encode(record))
+            f.flush()
+            os.fsync(f.fileno())
+            self.compacted_size = f.tell()
+        os.replace(temp_path, self.path)
+    
+    def trim_acknowledged(self):
+        """Oublie les acquittements expirés ou en surnombre (verrou détenu)"""
+        limit = time.time() - self.ack_ttl
+        while self.acknowledged and (len(self.acknowledged) > self.max_acks or
+                                     next(iter(self.acknowledged.values())) < limit):
+            self.acknowledged.popitem(last=False)
+    
+    def is_acknowledged(self, alert_id):
+        """Indique si une alerte idempotente a déjà été transmise (y compris avant un redémarrage)"""
+        with self.lock:
+            return alert_id in self.acknowledged
+    
+    def encode(self, record):
+        """Sérialise un enregistrement en une ligne JSON"""
+        return (json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+    
+    def push(self, record):
+        """Place un enregistrement dans le tampon et retourne son numéro (verrou détenu)"""
+        self.buffer.append(self.encode(record))
+        self.seq += 1
+        self.lock.notify_all()
+        return self.seq
+    
+    def wait_synced(self, seq):
+        """Attend que l'enregistrement seq soit synchronisé sur disque; relance l'erreur d'écriture éventuelle"""
+        with self.lock:
+            while self.running and self.synced_seq < seq:
+                self.lock.wait()
+            self.waiters.discard(seq)
+            error = self.errors.pop(seq, None)
+        if error:
+            raise error
+    
+    def add(self, alert_id, message, priority, ts=None, replace=False, idempotent=False):
+        """Persiste un message avant sa transmission (un nouvel ajout du même ID remplace le précédent).
+        
+        Avec replace, le message n'est réécrit que si l'alerte n'est pas encore acquittée; retourne False sinon.
+        idempotent: ID dérivé d'une clé d'idempotence, dont l'acquittement sera conservé.
+        Lève OSError si l'écriture échoue (l'enregistrement précédent reste alors en vigueur).
+        """
+        record = {'op': 'add', 'id': alert_id, 'ts': ts or time.time(), 'priority': priority}
+        # Trame binaire (ou liste de fragments binaires) stockée en base64
+        if isinstance(message, bytes):
+            record['message_b64'] = base64.b64encode(message).decode('ascii')
+        elif isinstance(message, list) and message and isinstance(message[0], bytes):
+            record['message_b64'] = [base64.b64encode(part).decode('ascii') for part in message]
+        else:
+            record['message'] = message
+        # Contrôle et mise en tampon sous le même verrou: un acquittement ne peut pas s'intercaler
+        with self.lock:
+            if replace and alert_id not in self.entries:
+                return False
+            previous = self.entries.get(alert_id)
+            if idempotent or (previous or {}).get('idempotent'):
+                record['idempotent'] = True
+            self.entries[alert_id] = record
+            seq = self.push(record)
+            self.waiters.add(seq)
         try:
-            if not self.interface:
-                if not self.connect():
-                    return False
+            self.wait_synced(seq)
+        except OSError:
+            with self.lock:
+                # Sauf acquittement ou réécriture entre-temps, revenir à l'état présent sur disque
+                if self.entries.get(alert_id) is record:
+                    if previous:
+                        self.entries[alert_id] = previous
+                    else:
+                        del self.entries[alert_id]
+            raise
+        return True
+    
+    @staticmethod
+    def record_message(record):
+        """Message (texte ou trame binaire) d'un enregistrement du journal"""
+        if 'message_b64' in record:
+            if isinstance(record['message_b64'], list):
+                return [base64.b64decode(part) for part in record['message_b64']]
+            return base64.b64decode(record['message_b64'])
+        return record['message']
+    
+    def done(self, alert_id):
+        """Marque une alerte comme transmise"""
+        with self.lock:
+            record = self.entries.pop(alert_id, None)
+            if record is None:
+                return
+            if record.get('idempotent'):
+                ts = time.time()
+                self.acknowledged[alert_id] = ts
+                self.trim_acknowledged()
+                self.push({'op': 'done', 'id': alert_id, 'ts': ts})
+            else:
+                self.push({'op': 'done', 'id': alert_id})
+    
+    def pending_entries(self):
+        """Retourne les alertes non acquittées dans l'ordre d'arrivée"""
+        with self.lock:
+            return list(self.entries.values())
+    
+    def writer_loop(self):
+        """Thread d'écriture: regroupe les enregistrements et ne fait qu'un fsync par lot"""
+        while True:
+            with self.lock:
+                while self.running and not self.buffer:
+                    self.lock.wait()
+                if not self.buffer:
+                    return
             
-            # Vérification finale de la limite de caractères
-            max_length = self.config.get('meshtastic.max_message_length', 200)
-            if len(message) > max_length:
-                logger.error(f"Message trop long pour Meshtastic: {len(message)} caractères (limite: {max_length})")
-                return False
+            # Laisser les écritures concurrentes rejoindre le lot
+            if self.commit_delay:
+                time.sleep(self.commit_delay)
             
-            # Envoie le message sur le canal spécifié
-            self.interface.sendText(message, channelIndex=self.channel_index)
-            logger.info(f"📡 Message envoyé sur canal {self.channel_index} ({self.channel_name})")
-            logger.debug(f"Contenu: {message}")
-            return True
+            with self.lock:
+                batch = self.buffer
+                self.buffer = []
+                seq = self.seq
+            
+            error = start = None
+            try:
+                start = self.file.tell()
+                self.file.write(b''.join(batch))
+                self.file.flush()
+                os.fsync(self.file.fileno())
+            except Exception as e:
+                logger.error(f"Erreur écriture journal {self.path}: {e}")
+                error = e if isinstance(e, OSError) else OSError(str(e))
+                self.discard_partial(start)
+            
+            with self.lock:
+                if error:
+                    # Lot non persisté: chaque appelant en attente reçoit l'erreur
+                    for failed_seq in range(seq - len(batch) + 1, seq + 1):
+                        if failed_seq in self.waiters:
+                            self.errors[failed_seq] = error
+                self.synced_seq = seq
+                self.lock.notify_all()
+                
+                # Compactage quand le journal grossit, tampon vide pour garder l'ordre
+                if not self.buffer and not self.file.closed and self.file.tell() > self.compacted_size + self.compact_size:
+                    try:
+                        self.file.close()
+                        self.trim_acknowledged()
+                        self.compact()
+                    except Exception as e:
+                        logger.error(f"Erreur compactage journal {self.path}: {e}")
+                    self.file = open(self.path, 'ab')
+    
+    def discard_partial(self, size):
+        """Tronque une écriture partielle et rouvre le journal (le tampon d'écriture défaillant est abandonné)"""
+        try:
+            self.file.close()
+        except Exception:
+            pass
+        try:
+            if size is not None:
+                os.truncate(self.path, size)
+            self.file = open(self.path, 'ab')
         except Exception as e:
-            logger.error(f"Erreur envoi message: {e}")
-            return False
+            logger.error(f"Erreur réouverture journal {self.path}: {e}")
     
     def close(self):
-        """Ferme la connexion Meshtastic"""
+        """Vide le tampon et ferme le journal"""
+        with self.lock:
+            self.running = False
+            self.lock.notify_all()
+        self.writer.join(timeout=5)
+        self.file.close()
+
+class AirtimeScheduler:
+    """Ordonnanceur d'émission par priorité avec budget de temps d'antenne (seau à jetons).
+    
+    Les priorités sont les codes numériques de alert_types (1 = la plus urgente).
+    Les alertes qui attendent gagnent un niveau de priorité toutes les aging_seconds
+    pour ne jamais être affamées. Non thread-safe: l'appelant détient le verrou de file.
+    """
+    
+    def __init__(self, duty_cycle=0.1, burst_airtime=10, byte_airtime_ms=7.5,
+                 packet_overhead_ms=300, aging_seconds=60):
+        self.configure(duty_cycle, burst_airtime, byte_airtime_ms, packet_overhead_ms, aging_seconds)
+        self.tokens = burst_airtime
+        self.last_refill = time.monotonic()
+        self.queues = {}  # priorité -> deque de (alert_id, enqueued_at, coût)
+        self.inflight = {}  # alert_id -> (priorité, attente, coût) des émissions en cours
+        self.metrics = {}  # priorité -> statistiques d'attente
+    
+    def configure(self, duty_cycle, burst_airtime, byte_airtime_ms, packet_overhead_ms, aging_seconds):
+        """(Re)définit le budget d'antenne; les alertes déjà en file gardent leur coût estimé"""
+        self.duty_cycle = duty_cycle
+        self.burst_airtime = burst_airtime
+        self.byte_airtime = byte_airtime_ms / 1000.0
+        self.packet_overhead = packet_overhead_ms / 1000.0
+        self.aging_seconds = aging_seconds
+        if hasattr(self, 'tokens'):
+            self.tokens = min(self.tokens, burst_airtime)
+    
+    def __len__(self):
+        return sum(len(queue) for queue in self.queues.values())
+    
+    def airtime(self, message):
+        """Estime le temps d'antenne d'un message ou d'une liste de fragments (secondes)"""
+        if isinstance(message, list):
+            return sum(self.airtime(part) for part in message)
+        size = len(message.encode('utf-8')) if isinstance(message, str) else len(message)
+        return self.packet_overhead + size * self.byte_airtime
+    
+    def push(self, alert_id, priority, cost, enqueued_at=None):
+        """Ajoute une alerte; l'ordre d'arrivée est conservé au sein d'une priorité"""
+        enqueued_at = enqueued_at or time.time()
+        queue = self.queues.setdefault(priority, deque())
+        
+        # Cas courant: ajout en fin; une alerte rejouée reprend sa place d'origine
+        index = len(queue)
+        while index > 0 and queue[index - 1][1] > enqueued_at:
+            index -= 1
+        queue.insert(index, (alert_id, enqueued_at, cost))
+    
+    def drain_time(self):
+        """Durée estimée pour émettre toute la file au rythme permis par le budget d'antenne (secondes)"""
+        self.refill()
+        cost = sum(item[2] for queue in self.queues.values() for item in queue)
+        if not self.duty_cycle:
+            return cost
+        return cost + max(cost - self.tokens, 0) / self.duty_cycle
+    
+    def effective_priority(self, priority, enqueued_at, now):
+        """Priorité corrigée par le vieillissement (plus petit = plus urgent)"""
+        if not self.aging_seconds:
+            return priority
+        return priority - (now - enqueued_at) / self.aging_seconds
+    
+    def refill(self):
+        """Recharge le seau au rythme du rapport cyclique autorisé"""
+        now = time.monotonic()
+        self.tokens = min(self.burst_airtime, self.tokens + (now - self.last_refill) * self.duty_cycle)
+        self.last_refill = now
+    
+    def ordered(self, now=None):
+        """Retourne les alertes en attente dans l'ordre d'émission prévu"""
+        now = now or time.time()
+        items = [(self.effective_priority(priority, enqueued_at, now), priority, enqueued_at, alert_id)
+                 for priority, queue in self.queues.items()
+                 for alert_id, enqueued_at, _ in queue]
+        return [item[3] for item in sorted(items)]
+    
+    def position(self, alert_id):
+        """Position (1 = prochaine émission) d'une alerte en attente, None si absente"""
+        try:
+            return self.ordered().index(alert_id) + 1
+        except ValueError:
+            return None
+    
+    def pop(self):
+        """Retire la prochaine alerte à émettre (à clôturer ensuite par complete()).
+        
+        Retourne (alert_id, None) si elle peut partir, (None, délai) si le budget
+        d'antenne impose d'attendre, (None, None) si la file est vide.
+        Un rapport cyclique nul désactive le budget d'antenne.
+        """
+        now = time.time()
+        best = None
+        for priority, queue in self.queues.items():
+            if not queue:
+                continue
+            # En tête de chaque file: l'alerte la plus ancienne, donc la plus vieillie
+            alert_id, enqueued_at, cost = queue[0]
+            key = (self.effective_priority(priority, enqueued_at, now), priority, enqueued_at)
+            if best is None or key < best[0]:
+                best = (key, priority, cost)
+        
+        if best is None:
+            return None, None
+        
+        _, priority, cost = best
+        if self.duty_cycle:
+            self.refill()
+            needed = min(cost, self.burst_airtime)
+            if self.tokens < needed:
+                return None, (needed - self.tokens) / self.duty_cycle
+            self.tokens -= cost
+        
+        alert_id, enqueued_at, cost = self.queues[priority].popleft()
+        self.inflight[alert_id] = (priority, now - enqueued_at, cost)
+        return alert_id, None
+    
+    def complete(self, alert_id, success):
+        """Clôture une émission: statistiques si transmise, jetons restitués en cas d'échec"""
+        priority, wait, cost = self.inflight.pop(alert_id)
+        if not success:
+            if self.duty_cycle:
+                self.refill()
+                self.tokens = min(self.burst_airtime, self.tokens + cost)
+            return
+        
+        metrics = self.metrics.setdefault(priority, {'sent': 0, 'total_wait': 0.0, 'max_wait': 0.0})
+        metrics['sent'] += 1
+        metrics['total_wait'] += wait
+        metrics['max_wait'] = max(metrics['max_wait'], wait)
+    
+    def stats(self):
+        """Profondeur de file et temps d'attente par priorité"""
+        now = time.time()
+        priorities = {}
+        for priority in sorted(set(self.queues) | set(self.metrics)):
+            queue = self.queues.get(priority, ())
+            metrics = self.metrics.get(priority, {'sent': 0, 'total_wait': 0.0, 'max_wait': 0.0})
+            priorities[str(priority)] = {
+                'depth': len(queue),
+                'oldest_wait': round(now - queue[0][1], 1) if queue else 0,
+                'sent': metrics['sent'],
+                'avg_wait': round(metrics['total_wait'] / metrics['sent'], 1) if metrics['sent'] else 0,
+                'max_wait': round(metrics['max_wait'], 1)
+            }
+        
+        self.refill()
+        return {
+            'depth': len(self),
+            'airtime_budget': round(self.tokens, 2),
+            'priorities': priorities
+        }
+
+DISCOVERY_PATTERNS = ['/dev/ttyUSB*', '/dev/ttyACM*']
+TCP_PREFIX = 'tcp://'
+TCP_DEFAULT_PORT = 4403
+RADIO_STATE_TOPIC = 'gardia.radio.state'  # Sujet pubsub des changements d'état des radios
+
+RADIO_STATES = {
+    'connected': 'Connectée',
+    'connecting': 'Connexion en cours',
+    'waiting': 'Nouvel essai programmé',
+    'absent': 'Débranchée',
+    'disconnected': 'Déconnectée'
+}
+
+# État global du pool: (statut /health, libellé de l'administration)
+CONNECTION_STATES = {
+    'connected': ('OK', 'Connecté'),
+    'degraded': ('DEGRADED', 'Connecté (radios en panne)'),
+    'connecting': ('CONNECTING', 'Connexion en cours'),
+    'disconnected': ('ERROR', 'Déconnecté')
+}
+
+class RadioDevice:
+    """Une radio Meshtastic du pool (série ou TCP) et son état de santé"""
+    
+    def __init__(self, path, discovered=False):
+        self.path = path
+        self.discovered = discovered  # Trouvée par sondage plutôt que déclarée en configuration
+        self.interface = None
+        self.in_flight = 0
+        self.sent = 0
+        self.failures = 0
+        self.consecutive_failures = 0  # Base du recul exponentiel, remise à zéro à la connexion
+        self.last_error = None
+        self.retry_at = 0
+        self.connecting = False
+        self.was_absent = False
+        self.send_lock = threading.Lock()  # Un seul envoi à la fois sur un même lien
+    
+    @property
+    def is_tcp(self):
+        return self.path.startswith(TCP_PREFIX)
+    
+    def is_present(self):
+        """Un port série n'existe que si la radio est branchée; un nœud TCP est toujours candidat"""
+        return self.is_tcp or os.path.exists(self.path)
+    
+    def state(self, now=None):
+        """État courant (clé de RADIO_STATES)"""
         if self.interface:
-            self.interface.close()
-            logger.info("Connexion Meshtastic fermée")
+            return 'connected'
+        if self.connecting:
+            return 'connecting'
+        if not self.is_present():
+            return 'absent'
+        if self.retry_at > (now or time.time()):
+            return 'waiting'
+        return 'disconnected'
+    
+    def open_interface(self):
+        """Ouvre la connexion (bloquant jusqu'à la réception de la configuration du nœud)"""
+        if self.is_tcp:
+            host, _, port = self.path[len(TCP_PREFIX):].partition(':')
+            return meshtastic.tcp_interface.TCPInterface(host, portNumber=int(port or TCP_DEFAULT_PORT))
+        return meshtastic.serial_interface.SerialInterface(self.path)
+    
+    def status(self):
+        """État exposé par /health"""
+        now = time.time()
+        state = self.state(now)
+        return {
+            'device': self.path,
+            'state': state,
+            'connected': state == 'connected',
+            'retry_in': round(self.retry_at - now, 1) if state == 'waiting' else None,
+            'in_flight': self.in_flight,
+            'sent': self.sent,
+            'failures': self.failures,
+            'last_error': self.last_error
+        }
 
-class EmergencyApp:
-    def __init__(self, config_file='config.yaml'):
-        self.config = ConfigManager(config_file)
-        self.config_file = config_file
-        self.setup_logging()
-        self.meshtastic_handler = MeshtasticHandler(self.config)
-        self.app = Bottle()
-        self.admin_sessions = {}  # Sessions d'administration actives
-        self.setup_routes()
+class RadioPool:
+    """Pool de radios: routage vers la moins chargée des radios saines et bascule en cas de panne.
+    
+    Les connexions sont ouvertes par connect(), appelée par le thread superviseur du gestionnaire;
+    chaque changement d'état est publié sur le sujet pubsub RADIO_STATE_TOPIC.
+    """
+    
+    def __init__(self, paths, discover=False, discover_timeout=20, cooldown=30, max_backoff=300):
+        self.lock = threading.Lock()
+        self.discover = discover
+        self.discover_timeout = discover_timeout
+        self.cooldown = cooldown
+        self.max_backoff = max_backoff
+        self.devices = [RadioDevice(path) for path in paths]
+        self.ignored = set()  # Ports découverts sans radio Meshtastic, ignorés jusqu'à leur débranchement
+        self.rescan()
+    
+    @staticmethod
+    def discover_devices():
+        """Ports série candidats (adaptateurs USB et CDC-ACM)"""
+        paths = []
+        for pattern in DISCOVERY_PATTERNS:
+            paths.extend(sorted(glob.glob(pattern)))
+        return paths
+    
+    @property
+    def interface(self):
+        """Première interface connectée (compatibilité avec le fonctionnement à radio unique)"""
+        for device in self.devices:
+            if device.interface:
+                return device.interface
+        return None
+    
+    def connected_count(self):
+        """Nombre de radios actuellement connectées"""
+        return sum(1 for device in self.devices if device.interface)
+    
+    def publish(self, device, state):
+        """Diffuse un changement d'état de radio aux abonnés pubsub"""
+        try:
+            pub.sendMessage(RADIO_STATE_TOPIC, device=device.path, state=state)
+        except Exception as e:
+            logger.error(f"Erreur de diffusion de l'état de {device.path}: {e}")
+    
+    def schedule_retry(self, device, error):
+        """Programme le prochain essai avec un recul exponentiel (verrou détenu); retourne le délai"""
+        device.failures += 1
+        device.consecutive_failures += 1
+        device.last_error = error
+        delay = min(self.cooldown * 2 ** (device.consecutive_failures - 1), self.max_backoff)
+        device.retry_at = time.time() + delay
+        return delay
+    
+    def rescan(self):
+        """Suit les branchements à chaud: nouveaux ports découverts, radios rebranchées ou débranchées"""
+        lost = []
+        added = []
+        with self.lock:
+            for device in self.devices:
+                present = device.is_present()
+                if not present and device.interface:
+                    # Radio débranchée: l'interface ne sert plus à rien
+                    lost.append((device, device.interface))
+                    device.interface = None
+                    self.schedule_retry(device, 'Radio débranchée')
+                elif present and not device.interface and device.was_absent:
+                    # Radio rebranchée: nouvel essai immédiat, sans attendre la fin du recul
+                    device.retry_at = 0
+                    device.consecutive_failures = 0
+                device.was_absent = not present
+            
+            if self.discover:
+                known = {os.path.realpath(device.path) for device in self.devices if not device.is_tcp}
+                candidates = {os.path.realpath(path): path for path in self.discover_devices()}
+                # Un port rejeté puis débranché sera de nouveau sondé à son retour
+                self.ignored &= set(candidates)
+                for realpath, path in candidates.items():
+                    if realpath not in known and realpath not in self.ignored:
+                        device = RadioDevice(path, discovered=True)
+                        self.devices.append(device)
+                        added.append(device)
+        
+        for device, interface in lost:
+            logger.warning(f"🔌 Radio {device.path} débranchée")
+            self.close_interface(interface)
+            self.publish(device, 'absent')
+        for device in added:
+            logger.info(f"🔌 Port {device.path} détecté")
+        return bool(lost or added)
+    
+    def reconnect_due(self):
+        """Indique si une radio déconnectée doit être (re)connectée maintenant"""
+        now = time.time()
+        with self.lock:
+            return any(device.state(now) == 'disconnected' for device in self.devices)
+    
+    def next_retry_delay(self, default):
+        """Délai avant le prochain essai de connexion programmé (au plus default)"""
+        now = time.time()
+        with self.lock:
+            delays = [device.retry_at - now for device in self.devices if device.state(now) == 'waiting']
+        return max(min(delays + [default]), 0)
+    
+    def open_device(self, device):
+        """Tente d'ouvrir une radio (exécuté dans un thread de sonde)"""
+        try:
+            interface = device.open_interface()
+        except Exception as e:
+            with self.lock:
+                device.connecting = False
+                # Un port découvert qui n'a jamais répondu n'est pas une radio Meshtastic: on l'oublie
+                if device.discovered and device in self.devices:
+                    self.devices.remove(device)
+                    self.ignored.add(os.path.realpath(device.path))
+                    logger.info(f"Port {device.path} ignoré (aucune radio Meshtastic)")
+                    return
+                delay = self.schedule_retry(device, str(e))
+            logger.error(f"Erreur connexion Meshtastic sur {device.path}: {e} (nouvel essai dans {delay:.0f}s)")
+            self.publish(device, 'waiting')
+            return
+        
+        with self.lock:
+            device.connecting = False
+            if device not in self.devices:
+                # Radio retirée de la configuration pendant la sonde
+                self.close_interface(interface)
+                return
+            device.discovered = False  # Radio confirmée: conservée même si elle décroche
+            device.interface = interface
+            device.consecutive_failures = 0
+            device.last_error = None
+        logger.info(f"Connexion Meshtastic établie sur {device.path}")
+        self.publish(device, 'connected')
+    
+    def connect(self):
+        """Ouvre en parallèle les radios déconnectées dont le délai d'attente est échu.
+        
+        Retourne True si au moins une radio est connectée. Une sonde plus lente que discover_timeout
+        continue en arrière-plan: la radio rejoint le pool dès que sa connexion aboutit.
+        """
+        now = time.time()
+        with self.lock:
+            candidates = [device for device in self.devices if device.state(now) == 'disconnected']
+            for device in candidates:
+                device.connecting = True
+        
+        probes = [threading.Thread(target=self.open_device, args=(device,), name=f'radio-probe-{device.path}',
+                                   daemon=True) for device in candidates]
+        for probe in probes:
+            probe.start()
+        deadline = time.time() + self.discover_timeout
+        for probe in probes:
+            probe.join(max(deadline - time.time(), 0))
+        
+        return self.connected_count() > 0
+    
+    def acquire(self, exclude=()):
+        """Réserve la radio saine la moins chargée (None si aucune n'est disponible)"""
+        with self.lock:
+            healthy = [device for device in self.devices if device.interface and device not in exclude]
+            if not healthy:
+                return None
+            device = min(healthy, key=lambda candidate: (candidate.in_flight, candidate.sent))
+            device.in_flight += 1
+            return device
+    
+    def release(self, device, success, error=None):
+        """Libère une radio; en cas d'échec elle est déconnectée et mise à l'écart"""
+        interface = None
+        retired = None
+        with self.lock:
+            device.in_flight -= 1
+            if success:
+                device.sent += 1
+                if device.interface and not device.in_flight and device not in self.devices:
+                    # Dernier envoi d'une radio retirée de la configuration
+                    retired, device.interface = device.interface, None
+            elif device.interface:
+                interface, device.interface = device.interface, None
+                delay = self.schedule_retry(device, error)
+        
+        if retired:
+            self.close_interface(retired)
+        if interface:
+            logger.warning(f"Radio {device.path} mise à l'écart pour {delay:.0f}s: {error}")
+            self.close_interface(interface)
+            self.publish(device, 'waiting')
+    
+    def interface_lost(self, interface):
+        """Lien perdu signalé par la bibliothèque Meshtastic"""
+        with self.lock:
+            device = next((device for device in self.devices if device.interface is interface), None)
+            if not device:
+                return
+            device.interface = None
+            delay = self.schedule_retry(device, 'Connexion perdue')
+        logger.warning(f"Connexion Meshtastic perdue sur {device.path} (nouvel essai dans {delay:.0f}s)")
+        self.close_interface(interface)
+        self.publish(device, 'waiting')
+    
+    @staticmethod
+    def close_interface(interface):
+        """Ferme une interface en ignorant les erreurs d'un lien déjà rompu"""
+        try:
+            interface.close()
+        except Exception:
+            pass
+    
+    def reconfigure(self, paths, discover, discover_timeout, cooldown, max_backoff):
+        """Applique une nouvelle liste de radios: les radios conservées gardent leur connexion.
+        
+        Une radio retirée quitte le pool aussitôt; son lien est fermé dès qu'aucun envoi n'est en cours.
+        """
+        closing = []
+        with self.lock:
+            self.discover = discover
+            self.discover_timeout = discover_timeout
+            self.cooldown = cooldown
+            self.max_backoff = max_backoff
+            
+            current = {device.path: device for device in self.devices}
+            devices = [current.pop(path, None) or RadioDevice(path) for path in dict.fromkeys(paths)]
+            # Les ports découverts restent dans le pool tant que le sondage est actif
+            devices += [device for device in current.values() if device.discovered and discover]
+            removed = [device for device in current.values() if device not in devices]
+            self.devices = devices
+            
+            for device in removed:
+                if device.interface and not device.in_flight:
+                    closing.append(device.interface)
+                    device.interface = None
+        
+        for interface in closing:
+            self.close_interface(interface)
+        for device in removed:
+            logger.info(f"📻 Radio {device.path} retirée du pool")
+        return removed
+    
+    def status(self):
+        """État de chaque radio du pool"""
+        with self.lock:
+            return [device.status() for device in self.devices]
+    
+    def close(self):
+        """Ferme toutes les radios connectées"""
+        with self.lock:
+            interfaces = [device.interface for device in self.devices if device.interface]
+            for device in self.devices:
+                device.interface = None
+        for interface in interfaces:
+            self.close_interface(interface)
+        return len(interfaces)
+
+class MeshtasticHandler:
+    def __init__(self, config_manager):
+        self.config = config_manager
+        self.load_settings()
+        
+        # File d'émission vidée par un thread dédié à la radio
+        self.scheduler = AirtimeScheduler(
+            self.config.get('scheduler.duty_cycle', 0.1),
+            self.config.get('scheduler.burst_airtime', 10),
+            self.config.get('scheduler.byte_airtime_ms', 7.5),
+            self.config.get('scheduler.packet_overhead_ms', 300),
+            self.config.get('scheduler.aging_seconds', 60))
+        self.alerts = OrderedDict()  # alert_id -> état de transmission
+        self.reserved = set()  # IDs dont la place en file est réservée, en cours de journalisation
+        self.queue_lock = threading.Condition()
+        self.running = True
+        
+        # Journal persistant: rejoue les alertes non transmises avant un arrêt
+        self.outbox = None
+        if self.config.get('outbox.enabled', True):
+            try:
+                self.outbox = AlertOutbox(self.config.get('outbox.file', './outbox.journal'),
+                                          self.config.get('outbox.commit_delay', 0.02),
+                                          self.config.get('outbox.compact_size', 65536),
+                                          self.config.get('web.idempotency_ttl', 86400),
+                                          self.config.get('web.idempotency_max_keys', 2000))
+                self.restore_outbox()
+            except Exception as e:
+                logger.error(f"Journal des alertes indisponible: {e}")
+                self.outbox = None
+        
+        # Pool de radios: un thread d'émission par radio pour les exploiter en parallèle
+        self.pool = RadioPool(self.config.get('meshtastic.devices') or [self.device_path],
+                              self.config.get('meshtastic.discover', False),
+                              self.config.get('meshtastic.discover_timeout', 20),
+                              self.config.get('meshtastic.device_cooldown', 30),
+                              self.config.get('meshtastic.max_backoff', 300))
+        self.supervisor_wakeup = threading.Event()
+        pub.subscribe(self.on_radio_state, RADIO_STATE_TOPIC)
+        pub.subscribe(self.on_connection_lost, 'meshtastic.connection.lost')
+        
+        # Les connexions sont ouvertes en arrière-plan: le serveur web démarre sans attendre la radio
+        self.supervisor = threading.Thread(target=self.supervise, name='radio-supervisor', daemon=True)
+        self.supervisor.start()
+        self.workers = [threading.Thread(target=self.radio_worker, name=f'radio-worker-{index}', daemon=True)
+                        for index in range(max(len(self.pool.devices), 1))]
+        for worker in self.workers:
+            worker.start()
+    
+    def load_settings(self):
+        """Paramètres lus à chaque émission, relus lors d'un rechargement de la configuration"""
+        self.device_path = self.config.get('meshtastic.device')
+        self.channel_index = self.config.get('meshtastic.channel_index')
+        self.channel_name = self.config.get('meshtastic.channel_name')
+        self.binary_port = self.config.get('meshtastic.binary_port', 256)
+        self.fragment_delay = self.config.get('meshtastic.fragment_delay', 2)
+        self.queue_size = self.config.get('meshtastic.queue_size', 50)
+        self.history_size = self.config.get('meshtastic.history_size', 200)
+        self.retry_interval = self.config.get('outbox.retry_interval', 30)
+        self.hotplug_interval = self.config.get('meshtastic.hotplug_interval', 5)
+    
+    def reconfigure(self, changed):
+        """Applique une configuration rechargée sans couper les radios ni perdre les alertes en file"""
+        self.load_settings()
+        
+        if any(path.startswith('scheduler.') for path in changed):
+            with self.queue_lock:
+                self.scheduler.configure(self.config.get('scheduler.duty_cycle', 0.1),
+                                         self.config.get('scheduler.burst_airtime', 10),
+                                         self.config.get('scheduler.byte_airtime_ms', 7.5),
+                                         self.config.get('scheduler.packet_overhead_ms', 300),
+                                         self.config.get('scheduler.aging_seconds', 60))
+                self.queue_lock.notify_all()
+        
+        radio_keys = ('meshtastic.device', 'meshtastic.discover', 'meshtastic.discover_timeout',
+                      'meshtastic.device_cooldown', 'meshtastic.max_backoff')
+        if any(path in radio_keys or path.startswith('meshtastic.devices') for path in changed):
+            self.pool.reconfigure(self.config.get('meshtastic.devices') or [self.device_path],
+                                  self.config.get('meshtastic.discover', False),
+                                  self.config.get('meshtastic.discover_timeout', 20),
+                                  self.config.get('meshtastic.device_cooldown', 30),
+                                  self.config.get('meshtastic.max_backoff', 300))
+            # Un thread d'émission par radio: complété si le pool s'agrandit
+            while len(self.workers) < len(self.pool.devices):
+                worker = threading.Thread(target=self.radio_worker, name=f'radio-worker-{len(self.workers)}', daemon=True)
+                self.workers.append(worker)
+                worker.start()
+        
+        # Le superviseur reprend en compte les nouvelles radios et les nouveaux délais
+        self.supervisor_wakeup.set()
+    
+    @property
+    def interface(self):
+        """Interface de la première radio connectée (None si aucune)"""
+        return self.pool.interface
+    
+    def connect(self):
+        """Connexion aux modules Meshtastic du pool dont le délai d'attente est échu"""
+        if not self.pool.connect():
+            logger.error(f"Aucune radio Meshtastic disponible "
+                         f"(prochain essai dans {self.pool.next_retry_delay(self.pool.max_backoff):.0f}s)")
+            return False
+        return True
+    
+    def supervise(self):
+        """Thread superviseur: connexion, reconnexion avec recul exponentiel et suivi des branchements USB"""
+        while self.running:
+            try:
+                self.pool.rescan()
+                if self.pool.reconnect_due():
+                    self.connect()
+            except Exception as e:
+                logger.error(f"Erreur du superviseur radio: {e}")
+            self.supervisor_wakeup.wait(self.pool.next_retry_delay(self.hotplug_interval))
+            self.supervisor_wakeup.clear()
+    
+    def on_radio_state(self, device, state):
+        """Abonné pubsub: reprend la file et réémet les alertes en échec dès qu'une radio se connecte"""
+        if state == 'connected':
+            self.replay_failed()
+            with self.queue_lock:
+                self.queue_lock.notify_all()
+        else:
+            self.supervisor_wakeup.set()
+    
+    def on_connection_lost(self, interface):
+        """Abonné pubsub: lien rompu détecté par la bibliothèque Meshtastic"""
+        self.pool.interface_lost(interface)
+    
+    def connection_state(self):
+        """État global des radios: connected, degraded, connecting ou disconnected"""
+        radios = self.pool.status()
+        connected = sum(1 for radio in radios if radio['connected'])
+        if radios and connected == len(radios):
+            return 'connected'
+        if connected:
+            return 'degraded'
+        # Connexion en cours, ou premier essai pas encore tenté
+        if any(radio['state'] == 'connecting' or (radio['state'] == 'disconnected' and not radio['failures'])
+               for radio in radios):
+            return 'connecting'
+        return 'disconnected'
+    
+    def send_message(self, message, device):
+        """Envoie un message sur le canal spécifié via une radio du pool (exception si la radio échoue)"""
+        with device.send_lock:
+            if isinstance(message, bytes):
+                device.interface.sendData(message, portNum=self.binary_port, channelIndex=self.channel_index)
+            else:
+                device.interface.sendText(message, channelIndex=self.channel_index)
+        logger.info(f"📡 Message envoyé sur canal {self.channel_index} ({self.channel_name}) via {device.path}")
+        logger.debug(f"Contenu: {message.hex() if isinstance(message, bytes) else message}")
+    
+    def transmit(self, message):
+        """Transmet un message, ou ses fragments dans l'ordre en les espaçant.
+        
+        Si la radio choisie échoue, la transmission reprend au paquet en cours sur la radio saine suivante.
+        """
+        packets = message if isinstance(message, list) else [message]
+        
+        # Vérification finale de la limite, en octets: c'est la taille du paquet LoRa qui compte
+        max_length = self.config.snapshot.max_message_length
+        for packet in packets:
+            size = len(packet) if isinstance(packet, bytes) else len(packet.encode('utf-8'))
+            if size > max_length:
+                logger.error(f"Message trop long pour Meshtastic: {size} octets (limite: {max_length})")
+                return False
+        
+        index = 0
+        tried = []
+        while index < len(packets):
+            device = self.pool.acquire(exclude=tried)
+            if not device:
+                # Pas de reconnexion ici: le superviseur s'en charge et réémettra l'alerte
+                logger.error("Aucune radio Meshtastic connectée pour l'émission")
+                return False
+            if tried:
+                logger.warning(f"🔀 Bascule sur la radio {device.path}")
+            
+            error = None
+            try:
+                while index < len(packets):
+                    if index and self.fragment_delay:
+                        time.sleep(self.fragment_delay)
+                    self.send_message(packets[index], device)
+                    index += 1
+            except Exception as e:
+                error = str(e)
+                logger.error(f"Erreur envoi message sur {device.path}: {e}")
+                if len(packets) > 1:
+                    logger.error(f"Échec du fragment {index + 1}/{len(packets)}")
+            finally:
+                self.pool.release(device, error is None, error)
+            tried.append(device)
+        return True
+    
+    def enqueue_message(self, message, priority=3, alert_id=None, idempotent=False):
+        """Place un message dans la file d'émission et retourne l'ID de l'alerte (None si file pleine).
+        
+        La priorité est le code numérique du type d'alerte (1 = la plus urgente). Un alert_id imposé
+        (dérivé d'une clé d'idempotence) déjà connu n'est pas remis en file: pas de double émission.
+        La place en file et l'ID sont réservés avant la journalisation, faite hors verrou.
+        Lève OSError si le journal ne peut pas être écrit: l'alerte n'est alors pas mise en file.
+        """
+        with self.queue_lock:
+            # Même ID en cours de journalisation par une requête concurrente: attendre son issue
+            while alert_id in self.reserved:
+                self.queue_lock.wait()
+            if alert_id and self.is_known(alert_id):
+                logger.info("Alerte %s déjà enregistrée, soumission répétée ignorée", alert_id, extra=alert_context(alert_id))
+                return alert_id
+            
+            if len(self.scheduler) + len(self.reserved) >= self.queue_size:
+                logger.error(f"File d'émission pleine ({self.queue_size} alertes), message refusé")
+                return None
+            
+            alert_id = alert_id or self.new_alert_id()
+            self.reserved.add(alert_id)
+        
+        # Persistance avant émission (hors verrou de file, le fsync est groupé)
+        if self.outbox:
+            try:
+                self.outbox.add(alert_id, message, priority, idempotent=idempotent)
+            except OSError as e:
+                logger.error("Impossible de journaliser l'alerte %s: %s", alert_id, e, extra=alert_context(alert_id))
+                with self.queue_lock:
+                    self.reserved.discard(alert_id)
+                    self.queue_lock.notify_all()
+                raise
+        
+        with self.queue_lock:
+            self.reserved.discard(alert_id)
+            self.queue_alert(alert_id, message, priority, time.time())
+            position = self.scheduler.position(alert_id)
+            self.prune_history()
+            self.queue_lock.notify_all()  # Threads radio et requêtes en attente du même ID
+        
+        logger.info("Alerte %s (priorité %s) mise en file d'émission (position %s)", alert_id, priority, position,
+                    extra=alert_context(alert_id))
+        return alert_id
+    
+    @staticmethod
+    def new_alert_id():
+        """Nouvel identifiant d'alerte (12 caractères hexadécimaux)"""
+        return uuid.uuid4().hex[:12]
+    
+    def queue_alert(self, alert_id, message, priority, queued_at):
+        """Enregistre l'état d'une alerte et la confie à l'ordonnanceur (verrou de file détenu)"""
+        self.alerts[alert_id] = {
+            'id': alert_id,
+            'state': 'queued',
+            'message': message,
+            'priority': priority,
+            'queued_at': queued_at,
+            'sent_at': None
+        }
+        self.scheduler.push(alert_id, priority, self.scheduler.airtime(message), queued_at)
+    
+    def is_known(self, alert_id):
+        """Alerte en mémoire, ou transmise avant un redémarrage (ID idempotent acquitté dans le journal)"""
+        return alert_id in self.alerts or bool(self.outbox and self.outbox.is_acknowledged(alert_id))
+    
+    def restore_outbox(self):
+        """Remet en file les alertes non acquittées du journal, dans leur ordre d'origine"""
+        with self.queue_lock:
+            # Alertes idempotentes déjà transmises: leur état reste consultable après le redémarrage
+            for alert_id, ts in self.outbox.acknowledged.items():
+                self.alerts[alert_id] = {'id': alert_id, 'state': 'sent', 'message': None, 'priority': None,
+                                         'queued_at': ts, 'sent_at': ts}
+            for record in self.outbox.pending_entries():
+                self.queue_alert(record['id'], AlertOutbox.record_message(record), record.get('priority', 3), record['ts'])
+            self.queue_lock.notify()
+    
+    def replay_failed(self):
+        """Remet en file les alertes en échec (message conservé en mémoire, identique à celui du journal)"""
+        with self.queue_lock:
+            failed = [alert for alert in self.alerts.values() if alert['state'] == 'failed']
+            # Les alertes reprennent leur ancienneté: le vieillissement joue en leur faveur
+            for alert in failed:
+                self.queue_alert(alert['id'], alert['message'], alert['priority'], alert['queued_at'])
+            if failed:
+                self.queue_lock.notify_all()
+        
+        if failed:
+            logger.info(f"🔁 {len(failed)} alerte(s) en échec remise(s) en file d'émission")
+        return len(failed)
+    
+    def has_failed_alerts(self):
+        """Indique si des alertes attendent une réémission"""
+        with self.queue_lock:
+            return any(alert['state'] == 'failed' for alert in self.alerts.values())
+    
+    def prune_history(self):
+        """Oublie les alertes terminées les plus anciennes au-delà de la taille d'historique"""
+        excess = len(self.alerts) - self.history_size
+        if excess <= 0:
+            return
+        for alert_id in list(self.alerts):
+            if excess <= 0:
+                break
+            # Les alertes en échec sont conservées jusqu'à leur réémission, journal actif ou non
+            if self.alerts[alert_id]['state'] == 'sent':
+                del self.alerts[alert_id]
+                excess -= 1
+    
+    def update_message(self, alert_id, message):
+        """Remplace le message d'une alerte non encore transmise (en file, en échec ou en attente de réémission).
+        
+        Retourne False si l'alerte est déjà transmise. Une émission en cours part avec l'ancien message;
+        en cas d'échec, la réémission reprend le message mémorisé, donc le nouveau.
+        """
+        with self.queue_lock:
+            alert = self.alerts.get(alert_id)
+            if not alert or alert['state'] == 'sent':
+                return False
+            # Le coût d'antenne estimé à la mise en file est conservé (quelques octets d'écart)
+            alert['message'] = message
+            priority, queued_at = alert['priority'], alert['queued_at']
+        
+        # Journal réécrit hors du verrou de file (fsync): refusé si l'alerte a été acquittée entre-temps
+        if self.outbox:
+            try:
+                return self.outbox.add(alert_id, message, priority, queued_at, replace=True)
+            except OSError as e:
+                # L'alerte reste journalisée avec son message précédent; seule la mise à jour est perdue au redémarrage
+                logger.error("Impossible de journaliser la mise à jour de l'alerte %s: %s", alert_id, e,
+                             extra=alert_context(alert_id))
+        return True
+    
+    def get_alert_status(self, alert_id):
+        """Retourne l'état de transmission d'une alerte (None si inconnue)"""
+        with self.queue_lock:
+            alert = self.alerts.get(alert_id)
+            if not alert:
+                return None
+            
+            position = None
+            if alert['state'] == 'queued':
+                position = self.scheduler.position(alert_id)
+            
+            return {
+                'alert_id': alert_id,
+                'state': alert['state'],
+                'state_label': ALERT_STATES[alert['state']],
+                'queue_position': position,
+                'queue_length': len(self.scheduler),
+                'priority': alert['priority'],
+                'queued_at': alert['queued_at'],
+                'sent_at': alert['sent_at']
+            }
+    
+    def backlog(self):
+        """(alertes en file, délai estimé d'écoulement en secondes)"""
+        with self.queue_lock:
+            return len(self.scheduler), self.scheduler.drain_time()
+    
+    def get_scheduler_stats(self):
+        """Statistiques de l'ordonnanceur (profondeur et attentes par priorité)"""
+        with self.queue_lock:
+            return self.scheduler.stats()
+    
+    def radio_worker(self):
+        """Thread radio: transmet les messages dans l'ordre fixé par l'ordonnanceur"""
+        while True:
+            timed_out = False
+            with self.queue_lock:
+                if not self.running:
+                    return
+                if not self.pool.connected_count():
+                    # Aucune radio: les alertes restent en file jusqu'à la connexion (événement 'connected')
+                    self.queue_lock.wait(self.retry_interval)
+                    continue
+                alert_id, delay = self.scheduler.pop()
+                if alert_id is None:
+                    # File vide, ou budget d'antenne épuisé: attendre la recharge du seau
+                    timed_out = not self.queue_lock.wait(delay if delay is not None else self.retry_interval)
+                    timed_out = timed_out and delay is None
+                else:
+                    alert = self.alerts[alert_id]
+                    alert['state'] = 'sending'
+            
+            if alert_id is None:
+                # File restée vide: retenter périodiquement les alertes en échec
+                if timed_out and self.pool.connected_count() and self.has_failed_alerts():
+                    self.replay_failed()
+                continue
+            
+            success = False
+            try:
+                success = self.transmit(alert['message'])
+            except Exception as e:
+                logger.error("Exception lors de l'envoi de l'alerte %s: %s", alert_id, e, extra=alert_context(alert_id))
+            
+            with self.queue_lock:
+                self.scheduler.complete(alert_id, success)
+                alert['state'] = 'sent' if success else 'failed'
+                alert['sent_at'] = time.time() if success else None
+            
+            if success:
+                if self.outbox:
+                    self.outbox.done(alert_id)
+                logger.info("✅ Alerte %s transmise", alert_id, extra=alert_context(alert_id))
+            else:
+                logger.error("❌ Échec de transmission de l'alerte %s", alert_id, extra=alert_context(alert_id))
+    
+    def close(self):
+        """Arrête le thread radio et ferme la connexion Meshtastic"""
+        with self.queue_lock:
+            self.running = False
+            self.queue_lock.notify_all()
+        self.supervisor_wakeup.set()
+        for worker in self.workers:
+            worker.join(timeout=5)
+        self.supervisor.join(timeout=5)
+        pub.unsubscribe(self.on_radio_state, RADIO_STATE_TOPIC)
+        pub.unsubscribe(self.on_connection_lost, 'meshtastic.connection.lost')
+        
+        if self.outbox:
+            self.outbox.close()
+        
+        if self.pool.close():
+            logger.info("Connexion Meshtastic fermée")
+
+# === DÉDOUBLONNAGE DES ALERTES ===
+
+# Abréviations courantes des types de voie, ramenées à une forme unique
+STREET_ABBREVIATIONS = {
+    'r': 'rue', 'av': 'avenue', 'ave': 'avenue', 'bd': 'boulevard', 'bld': 'boulevard', 'blvd': 'boulevard',
+    'pl': 'place', 'ch': 'chemin', 'che': 'chemin', 'imp': 'impasse', 'all': 'allee', 'rte': 'route',
+    'qu': 'quai', 'res': 'residence', 'fg': 'faubourg', 'st': 'saint', 'ste': 'sainte'
+}
+
+# Longueur maximale d'un numéro saisi (espaces, points et indicatif compris): il n'est jamais tronqué
+MAX_PHONE_LENGTH = 32
+
+def normalize_phone(telephone):
+    """Chiffres seuls, indicatif international +33 ramené au 0 national"""
+    digits = re.sub(r'\D', '', telephone)
+    if digits.startswith('0033'):
+        digits = '0' + digits[4:]
+    elif digits.startswith('33') and len(digits) == 11:
+        digits = '0' + digits[2:]
+    return digits
+
+def normalize_address(adresse):
+    """Minuscules sans accents ni ponctuation, abréviations de voie développées"""
+    text = unicodedata.normalize('NFKD', adresse.lower())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(STREET_ABBREVIATIONS.get(word, word) for word in re.findall(r'[a-z0-9]+', text))
+
+class DuplicateIndex:
+    """Sinistres signalés récemment, indexés par adresse et type normalisés (fenêtre glissante).
+    
+    Même téléphone: nouvel envoi du même signalement (double appui). Autre téléphone: nouveau témoin
+    du même sinistre, compté dans l'alerte existante. Non thread-safe: l'appelant détient lock.
+    Un sinistre est enregistré (pending) avant la mise en file de son alerte, hors verrou: les
+    signalements concurrents du même sinistre attendent son issue sur la condition lock.
+    """
+    
+    def __init__(self, window=600):
+        self.window = window
+        self.incidents = OrderedDict()  # (adresse, type) -> sinistre, du moins au plus récemment signalé
+        self.lock = threading.Condition()
+        self.counters = {'duplicates': 0, 'merged': 0}
+    
+    @staticmethod
+    def key(fields, type_code):
+        """Clé du sinistre (None si l'adresse ne contient rien d'exploitable)"""
+        address = normalize_address(fields['adresse'])
+        return (address, type_code) if address else None
+    
+    def find(self, key, now):
+        """Sinistre signalé dans la fenêtre pour cette clé, ou None"""
+        while self.incidents:
+            oldest = next(iter(self.incidents))
+            if self.incidents[oldest]['last_seen'] > now - self.window:
+                break
+            del self.incidents[oldest]
+        return self.incidents.get(key)
+    
+    def add(self, key, alert_id, fields, phone, now):
+        """Enregistre un sinistre dont l'alerte est en cours de mise en file (pending)"""
+        incident = {'alert_id': alert_id, 'fields': fields, 'phones': {phone}, 'reports': 1, 'truncated': False,
+                    'last_seen': now, 'pending': True, 'lock': threading.Lock()}
+        self.incidents[key] = incident
+        return incident
+    
+    def settle(self, key, incident, truncated):
+        """Issue de la mise en file: sinistre confirmé (truncated) ou oublié (None); réveille les signalements en attente"""
+        if truncated is None:
+            if self.incidents.get(key) is incident:
+                del self.incidents[key]
+        else:
+            incident['pending'] = False
+            incident['truncated'] = truncated
+        self.lock.notify_all()
+    
+    def touch(self, key, incident, now):
+        incident['last_seen'] = now
+        if self.incidents.get(key) is incident:
+            self.incidents.move_to_end(key)
+    
+    def stats(self):
+        return dict(self.counters, incidents=len(self.incidents), window=self.window)
+
+# === PAGES D'ADMINISTRATION ===
+# Parties statiques rendues une fois; {{...}} marque les valeurs substituées (voir PageTemplate)
+
+ADMIN_LOGIN_PAGE = """\
+<!DOCTYPE html>
+<html>
+<head>
+    <title>Administration - Gaulix Alerte Réseau D'urgence Intervention Assistée Meshtastic - GARDIA-M</title>
+    <meta charset="utf-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1">
+    <style>
+        body {
+            font-family: Arial, sans-serif;
+            background-color: #f5f5f5;
+            display: flex;
+            justify-content: center;
+            align-items: center;
+            min-height: 100vh;
+            margin: 0;
+        }
+        .login-container {
+            background: white;
+            padding: 40px;
+            border-radius: 10px;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+            width: 100%;
+            max-width: 400px;
+        }
+        h1 {
+            text-align: center;
+            color: #333;
+            margin-bottom: 30px;
+        }
+        .form-group {
+            margin-bottom: 20px;
+        }
+        label {
+            display: block;
+            margin-bottom: 5px;
+            font-weight: bold;
+            color: #333;
+        }
+        input[type="text"], input[type="password"] {
+            width: 100%;
+            padding: 12px;
+            border: 2px solid #ddd;
+            border-radius: 5px;
+            font-size: 16px;
+            box-sizing: border-box;
+        }
+        input[type="text"]:focus, input[type="password"]:focus {
+            border-color: #4CAF50;
+            outline: none;
+        }
+        .btn {
+            background-color: #2196F3;
+            color: white;
+            padding: 12px 24px;
+            border: none;
+            border-radius: 5px;
+            font-size: 16px;
+            cursor: pointer;
+            width: 100%;
+        }
+        .btn:hover {
+            background-color: #1976D2;
+        }
+        .error {
+            background-color: #ffebee;
+            color: #c62828;
+            padding: 10px;
+            border-radius: 5px;
+            margin-bottom: 20px;
+            border-left: 4px solid #f44336;
+        }
+        .back-link {
+            text-align: center;
+            margin-top: 20px;
+        }
+        .back-link a {
+            color: #666;
+            text-decoration: none;
+        }
+    </style>
+</head>
+<body>
+    <div class="login-container">
+        <h1>🔐 Administration</h1>
+
+        {{error_block}}
+
+        <form method="post" action="/admin/login">
+            <div class="form-group">
+                <label for="username">Nom d'utilisateur:</label>
+                <input type="text" id="username" name="username" required>
+            </div>
+
+            <div class="form-group">
+                <label for="password">Mot de passe:</label>
+                <input type="password" id="password" name="password" required>
+            </div>
+
+            <button type="submit" class="btn">Se connecter</button>
+        </form>
+
+        <div class="back-link">
+            <a href="/">← Retour au formulaire d'urgence</a>
+        </div>
+    </div>
+</body>
+</html>
+"""
+
+ADMIN_DASHBOARD_PAGE = """\
+<!DOCTYPE html>
+<html>
+<head>
+    <title>Administration - {{app_name}}</title>
+    <meta charset="utf-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1">
+    <style>
+        body {
+            font-family: Arial, sans-serif;
+            margin: 0;
+            padding: 20px;
+            background-color: #f5f5f5;
+        }
+        .container {
+            max-width: 1200px;
+            margin: 0 auto;
+            background: white;
+            padding: 30px;
+            border-radius: 10px;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+        }
+        .header {
+            display: flex;
+            justify-content: space-between;
+            align-items: center;
+            margin-bottom: 30px;
+            padding-bottom: 20px;
+            border-bottom: 2px solid #eee;
+        }
+        h1 {
+            color: #333;
+            margin: 0;
+        }
+        .logout-btn {
+            background-color: #f44336;
+            color: white;
+            padding: 8px 16px;
+            text-decoration: none;
+            border-radius: 5px;
+            font-size: 14px;
+        }
+        .logout-btn:hover {
+            background-color: #d32f2f;
+        }
+        .menu-grid {
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
+            gap: 20px;
+            margin-bottom: 30px;
+        }
+        .menu-card {
+            background: #f9f9f9;
+            padding: 20px;
+            border-radius: 8px;
+            border-left: 4px solid #2196F3;
+        }
+        .menu-card h3 {
+            margin-top: 0;
+            color: #333;
+        }
+        .btn {
+            background-color: #2196F3;
+            color: white;
+            padding: 10px 20px;
+            text-decoration: none;
+            border-radius: 5px;
+            display: inline-block;
+            margin-top: 10px;
+        }
+        .btn:hover {
+            background-color: #1976D2;
+        }
+        .btn-success {
+            background-color: #4CAF50;
+        }
+        .btn-success:hover {
+            background-color: #45a049;
+        }
+        .status {
+            display: flex;
+            gap: 20px;
+            margin-top: 20px;
+        }
+        .status-item {
+            background: white;
+            padding: 15px;
+            border-radius: 5px;
+            border: 1px solid #ddd;
+            flex: 1;
+        }
+        .status-ok {
+            border-left: 4px solid #4CAF50;
+        }
+        .status-error {
+            border-left: 4px solid #f44336;
+        }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>🛠️ Administration - {{app_name}}</h1>
+            <a href="/admin/logout" class="logout-btn">Déconnexion</a>
+        </div>
+
+        <div class="menu-grid">
+            <div class="menu-card">
+                <h3>⚙️ Configuration</h3>
+                <p>Modifier les paramètres du serveur, les types d'alerte, les logos et autres options.</p>
+                <a href="/admin/config" class="btn">Éditer la configuration</a>
+            </div>
+
+            <div class="menu-card">
+                <h3>📊 État du système</h3>
+                <p>Vérifier l'état du serveur Meshtastic et des services.</p>
+                <a href="/health" class="btn btn-success" target="_blank">Voir l'état</a>
+            </div>
+
+            <div class="menu-card">
+                <h3>📜 Journaux</h3>
+                <p>Consulter le journal enregistré sur disque, archives compressées comprises.</p>
+                <a href="/admin/logs" class="btn" target="_blank">Voir le journal</a>
+            </div>
+
+            <div class="menu-card">
+                <h3>📋 Informations</h3>
+                <p>Version du logiciel et informations techniques.</p>
+                <a href="/version" class="btn" target="_blank">Voir les détails</a>
+            </div>
+        </div>
+
+        <div class="status">
+            <div class="status-item status-ok">
+                <strong>Version:</strong> {{app_version}}
+            </div>
+            <div class="status-item status-ok">
+                <strong>Meshtastic:</strong> {{meshtastic_state}}
+            </div>
+            <div class="status-item status-ok">
+                <strong>Sessions admin:</strong> {{admin_sessions}}
+            </div>
+        </div>
+
+        <div style="margin-top: 30px; text-align: center;">
+            <a href="/" class="btn">← Retour au formulaire d'urgence</a>
+        </div>
+    </div>
+</body>
+</html>
+"""
+
+ADMIN_CONFIG_PAGE = """\
+<!DOCTYPE html>
+<html>
+<head>
+    <title>Édition Configuration - GARDIA-M</title>
+    <meta charset="utf-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1">
+    <style>
+        body {
+            font-family: Arial, sans-serif;
+            margin: 0;
+            padding: 20px;
+            background-color: #f5f5f5;
+        }
+        .container {
+            max-width: 1000px;
+            margin: 0 auto;
+            background: white;
+            padding: 30px;
+            border-radius: 10px;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+        }
+        .header {
+            display: flex;
+            justify-content: space-between;
+            align-items: center;
+            margin-bottom: 30px;
+            padding-bottom: 20px;
+            border-bottom: 2px solid #eee;
+        }
+        h1 {
+            color: #333;
+            margin: 0;
+        }
+        .back-btn {
+            background-color: #666;
+            color: white;
+            padding: 8px 16px;
+            text-decoration: none;
+            border-radius: 5px;
+            font-size: 14px;
+        }
+        .back-btn:hover {
+            background-color: #555;
+        }
+        textarea {
+            width: 100%;
+            height: 500px;
+            font-family: 'Courier New', monospace;
+            font-size: 14px;
+            padding: 15px;
+            border: 2px solid #ddd;
+            border-radius: 5px;
+            box-sizing: border-box;
+            resize: vertical;
+        }
+        textarea:focus {
+            border-color: #4CAF50;
+            outline: none;
+        }
+        .form-actions {
+            margin-top: 20px;
+            display: flex;
+            gap: 10px;
+        }
+        .btn {
+            padding: 12px 24px;
+            border: none;
+            border-radius: 5px;
+            font-size: 16px;
+            cursor: pointer;
+            text-decoration: none;
+            display: inline-block;
+        }
+        .btn-primary {
+            background-color: #4CAF50;
+            color: white;
+        }
+        .btn-primary:hover {
+            background-color: #45a049;
+        }
+        .btn-secondary {
+            background-color: #2196F3;
+            color: white;
+        }
+        .btn-secondary:hover {
+            background-color: #1976D2;
+        }
+        .success {
+            background-color: #e8f5e8;
+            color: #2e7d32;
+            padding: 10px;
+            border-radius: 5px;
+            margin-bottom: 20px;
+            border-left: 4px solid #4CAF50;
+        }
+        .error {
+            background-color: #ffebee;
+            color: #c62828;
+            padding: 10px;
+            border-radius: 5px;
+            margin-bottom: 20px;
+            border-left: 4px solid #f44336;
+        }
+        .warning {
+            background-color: #fff3e0;
+            color: #ef6c00;
+            padding: 15px;
+            border-radius: 5px;
+            margin-bottom: 20px;
+            border-left: 4px solid #ff9800;
+        }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>⚙️ Édition de la configuration</h1>
+            <a href="/admin/dashboard" class="back-btn">← Retour</a>
+        </div>
+
+        {{success_block}}
+        {{error_block}}
+
+        <div class="warning">
+            <strong>⚠️ Attention:</strong> Modifiez cette configuration avec précaution. 
+            Une erreur de syntaxe peut empêcher le serveur de fonctionner. 
+            Sauvegardez toujours avant de modifier.
+            <br><br>
+            <strong>💡 Conseils:</strong>
+            <ul>
+                <li>Utilisez uniquement des guillemets droits (" et ') et non typographiques (" " ' ')</li>
+                <li>Les caractères accentués (é, à, ç, etc.) sont autorisés et préservés</li>
+                <li>Respectez l'indentation YAML (espaces, pas de tabulations)</li>
+                <li>Les mots de passe peuvent contenir: lettres, chiffres, accents, !@#$%^&*()-_=+</li>
+                <li>Évitez de copier-coller depuis Word (caractères invisibles)</li>
+            </ul>
+        </div>
+
+        <form method="post" action="/admin/config" accept-charset="UTF-8" enctype="application/x-www-form-urlencoded">
+            <textarea name="config_content" required>{{config_content}}</textarea>
+
+            <div class="form-actions">
+                <button type="submit" class="btn btn-primary">💾 Sauvegarder</button>
+                <button type="button" class="btn btn-secondary" onclick="location.reload()">🔄 Recharger</button>
+                <a href="/admin/dashboard" class="btn" style="background-color: #666; color: white;">❌ Annuler</a>
+            </div>
+        </form>
+
+        <div style="margin-top: 30px; font-size: 12px; color: #666;">
+            <strong>Fichier:</strong> {{config_file}}<br>
+            <strong>Dernière modification:</strong> {{config_mtime}}
+        </div>
+    </div>
+
+    <script>
+        // Avertissement avant de quitter si des modifications non sauvegardées
+        let originalContent = document.querySelector('textarea').value;
+
+        window.addEventListener('beforeunload', function(e) {
+            if (document.querySelector('textarea').value !== originalContent) {
+                e.preventDefault();
+                e.returnValue = '';
+            }
+        });
+
+        // Marquer comme sauvegardé lors de la soumission
+        document.querySelector('form').addEventListener('submit', function() {
+            originalContent = document.querySelector('textarea').value;
+        });
+    </script>
+</body>
+</html>
+"""
+
+# === BUNDLE DE LA PAGE D'ACCUEIL ===
+
+# Références vers static/ remplaçables par le contenu du fichier
+STATIC_STYLESHEET = re.compile(r'<link\b[^>]*\bhref="/static/([^"?]+)[^"]*"[^>]*>')
+STATIC_SCRIPT = re.compile(r'<script\b[^>]*\bsrc="/static/([^"?]+)[^"]*"[^>]*>\s*</script>')
+STATIC_URL = re.compile(r'(\bsrc="|\bhref="|url\(["\']?)/static/([^"\'?)]+)(?:\?[^"\')]*)?')
+# Blocs dont le texte ne doit pas être reformaté
+PRESERVED_BLOCKS = re.compile(r'(<(pre|textarea)\b.*?</\2>)', re.S | re.I)
+HTML_COMMENT = re.compile(r'<!--(?!\[if).*?-->', re.S)
+CSS_COMMENT = re.compile(r'/\*.*?\*/', re.S)
+CSS_SPACES = re.compile(r'\s*([{};,])\s*')
+STYLE_BLOCK = re.compile(r'(<style\b[^>]*>)(.*?)(</style>)', re.S | re.I)
+
+def data_uri(asset):
+    """data URI d'un fichier: texte encodé en URL pour le SVG (plus court), base64 sinon"""
+    data = asset.variants['identity'][0]
+    mime = asset.content_type.split(';')[0]
+    if mime == 'image/svg+xml':
+        return f"data:{mime}," + urllib.parse.quote(data.decode('utf-8'), safe=" =:/'-_.,;()#")
+    return f"data:{mime};base64," + base64.b64encode(data).decode('ascii')
+
+def inline_static_references(source, assets, max_size):
+    """Intègre dans la page les feuilles de style, scripts et images référencés sous /static/"""
+    def text_of(name):
+        asset = assets.get(name)
+        if asset and len(asset.variants['identity'][0]) <= max_size:
+            return asset.variants['identity'][0].decode('utf-8')
+        return None
+    
+    def stylesheet(match):
+        text = text_of(match.group(1)) if 'stylesheet' in match.group(0) else None
+        return match.group(0) if text is None else f"<style>{text}</style>"
+    
+    def script(match):
+        text = text_of(match.group(1))
+        return match.group(0) if text is None else f"<script>{text}</script>"
+    
+    def url(match):
+        asset = assets.get(match.group(2))
+        if not asset or len(asset.variants['identity'][0]) > max_size:
+            # Fichier absent ou trop gros: lien conservé (URL empreintée)
+            return match.group(0)
+        return match.group(1) + data_uri(asset)
+    
+    source = STATIC_STYLESHEET.sub(stylesheet, source)
+    source = STATIC_SCRIPT.sub(script, source)
+    return STATIC_URL.sub(url, source)
+
+def minify_html(source, keep=()):
+    """Minification prudente: commentaires et indentation supprimés, sauts de ligne conservés (JS)"""
+    parts = PRESERVED_BLOCKS.split(source)
+    result = []
+    # split() avec deux groupes: [texte, bloc préservé, nom de balise, texte, ...]
+    for index in range(0, len(parts), 3):
+        text = HTML_COMMENT.sub(lambda match: match.group(0) if match.group(0) in keep else '', parts[index])
+        text = STYLE_BLOCK.sub(lambda match: match.group(1) + CSS_SPACES.sub(r'\1', CSS_COMMENT.sub('', match.group(2)))
+                               .strip() + match.group(3), text)
+        lines = (line.strip() for line in text.split('\n'))
+        result.append('\n'.join(line for line in lines if line and not line.startswith('//')))
+        if index + 1 < len(parts):
+            result.append(parts[index + 1])
+    return ''.join(result)
+
+class PageBundle:
+    """Page d'accueil autonome, minifiée, avec sa version sans message précompressée"""
+    
+    content_type = 'text/html; charset=utf-8'
+    
+    def __init__(self, key, segments):
+        self.key = key
+        self.segments = segments
+        # Cas courant (aucun message à afficher): la page entière est figée et compressée une fois
+        body = TemplateCache.fill(segments, {slot: '' for slot in segments[1::2]}).encode('utf-8')
+        digest = hashlib.sha1(body).hexdigest()[:20]
+        self.variants = {
+            'identity': (body, f'"{digest}"'),
+            'gzip': (gzip.compress(body, compresslevel=9, mtime=0), f'"{digest}-gz"')
+        }
+    
+    def stats(self):
+        return {encoding: len(data) for encoding, (data, _) in self.variants.items()}
+
+# === SERVEUR WEB ===
+
+class PageTemplate:
+    """Page HTML intégrée, compilée une fois par jeu de valeurs statiques"""
+    
+    def __init__(self, source, slots):
+        self.source = source
+        self.slots = slots
+        self.compiled = (None, None)  # (valeurs statiques, segments)
+    
+    def render(self, static, values):
+        """Rendu: les segments statiques sont réutilisés, seuls les champs dynamiques sont insérés"""
+        context = tuple(static.items())
+        compiled = self.compiled
+        if compiled[0] != context:
+            compiled = self.compiled = (context, TemplateCache.compile(self.source, static, self.slots))
+        return TemplateCache.fill(compiled[1], values)
+
+class StaticAsset:
+    """Fichier statique chargé en mémoire avec ses variantes d'encodage"""
+    
+    def __init__(self, name, path, stat, data):
+        self.name = name
+        self.path = path
+        self.signature = (stat.st_mtime_ns, stat.st_size)
+        self.last_modified = email.utils.formatdate(stat.st_mtime, usegmt=True)
+        self.content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        if self.content_type.startswith('text/') or self.content_type.endswith(('javascript', 'json', 'xml')):
+            self.content_type += '; charset=utf-8'
+        
+        digest = hashlib.sha1(data).hexdigest()
+        self.fingerprint = digest[:10]
+        # encodage -> (contenu, ETag fort propre à la variante)
+        self.variants = {'identity': (data, f'"{digest[:20]}"')}
+        compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        # Les formats déjà compressés (PNG, JPEG...) ne gagnent rien: variante conservée seulement si utile
+        if len(compressed) < len(data) * 0.9:
+            self.variants['gzip'] = (compressed, f'"{digest[:20]}-gz"')
+
+class StaticAssetCache:
+    """Cache mémoire des fichiers statiques: ETag forts, URL empreintées et variantes gzip précalculées.
+    
+    Les fichiers sont chargés au démarrage; les modifications sur disque sont détectées au plus
+    une fois par check_interval. generation augmente à chaque changement (invalidation des URL).
+    """
+    
+    def __init__(self, static_dir, max_size=524288, check_interval=5):
+        self.static_dir = static_dir
+        self.max_size = max_size
+        self.check_interval = check_interval
+        self.assets = {}
+        self.generation = 0
+        self.checked_at = 0
+        self.dir_mtime = None
+        self.lock = threading.Lock()
+        self.refresh(force=True)
+    
+    def load(self, name):
+        """Charge (ou recharge) un fichier; None s'il est absent ou trop volumineux"""
+        path = os.path.join(self.static_dir, name)
+        try:
+            stat = os.stat(path)
+            if not os.path.isfile(path) or stat.st_size > self.max_size:
+                return None
+            with open(path, 'rb') as f:
+                return StaticAsset(name, path, stat, f.read())
+        except OSError:
+            return None
+    
+    def refresh(self, force=False):
+        """Recharge les fichiers ajoutés, modifiés ou supprimés; retourne la génération courante"""
+        now = time.time()
+        if not force and now - self.checked_at < self.check_interval:
+            return self.generation
+        
+        with self.lock:
+            if not force and now - self.checked_at < self.check_interval:
+                return self.generation
+            self.checked_at = now
+            changed = False
+            
+            try:
+                dir_mtime = os.stat(self.static_dir).st_mtime_ns
+            except OSError:
+                dir_mtime = None
+            if dir_mtime != self.dir_mtime:
+                # Fichiers ajoutés ou supprimés: nouvel inventaire du répertoire
+                self.dir_mtime = dir_mtime
+                names = os.listdir(self.static_dir) if dir_mtime is not None else []
+                for name in set(self.assets) - set(names):
+                    del self.assets[name]
+                    changed = True
+                for name in names:
+                    if name not in self.assets:
+                        asset = self.load(name)
+                        if asset:
+                            self.assets[name] = asset
+                            changed = True
+            
+            # Fichiers modifiés sur place (la date du répertoire ne change pas)
+            for name, asset in list(self.assets.items()):
+                try:
+                    stat = os.stat(asset.path)
+                except OSError:
+                    del self.assets[name]
+                    changed = True
+                    continue
+                if (stat.st_mtime_ns, stat.st_size) != asset.signature:
+                    reloaded = self.load(name)
+                    if reloaded:
+                        self.assets[name] = reloaded
+                    else:
+                        del self.assets[name]
+                    changed = True
+            
+            if changed:
+                self.generation += 1
+            return self.generation
+    
+    def get(self, name):
+        """Fichier en cache (None s'il doit être servi depuis le disque)"""
+        self.refresh()
+        return self.assets.get(name)
+    
+    def url(self, name):
+        """URL empreintée: change dès que le contenu change, peut donc être mise en cache longtemps"""
+        asset = self.assets.get(name)
+        return f"/static/{name}?v={asset.fingerprint}" if asset else f"/static/{name}"
+    
+    @staticmethod
+    def accepted_encodings(header):
+        """Encodages acceptés par le client (q > 0) d'après Accept-Encoding"""
+        accepted = set()
+        for part in header.split(','):
+            coding, _, params = part.partition(';')
+            coding = coding.strip().lower()
+            quality = 1.0
+            params = params.replace(' ', '')
+            if params.startswith('q='):
+                try:
+                    quality = float(params[2:])
+                except ValueError:
+                    quality = 0
+            if coding and quality > 0:
+                accepted.add(coding)
+        return accepted
+    
+    def select(self, asset, accept_encoding):
+        """Variante la plus petite acceptée par le client: (encodage, contenu, ETag)"""
+        accepted = self.accepted_encodings(accept_encoding)
+        best = 'identity'
+        for encoding, (data, _) in asset.variants.items():
+            if (encoding in accepted or '*' in accepted) and len(data) < len(asset.variants[best][0]):
+                best = encoding
+        data, etag = asset.variants[best]
+        return best, data, etag
+    
+    def stats(self):
+        return {
+            'files': len(self.assets),
+            'bytes': sum(len(data) for asset in self.assets.values() for data, _ in asset.variants.values()),
+            'generation': self.generation
+        }
+
+class TemplateCache:
+    """Templates HTML compilés, relus uniquement quand le fichier change sur disque.
+    
+    La compilation substitue les parties statiques puis découpe le texte autour des emplacements
+    dynamiques: le rendu d'une requête se réduit à une concaténation.
+    """
+    
+    def __init__(self):
+        self.entries = {}  # chemin -> (signature du fichier, source, contexte statique, segments)
+        self.loads = 0
+        self.compiles = 0
+    
+    @staticmethod
+    def compile(source, static, slots):
+        """Segments alternés texte/emplacement: [texte, emplacement, texte, ..., texte]"""
+        for marker, text in static.items():
+            source = source.replace(marker, text)
+        if not slots:
+            return [source]
+        return re.split('(' + '|'.join(re.escape(slot) for slot in slots) + ')', source)
+    
+    def get(self, path, static, slots):
+        """Segments compilés du template (rechargé si mtime ou taille ont changé)"""
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        context = (tuple(static.items()), tuple(slots))
+        
+        entry = self.entries.get(path)
+        if not entry or entry[0] != signature:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = (signature, f.read(), None, None)
+            self.loads += 1
+        if entry[2] != context:
+            # Variables modifiées (ex. administration): recompilation sans relire le disque
+            entry = (signature, entry[1], context, self.compile(entry[1], static, slots))
+            self.compiles += 1
+        self.entries[path] = entry
+        return entry[3]
+    
+    def render(self, path, static, values):
+        """Rendu du template: parties statiques compilées, emplacements remplis par values"""
+        return self.fill(self.get(path, static, list(values)), values)
+    
+    @staticmethod
+    def fill(segments, values):
+        # Les indices impairs sont les emplacements dynamiques
+        return ''.join(values[segment] if index % 2 else segment for index, segment in enumerate(segments))
+    
+    def stats(self):
+        return {'templates': len(self.entries), 'loads': self.loads, 'compiles': self.compiles}
+
+class ResponseCompressor:
+    """Middleware WSGI: compression gzip des pages HTML et réponses JSON générées.
+    
+    Les corps compressés sont conservés dans un cache LRU indexé par l'empreinte du corps:
+    une réponse qui ne change pas (accueil, administration) n'est compressée qu'une fois.
+    """
+    
+    COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'application/xml', 'image/svg+xml')
+    
+    def __init__(self, app, level=6, min_size=512, cache_size=32):
+        self.app = app
+        self.level = level
+        self.min_size = min_size
+        self.cache_size = cache_size
+        self.cache = OrderedDict()  # empreinte du corps -> corps compressé
+        self.lock = threading.Lock()
+        self.counters = {'compressed': 0, 'cache_hits': 0, 'skipped': 0, 'bytes_in': 0, 'bytes_out': 0}
+    
+    def __call__(self, environ, start_response):
+        captured = {}
+        
+        def capture(status, headers, exc_info=None):
+            captured.update(status=status, headers=headers, exc_info=exc_info)
+            return captured.setdefault('written', []).append
+        
+        body = self.app(environ, capture)
+        status, headers = captured['status'], captured['headers']
+        written = captured.get('written')  # Corps éventuellement émis via write() (obsolète, non utilisé par Bottle)
+        names = {name.lower(): index for index, (name, _) in enumerate(headers)}
+        content_type = headers[names['content-type']][1] if 'content-type' in names else ''
+        
+        # Seules les réponses générées complètes sont concernées (pas les fichiers ni les 304)
+        if (not status.startswith('200') or 'content-encoding' in names or environ.get('REQUEST_METHOD') == 'HEAD'
+                or not content_type.startswith(self.COMPRESSIBLE_TYPES) or not isinstance(body, (list, tuple))):
+            start_response(status, headers, captured['exc_info'])
+            return written + list(body) if written else body
+        
+        data = b''.join((written or []) + list(body))
+        if len(data) < self.min_size:
+            self.counters['skipped'] += 1
+            start_response(status, headers, captured['exc_info'])
+            return [data]
+        
+        headers = [(name, value) for name, value in headers if name.lower() not in ('content-length', 'vary')]
+        headers.append(('Vary', 'Accept-Encoding'))
+        if 'gzip' not in StaticAssetCache.accepted_encodings(environ.get('HTTP_ACCEPT_ENCODING', '')):
+            headers.append(('Content-Length', str(len(data))))
+            start_response(status, headers, captured['exc_info'])
+            return [data]
+        
+        compressed = self.compress(data)
+        # L'ETag fort d'origine désigne le corps non compressé: il devient faible (comme nginx)
+        headers = [(name, 'W/' + value if name.lower() == 'etag' and value.startswith('"') else value)
+                   for name, value in headers]
+        headers += [('Content-Encoding', 'gzip'), ('Content-Length', str(len(compressed)))]
+        start_response(status, headers, captured['exc_info'])
+        return [compressed]
+    
+    def compress(self, data):
+        """Corps compressé, depuis le cache si ce contenu a déjà été servi"""
+        key = hashlib.sha1(data).digest()
+        with self.lock:
+            compressed = self.cache.get(key)
+            if compressed is not None:
+                self.cache.move_to_end(key)
+                self.counters['cache_hits'] += 1
+                return compressed
+        
+        compressed = gzip.compress(data, compresslevel=self.level, mtime=0)
+        with self.lock:
+            self.counters['compressed'] += 1
+            self.counters['bytes_in'] += len(data)
+            self.counters['bytes_out'] += len(compressed)
+            if self.cache_size > 0:
+                self.cache[key] = compressed
+                while len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+        return compressed
+    
+    def stats(self):
+        with self.lock:
+            ratio = self.counters['bytes_out'] / self.counters['bytes_in'] if self.counters['bytes_in'] else None
+            return dict(self.counters, level=self.level, cached=len(self.cache),
+                        ratio=round(ratio, 3) if ratio else None)
+
+class KeepAliveServerHandler(ServerHandler):
+    """Réponse HTTP/1.1: la connexion reste ouverte si la taille de la réponse est connue"""
+    
+    http_version = '1.1'
+    
+    def cleanup_headers(self):
+        super().cleanup_headers()
+        handler = self.request_handler
+        if 'Content-Length' not in self.headers or self.headers.get('Connection', '').lower() == 'close':
+            handler.close_connection = True
+        if handler.close_connection:
+            self.headers['Connection'] = 'close'
+
+class KeepAliveRequestHandler(WSGIRequestHandler):
+    """Traite plusieurs requêtes sur une même connexion, avec délais de lecture bornés"""
+    
+    protocol_version = 'HTTP/1.1'
+    
+    def setup(self):
+        self.timeout = self.server.request_timeout
+        super().setup()
+    
+    def address_string(self):
+        # Pas de résolution DNS inverse
+        return self.client_address[0]
+    
+    def log_request(self, code='-', size='-'):
+        logger.debug(f"{self.client_address[0]} \"{self.requestline}\" {code} {size}")
+    
+    def buffered_request(self):
+        """Requête suivante déjà reçue (pipelinée): octets dans le tampon de rfile, invisibles pour select"""
+        timeout = self.request.gettimeout()
+        self.request.setblocking(False)
+        try:
+            return bool(self.rfile.peek(1))
+        except OSError:
+            return False
+        finally:
+            self.request.settimeout(timeout)
+    
+    def wait_for_request(self):
+        """Attend la requête suivante; libère le thread si d'autres clients attendent"""
+        if self.buffered_request():
+            return True
+        deadline = time.time() + self.server.keepalive_timeout
+        while time.time() < deadline:
+            if self.server.pending.qsize():
+                return False
+            readable, _, _ = select.select([self.request], [], [], 0.1)
+            if readable:
+                return True
+        return False
+    
+    def handle(self):
+        self.close_connection = True
+        served = 0
+        while True:
+            if served and not self.wait_for_request():
+                return
+            try:
+                self.raw_requestline = self.rfile.readline(65537)
+            except (socket.timeout, ConnectionError):
+                return
+            if not self.raw_requestline:
+                return
+            if len(self.raw_requestline) > 65536:
+                self.requestline = ''
+                self.request_version = ''
+                self.command = ''
+                self.send_error(414)
+                return
+            if not self.parse_request():
+                return
+            
+            served += 1
+            # Une connexion n'est réutilisée que si le corps de la requête est entièrement consommé par
+            # construction (pas de corps), et si aucun autre client n'attend un thread
+            has_body = self.headers.get('Content-Length', '0') not in ('', '0') or 'Transfer-Encoding' in self.headers
+            self.close_connection = (self.close_connection or has_body or served >= self.server.keepalive_requests
+                                     or self.server.pending.qsize() > 0)
+            
+            self.request.settimeout(self.server.request_timeout)
+            handler = KeepAliveServerHandler(self.rfile, self.wfile, self.get_stderr(), self.get_environ(),
+                                             multithread=True)
+            handler.request_handler = self
+            handler.run(self.server.get_app())
+            if self.close_connection:
+                return
+            self.wfile.flush()
+
+class PooledWSGIServer(WSGIServer):
+    """Serveur WSGI à pool de threads borné: un client lent n'occupe qu'un thread"""
+    
+    daemon_threads = True
+    
+    def __init__(self, server_address, handler_class, workers=8, max_pending=32, backlog=64,
+                 request_timeout=30, keepalive_timeout=5, keepalive_requests=100):
+        self.request_queue_size = backlog  # Lu par listen() lors de l'activation
+        self.request_timeout = request_timeout
+        self.keepalive_timeout = keepalive_timeout
+        self.keepalive_requests = keepalive_requests
+        self.pending = queue.Queue(max_pending)
+        self.rejected = 0
+        super().__init__(server_address, handler_class)
+        self.workers = [threading.Thread(target=self.worker_loop, name=f'http-worker-{index}', daemon=True)
+                        for index in range(workers)]
+        for worker in self.workers:
+            worker.start()
+    
+    def process_request(self, request, client_address):
+        """Confie la connexion au pool; refuse poliment si la file d'attente est pleine"""
+        try:
+            self.pending.put_nowait((request, client_address))
+        except queue.Full:
+            self.rejected += 1
+            try:
+                request.settimeout(1)
+                request.sendall(b"HTTP/1.1 503 Service Unavailable\r\nRetry-After: 1\r\n"
+                                b"Content-Length: 0\r\nConnection: close\r\n\r\n")
+            except OSError:
+                pass
+            self.shutdown_request(request)
+    
+    def worker_loop(self):
+        """Thread du pool: traite les connexions une à une"""
+        while True:
+            request, client_address = self.pending.get()
+            if request is None:
+                return
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+    
+    def handle_error(self, request, client_address):
+        error = sys.exc_info()[1]
+        if isinstance(error, (socket.timeout, ConnectionError)):
+            logger.warning(f"Connexion de {client_address[0]} fermée: {error or 'délai dépassé'}")
+        else:
+            logger.error(f"Erreur de traitement de la requête de {client_address[0]}: {error}")
+    
+    def server_close(self):
+        super().server_close()
+        for _ in self.workers:
+            self.pending.put((None, None))
+    
+    def stats(self):
+        """État du pool exposé par /health"""
+        return {'workers': len(self.workers), 'pending': self.pending.qsize(), 'rejected': self.rejected}
+
+class PooledServer(ServerAdapter):
+    """Adaptateur Bottle du serveur intégré à pool de threads"""
+    
+    def run(self, handler):
+        server_class = PooledWSGIServer
+        if ':' in self.host:
+            class server_class(PooledWSGIServer):
+                address_family = socket.AF_INET6
+        
+        self.srv = server_class((self.host, self.port), KeepAliveRequestHandler, **self.options)
+        self.srv.set_app(handler)
+        self.port = self.srv.server_port
+        try:
+            self.srv.serve_forever()
+        finally:
+            self.srv.server_close()
+
+class RateLimitPlugin:
+    """Plugin Bottle: limite le nombre de requêtes par adresse IP sur les routes configurées.
+    
+    Fenêtre glissante approchée par deux compteurs (fenêtre courante et précédente): O(1) en
+    temps et en mémoire par client. Les clients inactifs les plus anciens sont oubliés au-delà
+    de max_clients, la mémoire reste bornée même face à une rafale d'adresses.
+    """
+    name = 'rate_limit'
+    api = 2
+    
+    def __init__(self, routes, max_clients=4096):
+        self.clients = OrderedDict()  # (route, IP) -> [index de fenêtre, compte courant, compte précédent]
+        self.lock = threading.Lock()
+        self.rejected = 0
+        self.evicted = 0
+        self.configure(routes, max_clients)
+    
+    def configure(self, routes, max_clients=4096):
+        """(Re)définit les limites par route; les compteurs des clients sont conservés"""
+        self.routes = {rule: (int(limit.get('requests', 6)), float(limit.get('window', 60)))
+                       for rule, limit in (routes or {}).items() if limit}
+        self.max_clients = max_clients
+    
+    def hit(self, rule, client, now=None):
+        """Compte une requête; retourne 0 si elle est admise, sinon le délai d'attente conseillé (secondes)"""
+        if rule not in self.routes:
+            return 0
+        requests, window = self.routes[rule]
+        now = now or time.time()
+        index, offset = divmod(now, window)
+        key = (rule, client)
+        
+        with self.lock:
+            state = self.clients.get(key)
+            if state is None:
+                state = self.clients[key] = [index, 0, 0]
+                while len(self.clients) > self.max_clients:
+                    self.clients.popitem(last=False)
+                    self.evicted += 1
+            else:
+                self.clients.move_to_end(key)
+                if index != state[0]:
+                    state[2] = state[1] if index == state[0] + 1 else 0
+                    state[0], state[1] = index, 0
+            
+            # Estimation: part de la fenêtre précédente encore couverte + fenêtre courante
+            weight = 1 - offset / window
+            if state[2] * weight + state[1] < requests:
+                state[1] += 1
+                return 0
+            
+            self.rejected += 1
+            if state[1] >= requests:
+                wait = window - offset + window * (1 - requests / state[1])
+            else:
+                wait = (weight - (requests - state[1]) / state[2]) * window
+            return int(wait) + 1
+    
+    def apply(self, callback, route):
+        rule = route.rule
+        
+        # Limites lues à chaque requête: un rechargement de la configuration s'applique sans réinstallation
+        def wrapper(*args, **kwargs):
+            if rule not in self.routes:
+                return callback(*args, **kwargs)
+            client = request.environ.get('REMOTE_ADDR', '')
+            retry_after = self.hit(rule, client)
+            if not retry_after:
+                return callback(*args, **kwargs)
+            
+            logger.warning(f"🚦 Requête limitée {request.method} {request.path} depuis {client} (réessai dans {retry_after}s)")
+            message = "Trop de requêtes. Veuillez réessayer dans quelques instants."
+            if request.path.startswith('/api/'):
+                body = COMPACT_JSON.encode({"status": "ERROR", "error": message, "retry_after": retry_after})
+                content_type = 'application/json'
+            else:
+                body, content_type = message, 'text/plain; charset=utf-8'
+            return HTTPResponse(body, status=429, headers={'Retry-After': str(retry_after), 'Content-Type': content_type})
+        
+        return wrapper
+    
+    def stats(self):
+        with self.lock:
+            return {'clients': len(self.clients), 'rejected': self.rejected, 'evicted': self.evicted}
+
+# Clé d'idempotence fournie par le client (UUID ou équivalent)
+IDEMPOTENCY_KEY = re.compile(r'[A-Za-z0-9._:-]{8,128}')
+
+class IdempotencyStore:
+    """Soumissions acceptées indexées par clé d'idempotence: un rejeu renvoie le résultat d'origine.
+    
+    Pendant le traitement d'une clé, les requêtes concurrentes portant la même clé attendent son issue.
+    """
+    
+    def __init__(self, ttl=86400, max_entries=2000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # clé -> (instant, résultat); résultat None = traitement en cours
+        self.lock = threading.Condition()
+        self.replays = 0
+    
+    @staticmethod
+    def alert_id(key):
+        """ID d'alerte dérivé de la clé: identique après un redémarrage (alertes relues du journal)"""
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]
+    
+    def claim(self, key, timeout=30):
+        """Résultat déjà enregistré pour cette clé, ou None après avoir réservé la clé pour ce traitement"""
+        with self.lock:
+            now = time.time()
+            while self.entries:
+                oldest = next(iter(self.entries))
+                if self.entries[oldest][0] > now - self.ttl:
+                    break
+                del self.entries[oldest]
+            
+            deadline = now + timeout
+            while key in self.entries and self.entries[key][1] is None and time.time() < deadline:
+                self.lock.wait(deadline - time.time())
+            
+            entry = self.entries.get(key)
+            if entry and entry[1] is not None:
+                self.replays += 1
+                return entry[1]
+            self.entries[key] = (now, None)
+            self.entries.move_to_end(key)
+            return None
+    
+    def complete(self, key, result):
+        """Enregistre le résultat d'une clé réservée; None libère la clé (un nouvel essai sera traité)"""
+        with self.lock:
+            if result is None:
+                self.entries.pop(key, None)
+            else:
+                self.entries[key] = (time.time(), result)
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+            self.lock.notify_all()
+    
+    def stats(self):
+        with self.lock:
+            return {'keys': len(self.entries), 'replays': self.replays}
+
+class SessionStore:
+    """Sessions d'administration indexées par date d'expiration (tas binaire).
+    
+    Les sessions sont rangées de la moins à la plus récemment utilisée: au-delà de max_sessions,
+    la plus ancienne est évincée. Un thread balaie les sessions expirées en O(log n) chacune.
+    Le tas n'est pas mis à jour à chaque activité: une entrée dont la session a été prolongée est
+    replacée à sa nouvelle échéance quand elle arrive en tête. Seule l'empreinte SHA-256 des
+    identifiants est conservée (en mémoire comme dans le fichier de persistance optionnel).
+    """
+    
+    def __init__(self, timeout=3600, max_sessions=64, sliding=True, path=None, sweep_interval=60):
+        self.timeout = timeout
+        self.max_sessions = max_sessions
+        self.sliding = sliding
+        self.path = path
+        self.sweep_interval = sweep_interval
+        self.sessions = OrderedDict()  # empreinte -> session, de la moins à la plus récemment utilisée
+        self.heap = []  # (échéance, empreinte); une seule entrée par session
+        self.lock = threading.Condition()
+        self.dirty = False  # Activité non encore persistée
+        self.expired = 0
+        self.evicted = 0
+        self.running = True
+        
+        if self.path:
+            self.load()
+        self.sweeper = threading.Thread(target=self.sweep_loop, name='session-sweeper', daemon=True)
+        self.sweeper.start()
+    
+    def __len__(self):
+        return len(self.sessions)
+    
+    def configure(self, timeout, max_sessions, sliding, sweep_interval):
+        """Nouvelles règles d'expiration: le balayeur réévalue aussitôt les sessions existantes"""
+        with self.lock:
+            self.timeout = timeout
+            self.max_sessions = max_sessions
+            self.sliding = sliding
+            self.sweep_interval = sweep_interval
+            # Échéances recalculées: elles peuvent avoir avancé
+            self.heap = [(self.expires(session), key) for key, session in self.sessions.items()]
+            heapq.heapify(self.heap)
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+                self.evicted += 1
+            self.lock.notify_all()
+    
+    @staticmethod
+    def digest(session_id):
+        return hashlib.sha256(session_id.encode('utf-8')).hexdigest()
+    
+    def expires(self, session):
+        """Échéance d'une session: depuis la dernière activité si l'expiration est glissante"""
+        return session['last_activity' if self.sliding else 'created'] + self.timeout
+    
+    def create(self, session_id, username):
+        """Enregistre une nouvelle session; évince les moins récemment utilisées au-delà du plafond"""
+        now = time.time()
+        key = self.digest(session_id)
+        with self.lock:
+            self.sessions[key] = {'created': now, 'last_activity': now, 'username': username}
+            heapq.heappush(self.heap, (now + self.timeout, key))
+            while len(self.sessions) > self.max_sessions:
+                _, evicted = self.sessions.popitem(last=False)
+                self.evicted += 1
+                logger.info(f"Session admin de {evicted['username']} évincée (plafond de {self.max_sessions} sessions)")
+            self.save()
+    
+    def get(self, session_id):
+        """Session valide associée à l'identifiant (son activité est mise à jour), sinon None"""
+        if not session_id:
+            return None
+        key = self.digest(session_id)
+        now = time.time()
+        with self.lock:
+            session = self.sessions.get(key)
+            if session is None:
+                return None
+            if self.expires(session) <= now:
+                del self.sessions[key]
+                self.expired += 1
+                self.save()
+                return None
+            session['last_activity'] = now
+            self.sessions.move_to_end(key)
+            self.dirty = True
+            return session
+    
+    def remove(self, session_id):
+        """Supprime une session (déconnexion); retourne la session supprimée ou None"""
+        if not session_id:
+            return None
+        with self.lock:
+            session = self.sessions.pop(self.digest(session_id), None)
+            if session is not None:
+                self.save()
+            return session
+    
+    def sweep(self, now=None):
+        """Retire les sessions expirées; retourne le nombre de sessions supprimées"""
+        now = now or time.time()
+        removed = 0
+        with self.lock:
+            while self.heap and self.heap[0][0] <= now:
+                _, key = heapq.heappop(self.heap)
+                session = self.sessions.get(key)
+                if session is None:
+                    continue  # Session déjà supprimée ou évincée
+                expires = self.expires(session)
+                if expires > now:
+                    heapq.heappush(self.heap, (expires, key))  # Session prolongée depuis
+                    continue
+                del self.sessions[key]
+                self.expired += 1
+                removed += 1
+            
+            # Entrées orphelines (déconnexions, évictions): le tas est reconstruit s'il en est surtout composé
+            if len(self.heap) > 2 * len(self.sessions) + 16:
+                self.heap = [(self.expires(session), key) for key, session in self.sessions.items()]
+                heapq.heapify(self.heap)
+            
+            if removed or self.dirty:
+                self.save()
+        if removed:
+            logger.info(f"🔒 {removed} session(s) admin expirée(s)")
+        return removed
+    
+    def sweep_loop(self):
+        """Balaye les sessions à leur échéance (au plus tard toutes les sweep_interval secondes)"""
+        while True:
+            with self.lock:
+                delay = self.sweep_interval
+                if self.heap:
+                    delay = min(delay, max(self.heap[0][0] - time.time(), 0) + 0.5)
+                self.lock.wait(delay)
+                if not self.running:
+                    return
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"Erreur balayage des sessions admin: {e}")
+    
+    def stop(self):
+        with self.lock:
+            self.running = False
+            if self.dirty:
+                self.save()
+            self.lock.notify_all()
+    
+    def load(self):
+        """Relit les sessions persistées et écarte celles déjà expirées"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Sessions admin illisibles dans {self.path}: {e}")
+            return
+        
+        now = time.time()
+        for key, session in sorted(stored.items(), key=lambda item: item[1].get('last_activity', 0)):
+            try:
+                expires = self.expires(session)
+            except (KeyError, TypeError):
+                continue
+            if expires > now:
+                self.sessions[key] = session
+                self.heap.append((expires, key))
+        while len(self.sessions) > self.max_sessions:
+            self.sessions.popitem(last=False)
+        heapq.heapify(self.heap)
+        if self.sessions:
+            logger.info(f"🔑 {len(self.sessions)} session(s) admin restaurée(s) depuis {self.path}")
+    
+    def save(self):
+        """Persiste les sessions (remplacement atomique, lisible par le seul propriétaire); verrou détenu"""
+        self.dirty = False
+        if not self.path:
+            return
+        temp_path = f"{self.path}.tmp"
+        try:
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.sessions, f, separators=(',', ':'))
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logger.error(f"Erreur sauvegarde des sessions admin dans {self.path}: {e}")
+    
+    def stats(self):
+        with self.lock:
+            return {'sessions': len(self.sessions), 'heap': len(self.heap),
+                    'expired': self.expired, 'evicted': self.evicted}
+
+# Journalisation complète d'une alerte reçue (logging.log_all_data), en un seul enregistrement
+ALERT_LOG_BANNER = '\n'.join(["=" * 50, "📝 NOUVELLE ALERTE REÇUE", "Nom/Prénom: %s", "Téléphone: %s", "Adresse: %s",
+                              "Type sinistre: %s", "Détails: %s", "Timestamp: %s", "IP source: %s", "=" * 50])
+
+class EmergencyApp:
+    def __init__(self, config_file='config.yaml'):
+        self.config = ConfigManager(config_file)
+        self.config_file = config_file
+        self.setup_logging()
+        self.meshtastic_handler = MeshtasticHandler(self.config)
+        self.app = Bottle()
+        self.admin_sessions = SessionStore(self.config.get('admin.session_timeout', 3600),
+                                           self.config.get('admin.max_sessions', 64),
+                                           self.config.get('admin.session_sliding', True),
+                                           self.config.get('admin.session_file', '') or None,
+                                           self.config.get('admin.session_sweep_interval', 60))
+        self.web_server = None  # Adaptateur du serveur intégré, une fois lancé
+        self.templates = TemplateCache()
+        self.bundle = None  # Page d'accueil en bundle (mode web.bundle)
+        self.static_assets = self.build_static_assets()
+        self.logos_cache = None  # (clé d'invalidation, HTML)
+        self.logos_stats = {'hits': 0, 'builds': 0}
+        self.admin_pages = {
+            'login': PageTemplate(ADMIN_LOGIN_PAGE, ['{{error_block}}']),
+            'dashboard': PageTemplate(ADMIN_DASHBOARD_PAGE, ['{{meshtastic_state}}', '{{admin_sessions}}']),
+            'config': PageTemplate(ADMIN_CONFIG_PAGE, ['{{success_block}}', '{{error_block}}',
+                                                       '{{config_content}}', '{{config_mtime}}'])
+        }
+        self.config_content_cache = None  # (signature du fichier, contenu, date affichée)
+        self.duplicates = DuplicateIndex(self.config.get('dedup.window', 600)) if self.config.get('dedup.enabled', True) else None
+        self.idempotency = IdempotencyStore(self.config.get('web.idempotency_ttl', 86400),
+                                            self.config.get('web.idempotency_max_keys', 2000))
+        self.get_logos_html()  # Bloc des logos calculé dès le démarrage
+        self.setup_routes()
+        self.compressor = None
+        self.wsgi = self.app  # Application WSGI servie: Bottle, enveloppée par la compression si activée
+        if self.config.get('web.compression', True):
+            self.compressor = ResponseCompressor(self.app, self.config.get('web.compression_level', 6),
+                                                 self.config.get('web.compression_min_size', 512),
+                                                 self.config.get('web.compression_cache', 32))
+            self.wsgi = self.compressor
+        
+        # Rechargement à chaud: sauvegarde depuis l'administration ou modification du fichier
+        self.reload_lock = threading.Lock()
+        self.config_watcher = threading.Thread(target=self.watch_config, name='config-watcher', daemon=True)
+        self.config_watcher.start()
+    
+    def build_static_assets(self):
+        """Cache des fichiers statiques, chargés et précompressés dès sa création (None si désactivé)"""
+        if not (self.config.get('web.static_cache', True) or self.config.get('web.bundle', False)):
+            return None
+        # Le bundle intègre le contenu des fichiers statiques: le cache est alors indispensable
+        return StaticAssetCache(self.config.get('web.static_dir', './static'),
+                                self.config.get('web.static_max_size', 524288),
+                                self.config.get('web.static_check_interval', 5))
+    
+    def setup_logging(self):
+        """Configure le système de logging (réappliqué lors d'un rechargement de la configuration)"""
+        global logger, log_pipeline
+        level = getattr(logging, self.config.get('logging.level', 'INFO'))
+        if log_pipeline is None:
+            log_pipeline = LogPipeline(self.config.get('logging.queue_size', 10000))
+        log_pipeline.configure(level, self.config.get('logging.format'),
+                               self.config.get('logging.file', '') or None,
+                               self.config.get('logging.json_file', '') or None,
+                               {'flush_interval': self.config.get('logging.flush_interval', 30),
+                                'flush_size': self.config.get('logging.flush_size', 65536),
+                                'segment_size': self.config.get('logging.segment_size', 262144),
+                                'max_size': self.config.get('logging.max_size', 2097152),
+                                'compress_level': self.config.get('logging.compress_level', 6)})
+        logger = logging.getLogger(__name__)
+    
+    def watch_config(self):
+        """Thread de surveillance: recharge config.yaml dès que le fichier est modifié"""
+        while True:
+            interval = self.config.get('app.config_watch_interval', 5)
+            time.sleep(interval or 5)
+            if interval and self.config.file_stamp() not in (None, self.config.stamp):
+                self.reload_config('modification du fichier')
+    
+    def reload_config(self, source):
+        """Relit la configuration et l'applique sans redémarrage; retourne les paramètres modifiés (None si refusée)"""
+        with self.reload_lock:
+            try:
+                changed = self.config.reload()
+            except Exception as e:
+                logger.error(f"❌ Configuration non rechargée ({source}), la précédente reste active: {e}")
+                return None
+            if not changed:
+                return changed
+            
+            logger.info(f"🔄 Configuration rechargée ({source}): {', '.join(sorted(changed))}")
+            try:
+                self.apply_config(changed)
+            except Exception as e:
+                logger.error(f"Erreur application de la configuration rechargée: {e}")
+            return changed
     
-    def setup_logging(self):
-        """Configure le système de logging"""
-        level = getattr(logging, self.config.get('logging.level', 'INFO'))
-        format_str = self.config.get('logging.format')
-        logging.basicConfig(level=level, format=format_str)
-        global logger
-        logger = logging.getLogger(__name__)
+    def apply_config(self, changed):
+        """Reconstruit les seuls sous-systèmes concernés par les paramètres modifiés.
+        
+        Chaque objet reconstruit est remplacé d'une affectation: une requête en cours utilise l'ancien
+        ou le nouveau, jamais un état partiel. Types d'alerte, limites de taille, troncature, admission
+        et messages sont lus dans l'instantané à chaque requête et n'ont rien à reconstruire.
+        """
+        def touched(*prefixes):
+            return any(path == prefix or path.startswith(prefix + '.') for prefix in prefixes for path in changed)
+        
+        if touched('logging.level', 'logging.format', 'logging.file', 'logging.json_file', 'logging.flush_interval',
+                   'logging.flush_size', 'logging.segment_size', 'logging.max_size', 'logging.compress_level'):
+            self.setup_logging()
+        if touched('meshtastic', 'scheduler', 'outbox.retry_interval'):
+            self.meshtastic_handler.reconfigure(changed)
+        
+        # Pages: templates, fichiers statiques, logos et bundle
+        if touched('web.template_dir'):
+            self.templates = TemplateCache()
+        if touched('web.static_dir', 'web.static_cache', 'web.static_max_size', 'web.static_check_interval', 'web.bundle'):
+            self.static_assets = self.build_static_assets()
+            self.logos_cache = None
+        if touched('web.static_dir', 'web.static_cache', 'web.bundle', 'web.bundle_inline_max', 'logos', 'app',
+                   'meshtastic.channel_name', 'meshtastic.channel_index'):
+            self.bundle = None
+        if self.compressor and touched('web.compression_level', 'web.compression_min_size', 'web.compression_cache'):
+            self.compressor.level = self.config.get('web.compression_level', 6)
+            self.compressor.min_size = self.config.get('web.compression_min_size', 512)
+            self.compressor.cache_size = self.config.get('web.compression_cache', 32)
+            self.compressor.cache = OrderedDict()
+        
+        # Soumissions: limitation, dédoublonnage, idempotence
+        if touched('rate_limit'):
+            self.rate_limiter.configure(self.rate_limit_routes(), self.config.get('rate_limit.max_clients', 4096))
+        if touched('dedup.enabled', 'dedup.window'):
+            if not self.config.get('dedup.enabled', True):
+                self.duplicates = None
+            elif self.duplicates:
+                self.duplicates.window = self.config.get('dedup.window', 600)
+            else:
+                self.duplicates = DuplicateIndex(self.config.get('dedup.window', 600))
+        if touched('web.idempotency_ttl', 'web.idempotency_max_keys'):
+            self.idempotency.ttl = self.config.get('web.idempotency_ttl', 86400)
+            self.idempotency.max_entries = self.config.get('web.idempotency_max_keys', 2000)
+            outbox = self.meshtastic_handler.outbox
+            if outbox:
+                with outbox.lock:
+                    outbox.ack_ttl, outbox.max_acks = self.idempotency.ttl, self.idempotency.max_entries
+                    outbox.trim_acknowledged()
+        if touched('admin.session_timeout', 'admin.max_sessions', 'admin.session_sliding', 'admin.session_sweep_interval'):
+            self.admin_sessions.configure(self.config.get('admin.session_timeout', 3600),
+                                          self.config.get('admin.max_sessions', 64),
+                                          self.config.get('admin.session_sliding', True),
+                                          self.config.get('admin.session_sweep_interval', 60))
+        
+        pending = restart_required(changed)
+        if pending:
+            logger.warning(f"⚠️ Pris en compte au prochain redémarrage: {', '.join(pending)}")
+    
+    def rate_limit_routes(self):
+        """Limites par route de la configuration (aucune si la limitation est désactivée)"""
+        return self.config.get('rate_limit.routes', {}) if self.config.get('rate_limit.enabled', True) else {}
     
     def setup_routes(self):
         """Configure les routes Bottle"""
+        # Limitation par client, appliquée aux routes listées dans la configuration
+        self.rate_limiter = RateLimitPlugin(self.rate_limit_routes(), self.config.get('rate_limit.max_clients', 4096))
+        self.app.install(self.rate_limiter)
+        
         self.app.route('/', method='GET', callback=self.index)
         self.app.route('/submit', method='POST', callback=self.submit_form)
         self.app.route('/health', method='GET', callback=self.health_check)
         self.app.route('/version', method='GET', callback=self.version_info)
+        self.app.route('/api/alerts', method='POST', callback=self.api_submit_alert)
+        self.app.route('/api/alerts/<alert_id>', method='GET', callback=self.alert_status)
         self.app.route('/static/<filename>', method='GET', callback=self.static_files)
+        self.app.route('/sw.js', method='GET', callback=self.service_worker)
+        self.app.route('/alert-queue.js', method='GET', callback=self.alert_queue_script)
+        self.app.route('/manifest.webmanifest', method='GET', callback=self.web_manifest)
         
         # Routes d'administration
         if self.config.get('admin.enabled', True):
@@ -217,30 +3755,29 @@ class EmergencyApp:
             self.app.route('/admin/dashboard', method='GET', callback=self.admin_dashboard)
             self.app.route('/admin/config', method='GET', callback=self.admin_config_edit)
             self.app.route('/admin/config', method='POST', callback=self.admin_config_save)
+            self.app.route('/admin/logs', method='GET', callback=self.admin_logs)
             self.app.route('/admin/logout', method='GET', callback=self.admin_logout)
     
     def index(self):
         """Page d'accueil avec le formulaire"""
-        channel_name = self.config.get('meshtastic.channel_name')
-        channel_index = self.config.get('meshtastic.channel_index')
-        app_version = self.config.get('app.version', VERSION)
+        config = self.config.snapshot
+        channel_name = config.meshtastic.channel_name
+        channel_index = config.meshtastic.channel_index
+        app_version = config.app.version
         
         # Chercher le template HTML
-        template_dir = self.config.get('web.template_dir', './templates')
-        template_file = os.path.join(template_dir, 'index.html')
+        template_file = os.path.join(config.web.template_dir, 'index.html')
         
         if os.path.exists(template_file):
             try:
-                with open(template_file, 'r', encoding='utf-8') as f:
-                    html_content = f.read()
-                
-                # Remplacement des variables dans le template
-                html_content = html_content.replace('{{channel_name}}', channel_name)
-                html_content = html_content.replace('{{channel_index}}', str(channel_index))
-                html_content = html_content.replace('{{app_version}}', app_version)
-                
-                # Gestion des logos
-                html_content = self.process_logos(html_content)
+                # Parties statiques: variables et logos, compilées une fois par version du template
+                static = {
+                    '{{channel_name}}': channel_name,
+                    '{{channel_index}}': str(channel_index),
+                    '{{app_version}}': app_version,
+                    '<!-- LOGOS_SECTION -->': self.get_logos_html(),
+                    '<!-- ALERT_QUEUE_SCRIPT -->': self.get_alert_queue_script()
+                }
                 
                 # Gestion des messages conditionnels avec décodage
                 success_message = request.query.get('success', '')
@@ -265,19 +3802,21 @@ class EmergencyApp:
                     except:
                         pass
                 
+                # Seuls les blocs de message sont produits à chaque requête (placeholders vides sinon)
+                slots = {'<!-- SUCCESS_MESSAGE -->': '', '<!-- ERROR_MESSAGE -->': ''}
                 if success_message:
-                    success_block = f'<div class="success">{success_message}</div>'
-                    html_content = html_content.replace('<!-- SUCCESS_MESSAGE -->', success_block)
+                    slots['<!-- SUCCESS_MESSAGE -->'] = f'<div class="success">{success_message}{self.get_alert_status_block(request.query.get("alert", ""))}</div>'
                 
                 if error_message:
-                    error_block = f'<div class="error">{error_message}</div>'
-                    html_content = html_content.replace('<!-- ERROR_MESSAGE -->', error_block)
+                    slots['<!-- ERROR_MESSAGE -->'] = f'<div class="error">{error_message}</div>'
                 
-                # Supprimer les placeholders non utilisés
-                html_content = html_content.replace('<!-- SUCCESS_MESSAGE -->', '')
-                html_content = html_content.replace('<!-- ERROR_MESSAGE -->', '')
-               
-                return html_content
+                if config.web.bundle:
+                    bundle = self.get_bundle(template_file, static, list(slots))
+                    if any(slots.values()):
+                        return TemplateCache.fill(bundle.segments, slots)
+                    return self.send_variant(bundle, 'no-cache')
+                
+                return self.templates.render(template_file, static, slots)
                 
             except Exception as e:
                 logger.error(f"Erreur lors du chargement du template: {e}")
@@ -286,19 +3825,68 @@ class EmergencyApp:
             logger.warning(f"Template non trouvé: {template_file}, utilisation du template intégré")
             return self.get_fallback_html(channel_name, channel_index, app_version)
     
-    def process_logos(self, html_content):
-        """Traite les logos dans le template HTML"""
-        if not self.config.get('logos.enabled', True):
+    def get_bundle(self, template_file, static, slots):
+        """Page d'accueil autonome, reconstruite si le template, un fichier statique ou la configuration change"""
+        stat = os.stat(template_file)
+        key = (template_file, stat.st_mtime_ns, stat.st_size, self.static_assets.refresh(), tuple(static.items()))
+        bundle = self.bundle
+        if bundle and bundle.key == key:
+            return bundle
+        
+        with open(template_file, 'r', encoding='utf-8') as f:
+            source = f.read()
+        size = len(source.encode('utf-8'))
+        for marker, text in static.items():
+            source = source.replace(marker, text)
+        source = inline_static_references(source, self.static_assets, self.config.get('web.bundle_inline_max', 32768))
+        source = minify_html(source, slots)
+        
+        bundle = self.bundle = PageBundle(key, TemplateCache.compile(source, {}, slots))
+        logger.info(f"📦 Bundle de la page d'accueil: {size} octets (+ fichiers intégrés) -> "
+                    f"{len(bundle.variants['identity'][0])} octets, {len(bundle.variants['gzip'][0])} compressés")
+        return bundle
+    
+    def get_logos_html(self):
+        """Bloc HTML des logos, recalculé seulement si la section logos ou le répertoire statique change"""
+        static_dir = self.config.snapshot.web.static_dir
+        if self.static_assets:
+            # Génération du cache statique: change si un logo est ajouté, supprimé ou modifié
+            static_version = self.static_assets.refresh()
+        else:
+            try:
+                # La date du répertoire change à chaque ajout, suppression ou renommage de fichier
+                static_version = os.stat(static_dir).st_mtime_ns
+            except OSError:
+                static_version = None
+        # La section logos d'un instantané ne change pas: comparaison par identité en O(1)
+        key = (static_dir, static_version, self.config.snapshot.logos)
+        
+        cached = self.logos_cache
+        if cached and cached[0] == key:
+            self.logos_stats['hits'] += 1
+            return cached[1]
+        
+        logos_html = self.build_logos_html()
+        self.logos_cache = (key, logos_html)
+        self.logos_stats['builds'] += 1
+        return logos_html
+    
+    def build_logos_html(self):
+        """Construit le bloc HTML des logos configurés présents dans le répertoire statique"""
+        config = self.config.snapshot
+        if not config.logos.get('enabled', True):
             # Supprimer la section logos si désactivée
-            html_content = html_content.replace('<!-- LOGOS_SECTION -->', '')
-            return html_content
+            return ''
         
-        static_dir = self.config.get('web.static_dir', './static')
+        static_dir = config.web.static_dir
         logos_html = '<div class="logos-container">'
         
         for i in range(1, 4):  # logo1, logo2, logo3
-            logo_config = self.config.get(f'logos.logo{i}', {})
+            logo_config = config.logos.get(f'logo{i}') or {}
             logo_file = logo_config.get('file', f'logo{i}.png')
+            if not logo_file:
+                # Emplacement laissé vide dans la configuration
+                continue
             logo_alt = logo_config.get('alt', f'Logo {i}')
             logo_link = logo_config.get('link', '')
             
@@ -306,19 +3894,16 @@ class EmergencyApp:
             
             # Vérifier si le fichier logo existe
             if os.path.exists(logo_path):
+                logo_src = self.static_assets.url(logo_file) if self.static_assets else f"/static/{logo_file}"
                 if logo_link:
                     logos_html += f'<a href="{logo_link}" target="_blank" class="logo-link">'
-                    logos_html += f'<img src="/static/{logo_file}" alt="{logo_alt}" class="logo logo{i}">'
+                    logos_html += f'<img src="{logo_src}" alt="{logo_alt}" class="logo logo{i}">'
                     logos_html += '</a>'
                 else:
-                    logos_html += f'<img src="/static/{logo_file}" alt="{logo_alt}" class="logo logo{i}">'
+                    logos_html += f'<img src="{logo_src}" alt="{logo_alt}" class="logo logo{i}">'
         
         logos_html += '</div>'
-        
-        # Remplacer le placeholder par le HTML des logos
-        html_content = html_content.replace('<!-- LOGOS_SECTION -->', logos_html)
-        
-        return html_content
+        return logos_html
     
     def get_fallback_html(self, channel_name, channel_index, app_version):
         """Template HTML de secours intégré"""
@@ -425,7 +4010,7 @@ class EmergencyApp:
                     
                     <div class="form-group">
                         <label for="telephone">Numéro de Téléphone <span class="required">*</span></label>
-                        <input type="tel" id="telephone" name="telephone" required>
+                        <input type="tel" id="telephone" name="telephone" maxlength="32" required>
                     </div>
                     
                     <div class="form-group">
@@ -465,105 +4050,27 @@ class EmergencyApp:
     
     def submit_form(self):
         """Traite la soumission du formulaire avec gestion d'erreur robuste"""
-        from bottle import HTTPResponse
-		
         try:
-            # Récupération des données avec gestion d'encodage robuste
-            def get_form_data_safe(field_name):
-                """Récupère les données du formulaire avec correction d'encodage"""
-                try:
-                    # Méthode 1: récupération normale
-                    data = request.forms.get(field_name, '').strip()
-                    
-                    # Correction d'encodage si nécessaire
-                    if 'Ã©' in data or 'Ã¨' in data or 'Ã ' in data:
-                        # Corrections courantes d'encodage
-                        corrections = {
-                            'Ã©': 'é', 'Ã¨': 'è', 'Ã ': 'à', 'Ã§': 'ç',
-                            'Ã´': 'ô', 'Ã®': 'î', 'Ã»': 'û', 'Ã¹': 'ù',
-                            'Ã¢': 'â', 'Ã¼': 'ü', 'Ã¯': 'ï', 'Ã±': 'ñ'
-                        }
-                        
-                        for wrong, correct in corrections.items():
-                            data = data.replace(wrong, correct)
-                        
-                        logger.info(f"Correction encodage appliquée sur {field_name}")
-                    
-                    return data
-                    
-                except Exception as e:
-                    logger.error(f"Erreur récupération {field_name}: {e}")
-                    return ""
-            
-            # Récupération des données avec correction automatique
-            nom_prenom = get_form_data_safe('nom_prenom')
-            telephone = get_form_data_safe('telephone')
-            adresse = get_form_data_safe('adresse')
-            type_sinistre = get_form_data_safe('type_sinistre')
-            details = get_form_data_safe('details')  # Nouveau champ
-            
-            # Log des données reçues (après correction)
-            logger.info(f"Formulaire reçu - Nom: '{nom_prenom}', Tel: '{telephone}', Type: '{type_sinistre}'")
-            if len(adresse) > 50:
-                logger.info(f"Adresse: '{adresse[:50]}...'")
-            else:
-                logger.info(f"Adresse: '{adresse}'")
-            
-            if details:
-                if len(details) > 50:
-                    logger.info(f"Détails: '{details[:50]}...'")
-                else:
-                    logger.info(f"Détails: '{details}'")
+            try:
+                idempotency_key = self.get_idempotency_key()
+            except ValueError:
+                # Formulaire classique: une clé malformée n'empêche pas l'envoi de l'alerte
+                logger.warning("Clé d'idempotence invalide ignorée")
+                idempotency_key = None
+            http_status, result = self.process_alert(self.get_alert_fields(), idempotency_key)
             
-            # Validation des données (détails optionnel)
-            if not all([nom_prenom, telephone, adresse, type_sinistre]):
-                logger.warning("Tentative de soumission avec des champs manquants")
+            if http_status == 400:
                 return redirect("/?error=Tous les champs obligatoires doivent être remplis")
+            if http_status == 503:
+                return redirect("/?error=Trop+d+alertes+en+attente+de+transmission.+Veuillez+reessayer.")
             
-            # Logging complet des informations reçues (si activé dans la config)
-            if self.config.get('logging.log_all_data', True):
-                logger.info("=" * 50)
-                logger.info("📝 NOUVELLE ALERTE REÇUE")
-                logger.info(f"Nom/Prénom: {nom_prenom}")
-                logger.info(f"Téléphone: {telephone}")
-                logger.info(f"Adresse: {adresse}")
-                logger.info(f"Type sinistre: {type_sinistre}")
-                if details:
-                    logger.info(f"Détails: {details}")
-                logger.info(f"Timestamp: {time.strftime('%d/%m/%Y %H:%M:%S')}")
-                logger.info(f"IP source: {request.environ.get('REMOTE_ADDR', 'Unknown')}")
-                logger.info("=" * 50)
-            else:
-                logger.info(f"Nouvelle alerte reçue - Type: {type_sinistre} - IP: {request.environ.get('REMOTE_ADDR', 'Unknown')}")
-            
-            # Formatage du message pour Meshtastic
-            message, is_truncated = self.format_emergency_message(nom_prenom, telephone, adresse, type_sinistre, details)
-            
-            # Log du message final
-            logger.info(f"Message formaté ({len(message)} caractères): {message}")
-            if is_truncated:
-                logger.warning("⚠️ Message tronqué pour respecter la limite de 200 caractères")
-            
-            # Envoi via Meshtastic
-            success = False
-            try:
-                success = self.meshtastic_handler.send_message(message)
-                logger.info(f"Résultat envoi Meshtastic: {success}")
-            except Exception as send_err:
-                logger.error(f"Exception lors de l'envoi Meshtastic: {send_err}")
-                success = False
+            alert_id = result['alert_id']
+            success_msg = f"Alerte d'urgence enregistree (ID {alert_id}), transmission via Meshtastic en cours."
+            if result['truncated']:
+                success_msg += f" (Message adapte a la limite Meshtastic de {self.config.snapshot.max_message_length} octets)"
             
-            if success:
-                logger.info(f"✅ Alerte envoyée avec succès - {nom_prenom} - {type_sinistre}")
-                success_msg = "Message d'urgence envoye avec succes ! Votre alerte a ete transmise."
-                if is_truncated:
-                    success_msg += " (Message adapte a la limite Meshtastic de 200 caracteres)"
-                
-                # Simplifier le redirect sans encodage complexe
-                return redirect(f"/?success={success_msg.replace(' ', '+')}")
-            else:
-                logger.error(f"❌ Échec d'envoi de l'alerte - {nom_prenom} - {type_sinistre}")
-                return redirect("/?error=Erreur+lors+de+l+envoi+via+Meshtastic.+Veuillez+reessayer.")
+            # Simplifier le redirect sans encodage complexe
+            return redirect(f"/?success={success_msg.replace(' ', '+')}&alert={alert_id}")
         except HTTPResponse:
             # Les redirections Bottle sont normales, on les laisse passer
             raise        
@@ -571,109 +4078,429 @@ class EmergencyApp:
             logger.error(f"Erreur traitement formulaire: {e}")
             return redirect("/?error=Erreur interne du serveur")
     
+    def api_submit_alert(self):
+        """Soumission d'une alerte (JSON ou formulaire): résultat compact en une seule réponse"""
+        try:
+            data = request.json  # None si le corps n'est pas du JSON (formulaire)
+            if data is not None and not isinstance(data, dict):
+                raise ValueError("objet JSON attendu")
+            idempotency_key = self.get_idempotency_key(data)
+        except (HTTPError, ValueError) as e:
+            http_status, result = 400, {"status": "ERROR", "error": "JSON invalide" if isinstance(e, HTTPError) else str(e)}
+        else:
+            try:
+                http_status, result = self.process_alert(self.get_alert_fields(data), idempotency_key)
+            except Exception as e:
+                logger.error(f"Erreur traitement alerte (API): {e}")
+                http_status, result = 500, {"status": "ERROR", "error": "Erreur interne du serveur"}
+        
+        response.status = http_status
+        if http_status == 503:
+            response.set_header('Retry-After', str(result.get('retry_after', 10)))
+        response.content_type = 'application/json'
+        return COMPACT_JSON.encode(result)
+    
+    def get_alert_fields(self, data=None):
+        """Champs d'une alerte depuis un objet JSON (data) ou le formulaire soumis, décodés en UTF-8"""
+        fields = {}
+        for name in ALERT_FIELDS:
+            try:
+                if data is not None:
+                    value = data.get(name)
+                    value = str(value) if value is not None else ''
+                else:
+                    # Bottle décode les formulaires en latin-1: getunicode restitue l'UTF-8 envoyé par le navigateur
+                    value = request.forms.getunicode(name, default='')
+                fields[name] = value.strip()
+            except Exception as e:
+                logger.error(f"Erreur récupération {name}: {e}")
+                fields[name] = ''
+        return fields
+    
+    def get_idempotency_key(self, data=None):
+        """Clé d'idempotence de la soumission (en-tête Idempotency-Key ou champ idempotency_key)"""
+        key = request.headers.get('Idempotency-Key')
+        if not key:
+            key = data.get('idempotency_key') if data is not None else request.forms.get('idempotency_key')
+        key = str(key).strip() if key else ''
+        if key and not IDEMPOTENCY_KEY.fullmatch(key):
+            raise ValueError("clé d'idempotence invalide")
+        return key or None
+    
+    def process_alert(self, fields, idempotency_key=None):
+        """Traite une soumission; une clé d'idempotence déjà vue renvoie l'alerte existante sans nouvel envoi"""
+        if not idempotency_key:
+            return self.register_alert(fields)
+        
+        previous = self.idempotency.claim(idempotency_key)
+        if previous:
+            logger.info("🔁 Soumission répétée, alerte %s déjà enregistrée", previous['alert_id'],
+                        extra=alert_context(previous['alert_id']))
+            return 202, self.alert_result(previous['alert_id'], previous['truncated'], replayed=True)
+        
+        http_status, result = 500, None
+        try:
+            http_status, result = self.register_alert(fields, IdempotencyStore.alert_id(idempotency_key))
+        finally:
+            # Seule une alerte acceptée fige la clé: un refus (champs, file pleine) peut être retenté
+            self.idempotency.complete(idempotency_key, {'alert_id': result['alert_id'], 'truncated': result['truncated']}
+                                      if http_status == 202 else None)
+        return http_status, result
+    
+    def alert_result(self, alert_id, truncated, **flags):
+        """Résultat JSON compact d'une alerte acceptée: identifiant, troncature, état de transmission"""
+        status = self.meshtastic_handler.get_alert_status(alert_id) or {}
+        result = {
+            "status": "OK",
+            "alert_id": alert_id,
+            "truncated": truncated,
+            "state": status.get('state'),
+            "state_label": status.get('state_label'),
+            "queue_position": status.get('queue_position'),
+            "queue_length": status.get('queue_length')
+        }
+        result.update(flags)  # replayed, duplicate ou reports selon le cas
+        return result
+    
+    def register_alert(self, fields, alert_id=None):
+        """Valide, journalise, formate et met en file une alerte; retourne (code HTTP, résultat JSON)"""
+        nom_prenom = fields['nom_prenom']
+        telephone = fields['telephone']
+        adresse = fields['adresse']
+        type_sinistre = fields['type_sinistre']
+        details = fields['details']
+        
+        # Log des données reçues: un seul enregistrement, mis en forme par le thread d'écriture
+        context = alert_context(alert_id)
+        logger.info("Formulaire reçu - Nom: '%s', Tel: '%s', Type: '%s', Adresse: '%.50s', Détails: '%.50s'",
+                    nom_prenom, telephone, type_sinistre, adresse, details, extra=context)
+        
+        # Validation des données (détails optionnel)
+        if not all([nom_prenom, telephone, adresse, type_sinistre]):
+            logger.warning("Tentative de soumission avec des champs manquants", extra=context)
+            return 400, {"status": "ERROR", "error": "Tous les champs obligatoires doivent être remplis"}
+        if len(telephone) > MAX_PHONE_LENGTH:
+            logger.warning("Numéro de téléphone refusé (%d caractères)", len(telephone), extra=context)
+            return 400, {"status": "ERROR", "error": "Numéro de téléphone invalide"}
+        
+        # Logging complet des informations reçues (si activé dans la config)
+        remote_addr = request.environ.get('REMOTE_ADDR', 'Unknown')
+        if self.config.snapshot.logging.log_all_data:
+            logger.info(ALERT_LOG_BANNER, nom_prenom, telephone, adresse, type_sinistre, details,
+                        time.strftime('%d/%m/%Y %H:%M:%S'), remote_addr, extra=context)
+        else:
+            logger.info("Nouvelle alerte reçue - Type: %s - IP: %s", type_sinistre, remote_addr, extra=context)
+        
+        idempotent = alert_id is not None  # ID imposé: dérivé d'une clé d'idempotence
+        duplicates = self.duplicates  # Index conservé jusqu'à l'issue, même si un rechargement le remplace
+        key = DuplicateIndex.key(fields, self.get_alert_code(type_sinistre)) if duplicates else None
+        if key is None:
+            return self.enqueue_alert(fields, alert_id, idempotent)
+        
+        # Recherche et enregistrement sous le même verrou: deux témoins simultanés ne créent qu'une alerte.
+        # La mise en file (fsync du journal) se fait hors verrou: seuls les signalements du même sinistre attendent.
+        now = time.time()
+        alert_id = alert_id or MeshtasticHandler.new_alert_id()
+        with duplicates.lock:
+            incident = duplicates.find(key, now)
+            while incident and incident['pending']:
+                duplicates.lock.wait()
+                incident = duplicates.find(key, time.time())
+            folded = incident is not None
+            if not folded:
+                incident = duplicates.add(key, alert_id, fields, normalize_phone(telephone), now)
+        if folded:
+            return self.fold_alert(duplicates, key, incident, fields, now)
+        
+        http_status, result = 500, None
+        try:
+            http_status, result = self.enqueue_alert(fields, alert_id, idempotent)
+        finally:
+            with duplicates.lock:
+                duplicates.settle(key, incident, result['truncated'] if http_status == 202 else None)
+        return http_status, result
+    
+    def fold_alert(self, duplicates, key, incident, fields, now):
+        """Regroupe un signalement avec l'alerte du même sinistre; une alerte déjà transmise n'est jamais renvoyée"""
+        alert_id = incident['alert_id']
+        phone = normalize_phone(fields['telephone'])
+        with duplicates.lock:
+            duplicates.touch(key, incident, now)
+            duplicate = phone in incident['phones'] or not self.config.snapshot.dedup.merge
+            if duplicate:
+                duplicates.counters['duplicates'] += 1
+            else:
+                incident['phones'].add(phone)
+                incident['reports'] += 1
+                duplicates.counters['merged'] += 1
+        
+        if duplicate:
+            logger.info("🔁 Doublon de l'alerte %s ignoré (même téléphone, adresse et type)", alert_id,
+                        extra=alert_context(alert_id))
+            return 202, self.alert_result(alert_id, incident['truncated'], duplicate=True)
+        
+        # Le message non encore transmis est reformaté avec le nombre de témoins (en tête, jamais tronqué).
+        # Un regroupement à la fois par sinistre: le dernier message écrit porte le compte le plus élevé.
+        with incident['lock']:
+            reports = incident['reports']
+            original = incident['fields']
+            details = f"[{reports} signalements] {original['details']}".strip()
+            message, is_truncated = self.format_emergency_message(original['nom_prenom'], original['telephone'],
+                                                                  original['adresse'], original['type_sinistre'], details)
+            updated = self.meshtastic_handler.update_message(alert_id, message)
+            if updated:
+                incident['truncated'] = is_truncated
+        if updated:
+            logger.info("🧩 Signalement regroupé avec l'alerte %s (%d signalements, message mis à jour)",
+                        alert_id, reports, extra=alert_context(alert_id))
+        else:
+            logger.info("🧩 Signalement regroupé avec l'alerte %s (%d signalements), déjà transmise: pas de renvoi",
+                        alert_id, reports, extra=alert_context(alert_id))
+        return 202, self.alert_result(alert_id, incident['truncated'], reports=reports)
+    
+    def enqueue_alert(self, fields, alert_id=None, idempotent=False):
+        """Formate une alerte validée et la place dans la file d'émission; retourne (code HTTP, résultat JSON)"""
+        nom_prenom = fields['nom_prenom']
+        telephone = fields['telephone']
+        adresse = fields['adresse']
+        type_sinistre = fields['type_sinistre']
+        details = fields['details']
+        
+        # Formatage du message pour Meshtastic
+        message, is_truncated = self.format_emergency_message(nom_prenom, telephone, adresse, type_sinistre, details)
+        
+        # Un paquet au-delà de la limite serait refusé par la radio à chaque tentative
+        context = alert_context(alert_id)
+        max_length = self.config.snapshot.max_message_length
+        packets = message if isinstance(message, list) else [message]
+        if any(len(packet if isinstance(packet, bytes) else packet.encode('utf-8')) > max_length for packet in packets):
+            logger.error("❌ Alerte refusée, message irréductible sous %d octets - %s - %s",
+                         max_length, nom_prenom, type_sinistre, extra=context)
+            return 400, {"status": "ERROR", "error": "Alerte trop longue pour le réseau, même tronquée"}
+        
+        # Log du message final
+        if isinstance(message, list):
+            logger.info("Message fragmenté en %d paquets", len(message), extra=context)
+        elif isinstance(message, bytes):
+            logger.info("Message binaire formaté (%d octets): %s", len(message), message.hex(), extra=context)
+        else:
+            logger.info("Message formaté (%d octets): %s", len(message.encode('utf-8')), message, extra=context)
+        if is_truncated:
+            logger.warning("⚠️ Message tronqué pour respecter la limite de %d octets",
+                           self.config.snapshot.max_message_length, extra=context)
+        
+        # Contrôle d'admission: au-delà du seuil, seules les priorités les plus urgentes entrent en file
+        priority = self.get_alert_code(type_sinistre)
+        backlog, drain_time = self.meshtastic_handler.backlog()
+        max_backlog = self.config.get('admission.max_backlog', 30)
+        if (max_backlog and backlog >= max_backlog and not self.meshtastic_handler.is_known(alert_id)
+                and priority > self.config.get('admission.always_admit_priority', 1)):
+            logger.warning("🚦 Alerte refusée, %d alertes en attente d'émission - %s - %s",
+                           backlog, nom_prenom, type_sinistre, extra=context)
+            return 503, {"status": "ERROR", "error": "Trop d'alertes en attente de transmission. Veuillez réessayer.",
+                         "retry_after": self.retry_after(drain_time)}
+        
+        # Mise en file d'émission: la radio est pilotée par un thread dédié
+        try:
+            alert_id = self.meshtastic_handler.enqueue_message(message, priority, alert_id, idempotent)
+        except OSError:
+            logger.error("❌ Alerte refusée, journal des alertes inaccessible - %s - %s", nom_prenom, type_sinistre,
+                         extra=context)
+            return 503, {"status": "ERROR", "error": "Enregistrement de l'alerte impossible. Veuillez réessayer.",
+                         "retry_after": self.retry_after(0)}
+        if not alert_id:
+            logger.error("❌ Alerte refusée, file d'émission pleine - %s - %s", nom_prenom, type_sinistre, extra=context)
+            return 503, {"status": "ERROR", "error": "Trop d'alertes en attente de transmission. Veuillez réessayer.",
+                         "retry_after": self.retry_after(self.meshtastic_handler.backlog()[1])}
+        
+        logger.info("✅ Alerte %s enregistrée - %s - %s", alert_id, nom_prenom, type_sinistre, extra=alert_context(alert_id))
+        return 202, self.alert_result(alert_id, is_truncated)
+    
+    @staticmethod
+    def retry_after(drain_time):
+        """Délai de réessai conseillé d'après le temps d'écoulement estimé de la file (5 s à 5 min)"""
+        return min(300, max(5, int(drain_time + 0.999)))
+    
+    def get_alert_code(self, type_sinistre):
+        """Code numérique du type d'alerte, utilisé aussi comme priorité d'émission"""
+        return self.config.snapshot.alert_codes.get(type_sinistre, 3)  # 3 = "Autre" par défaut
+    
     def format_emergency_message(self, nom_prenom, telephone, adresse, type_sinistre, details=None):
         """Formate le message d'urgence pour Meshtastic au format JSON avec codes numériques"""
         
         # Récupération du code numérique pour le type d'alerte
-        alert_codes = self.config.get('alert_types', {
-            'Incendie': 1,
-            'Secours à Personnes': 2,
-            'Autre': 3
-        })
-        
-        type_code = alert_codes.get(type_sinistre, 3)  # 3 = "Autre" par défaut
-        
-        # Structure JSON du message
-        message_data = {
-            "type": type_code,
-            "nom": nom_prenom,
-            "tel": telephone,
-            "adresse": adresse
-        }
+        config = self.config.snapshot
+        type_code = config.alert_codes.get(type_sinistre, 3)
         
-        # Ajouter les détails si présents
-        if details and details.strip():
-            message_data["details"] = details.strip()
+        # Mode fragmentation: l'alerte complète part en plusieurs paquets plutôt que tronquée
+        if config.oversize_mode == 'fragment':
+            fragments = self.format_fragmented_message(type_code, nom_prenom, telephone, adresse, details)
+            if fragments:
+                return fragments, False
         
-        # Conversion en JSON compact (sans espaces)
-        message = json.dumps(message_data, ensure_ascii=False, separators=(',', ':'))
+        if config.wire_format == 'binary':
+            return self.format_binary_message(type_code, nom_prenom, telephone, adresse, details)
         
-        # Vérification de la limite de caractères (configurable)
-        max_length = self.config.get('meshtastic.max_message_length', 200)
-        is_truncated = False
+        max_length = config.max_message_length
+        details = details.strip() if details and details.strip() else None
         
-        if len(message) > max_length:
-            is_truncated = True
-            logger.warning(f"Message JSON trop long ({len(message)} caractères), troncature nécessaire")
-            
-            # Stratégie de troncature intelligente - PRIORITÉ À L'ADRESSE
-            # 1. Essayer de raccourcir les détails en premier
-            if details and len(details) > 30:
-                details_court = details[:27] + "..."
-                message_data["details"] = details_court
-                message = json.dumps(message_data, ensure_ascii=False, separators=(',', ':'))
-                logger.info(f"Étape 1 - Détails raccourcis: {len(message)} caractères")
-            
-            # 2. Essayer de raccourcir le nom
-            if len(message) > max_length and len(nom_prenom) > 20:
-                nom_court = nom_prenom[:17] + "..."
-                message_data["nom"] = nom_court
-                message = json.dumps(message_data, ensure_ascii=False, separators=(',', ':'))
-                logger.info(f"Étape 2 - Nom raccourci: {len(message)} caractères")
-            
-            # 3. Si toujours trop long, raccourcir davantage le nom
-            if len(message) > max_length and len(nom_prenom) > 10:
-                nom_tres_court = nom_prenom[:7] + "..."
-                message_data["nom"] = nom_tres_court
-                message = json.dumps(message_data, ensure_ascii=False, separators=(',', ':'))
-                logger.info(f"Étape 3 - Nom très raccourci: {len(message)} caractères")
-            
-            # 4. Supprimer les détails complètement si nécessaire
-            if len(message) > max_length and "details" in message_data:
-                del message_data["details"]
-                message = json.dumps(message_data, ensure_ascii=False, separators=(',', ':'))
-                logger.info(f"Étape 4 - Détails supprimés: {len(message)} caractères")
-            
-            # 5. Si toujours trop long, nom minimal
-            if len(message) > max_length:
-                nom_minimal = nom_prenom[:5] + "..." if len(nom_prenom) > 5 else nom_prenom
-                message_data["nom"] = nom_minimal
-                message = json.dumps(message_data, ensure_ascii=False, separators=(',', ':'))
-                logger.info(f"Étape 5 - Nom minimal: {len(message)} caractères")
+        # Cas courant: le message complet tient, une seule sérialisation suffit
+        message_data = {"type": type_code, "nom": nom_prenom, "tel": telephone, "adresse": adresse}
+        if details:
+            message_data["details"] = details
+        message = COMPACT_JSON.encode(message_data)
+        size = len(message.encode('utf-8'))
+        if size <= max_length:
+            logger.info("Message JSON final: %d octets - Contenu: %s", size, message)
+            return message, False
+        
+        # Coût encodé de chaque champ, calculé une seule fois
+        texts = {'nom': nom_prenom, 'adresse': adresse}
+        if details:
+            texts['details'] = details
+        costs = {name: json_string_cost(text) for name, text in texts.items()}
+        
+        # Squelette JSON sans les champs tronquables (les détails, optionnels, portent leur clé)
+        skeleton = {"type": type_code, "nom": "", "tel": telephone, "adresse": ""}
+        skeleton_cost = len(COMPACT_JSON.encode(skeleton).encode('utf-8'))
+        details_key_cost = len(',"details":""')
+        
+        logger.warning("Message JSON trop long (%d octets), troncature nécessaire", size)
+        fields = [{
+            'name': name,
+            'cost': costs[name],
+            'priority': config.truncation[name]['priority'],
+            'min_length': config.truncation[name]['min_length'],
+            'optional': name == 'details',
+            'key_cost': details_key_cost
+        } for name in texts]
+        
+        allocation = allocate_field_budgets(fields, max_length - skeleton_cost)
+        texts = {name: texts[name] if allocation[name] >= costs[name]
+                 else truncate_to_cost(texts[name], allocation[name])
+                 for name in texts if name in allocation}
+        logger.info("Budget réparti: %s", allocation)
+        
+        # Une seule sérialisation du message tronqué
+        message_data = {"type": type_code, "nom": texts['nom'], "tel": telephone, "adresse": texts['adresse']}
+        if 'details' in texts:
+            message_data["details"] = texts['details']
+        message = COMPACT_JSON.encode(message_data)
+        
+        size = len(message.encode('utf-8'))
+        if size > max_length:
+            logger.error("Message JSON incompressible: %d octets (limite: %d)", size, max_length)
+        
+        logger.info("Message JSON final: %d octets - Contenu: %s", size, message)
+        return message, True
+    
+    def format_fragmented_message(self, type_code, nom_prenom, telephone, adresse, details=None):
+        """Encode l'alerte sans troncature; la découpe en fragments si elle dépasse la limite.
+        
+        Retourne None si le nombre de fragments dépasserait max_fragments (troncature classique).
+        """
+        config = self.config.snapshot
+        max_length = config.max_message_length
+        details = details.strip() if details and details.strip() else None
+        
+        if config.wire_format == 'binary':
+            message = encode_binary_message(type_code, nom_prenom, telephone, adresse, details,
+                                            config.meshtastic.get('compression', True))
+        else:
+            message_data = {"type": type_code, "nom": nom_prenom, "tel": telephone, "adresse": adresse}
+            if details:
+                message_data["details"] = details
+            message = COMPACT_JSON.encode(message_data)
+        
+        size = len(message) if isinstance(message, bytes) else len(message.encode('utf-8'))
+        if size <= max_length:
+            return message
+        
+        max_fragments = config.max_fragments
+        if fragment_count(message, max_length) > max_fragments:
+            logger.warning("Message de %d octets: plus de %d fragments, troncature appliquée", size, max_fragments)
+            return None
+        
+        fragments = fragment_message(message, max_length)
+        logger.info("Message de %d octets découpé en %d fragments", size, len(fragments))
+        return fragments
+    
+    def format_binary_message(self, type_code, nom_prenom, telephone, adresse, details=None):
+        """Formate le message d'urgence en trame binaire compacte (limite exprimée en octets)"""
+        max_length = self.config.snapshot.max_message_length
+        details = details.strip() if details and details.strip() else None
+        compress = self.config.get('meshtastic.compression', True)
+        
+        # Budgets en octets UTF-8 par champ, réduits jusqu'à ce que la trame (compressée ou non) tienne.
+        # Même priorité qu'en JSON: les détails, puis le nom, puis l'adresse en dernier recours.
+        budgets = {
+            'details': len(details.encode('utf-8')) if details else 0,
+            'nom': len(nom_prenom.encode('utf-8')),
+            'adresse': len(adresse.encode('utf-8'))
+        }
+        details_min = min(budgets['details'], 20)  # En deçà, les détails sont supprimés
+        is_truncated = False
+        while True:
+            details_out = truncate_utf8(details, budgets['details']) if details and budgets['details'] >= details_min else None
+            message = encode_binary_message(type_code, truncate_utf8(nom_prenom, budgets['nom']),
+                                            telephone, truncate_utf8(adresse, budgets['adresse']),
+                                            details_out, compress)
+            excess = len(message) - max_length
+            if excess <= 0:
+                break
             
-            # 6. En dernier recours, raccourcir l'adresse mais le moins possible
-            if len(message) > max_length:
-                # Calculer l'espace disponible pour l'adresse
-                # Créer un message de base sans adresse pour calculer l'espace
-                temp_data = {
-                    "type": type_code,
-                    "nom": message_data["nom"],
-                    "tel": telephone,
-                    "adresse": ""
-                }
-                message_base = json.dumps(temp_data, ensure_ascii=False, separators=(',', ':'))
-                espace_disponible = max_length - len(message_base) + 2  # +2 pour les guillemets de l'adresse vide
-                
-                if espace_disponible > 10:  # Si on a au moins 10 caractères pour l'adresse
-                    adresse_tronquee = adresse[:espace_disponible-3] + "..."
-                    message_data["adresse"] = adresse_tronquee
-                    message = json.dumps(message_data, ensure_ascii=False, separators=(',', ':'))
-                else:
-                    # Adresse ultra-minimale
-                    message_data["adresse"] = adresse[:35] + "..." if len(adresse) > 35 else adresse
-                    message = json.dumps(message_data, ensure_ascii=False, separators=(',', ':'))
-                
-                logger.warning(f"Étape 6 - Adresse raccourcie en dernier recours: {len(message)} caractères")
+            if not is_truncated:
+                logger.warning("Trame binaire trop longue (%d octets), troncature nécessaire", len(message))
+                is_truncated = True
             
-            # 7. Troncature brutale finale si vraiment nécessaire
-            if len(message) > max_length:
-                message = message[:max_length-3] + "..."
-                logger.warning("Troncature brutale appliquée au JSON")
+            if details_out:
+                budgets['details'] -= excess
+            elif budgets['nom'] > 8:
+                budgets['nom'] = max(budgets['nom'] - excess, 8)
+            elif budgets['adresse'] > 3:
+                budgets['adresse'] = max(budgets['adresse'] - excess, 3)
+            else:
+                break
         
-        logger.info(f"Message JSON final: {len(message)} caractères")
-        logger.info(f"Contenu: {message}")
+        logger.info("Trame binaire finale: %d octets", len(message))
         return message, is_truncated
     
+    def get_alert_status_block(self, alert_id):
+        """Bloc HTML de suivi de transmission d'une alerte, actualisé côté navigateur"""
+        status = self.meshtastic_handler.get_alert_status(alert_id) if alert_id else None
+        if not status:
+            return ''
+        
+        label = status['state_label']
+        if status['queue_position']:
+            label += f" (position {status['queue_position']}/{status['queue_length']})"
+        
+        return f"""<div class="alert-status" id="alert-status" data-alert="{status['alert_id']}">
+            <br><strong>État:</strong> <span id="alert-state">{label}</span>
+        </div>
+        <script>
+            (function() {{
+                var el = document.getElementById('alert-status');
+                function refresh() {{
+                    fetch('/api/alerts/' + el.dataset.alert).then(function(r) {{ return r.json(); }}).then(function(s) {{
+                        var label = s.state_label;
+                        if (s.queue_position) {{ label += ' (position ' + s.queue_position + '/' + s.queue_length + ')'; }}
+                        document.getElementById('alert-state').textContent = label;
+                        if (s.state === 'queued' || s.state === 'sending') {{ setTimeout(refresh, 2000); }}
+                    }}).catch(function() {{ setTimeout(refresh, 5000); }});
+                }}
+                if ('{status['state']}' === 'queued' || '{status['state']}' === 'sending') {{ setTimeout(refresh, 1000); }}
+            }})();
+        </script>"""
+    
+    def alert_status(self, alert_id):
+        """Retourne l'état de transmission d'une alerte"""
+        status = self.meshtastic_handler.get_alert_status(alert_id)
+        if not status:
+            response.status = 404
+            return {"status": "ERROR", "error": "Alerte inconnue"}
+        return status
+    
     def version_info(self):
         """Retourne les informations de version"""
         return {
@@ -684,176 +4511,149 @@ class EmergencyApp:
             "config_version": self.config.get('app.version', VERSION)
         }
     
-    def static_files(self, filename):
-        """Sert les fichiers statiques (logos, CSS, JS)"""
-        static_dir = self.config.get('web.static_dir', './static')
-        try:
-            return static_file(filename, root=static_dir)
-        except:
-            response.status = 404
-            return "Fichier non trouvé"
-    
-    def health_check(self):
-        """Point de contrôle de santé du service"""
-        try:
-            meshtastic_status = "OK" if self.meshtastic_handler.interface else "ERROR"
-            template_dir = self.config.get('web.template_dir', './templates')
-            template_exists = os.path.exists(os.path.join(template_dir, 'index.html'))
-            
-            return {
-                "status": "OK",
-                "version": self.config.get('app.version', VERSION),
-                "meshtastic": meshtastic_status,
-                "template_file": "FOUND" if template_exists else "NOT_FOUND",
-                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
-            }
-        except Exception as e:
-            response.status = 500
-            return {"status": "ERROR", "error": str(e), "version": VERSION}
+    def get_alert_queue_script(self):
+        """File d'envoi hors ligne intégrée à la page (évite une requête), vide si le fichier est absent"""
+        path = os.path.join(self.config.get('web.template_dir', './templates'), 'alert-queue.js')
+        if not os.path.exists(path):
+            return ''
+        return f"<script>{self.templates.render(path, {}, {})}</script>"
     
-    # === ADMINISTRATION ===
+    def alert_queue_script(self):
+        """File d'envoi hors ligne, chargée par le service worker (importScripts)"""
+        return self.send_template_file('alert-queue.js', 'application/javascript; charset=utf-8')
     
-    def generate_session_id(self):
-        """Génère un ID de session unique"""
-        return hashlib.sha256(f"{time.time()}{os.urandom(16)}".encode()).hexdigest()
+    def service_worker(self):
+        """Service worker du formulaire (hors ligne et envoi différé), servi à la racine pour couvrir tout le site"""
+        return self.send_template_file('sw.js', 'application/javascript; charset=utf-8')
     
-    def check_admin_session(self):
-        """Vérifie si l'utilisateur a une session admin valide"""
-        session_id = request.get_cookie('admin_session')
-        if not session_id or session_id not in self.admin_sessions:
-            return False
-        
-        session = self.admin_sessions[session_id]
-        timeout = self.config.get('admin.session_timeout', 3600)
-        
-        if time.time() - session['created'] > timeout:
-            del self.admin_sessions[session_id]
-            return False
-        
-        # Mettre à jour l'heure de dernière activité
-        session['last_activity'] = time.time()
-        return True
+    def web_manifest(self):
+        """Manifeste web: installation du formulaire sur l'écran d'accueil du téléphone"""
+        return self.send_template_file('manifest.webmanifest', 'application/manifest+json; charset=utf-8')
     
-    def admin_login_page(self):
-        """Page de connexion administrateur"""
-        if not self.config.get('admin.enabled', True):
+    def send_template_file(self, name, content_type):
+        """Envoie un fichier du répertoire des templates (variables d'application substituées) avec ETag"""
+        path = os.path.join(self.config.get('web.template_dir', './templates'), name)
+        if not os.path.exists(path):
             response.status = 404
-            return "Administration désactivée"
+            return "Fichier non trouvé"
+        static = {
+            '{{channel_name}}': self.config.get('meshtastic.channel_name'),
+            '{{channel_index}}': str(self.config.get('meshtastic.channel_index')),
+            '{{app_version}}': self.config.get('app.version', VERSION)
+        }
+        return self.send_page(self.templates.render(path, static, {}), content_type)
+    
+    def static_files(self, filename):
+        """Sert les fichiers statiques (logos, CSS, JS)"""
+        asset = self.static_assets.get(filename) if self.static_assets else None
+        if not asset:
+            static_dir = self.config.get('web.static_dir', './static')
+            try:
+                return static_file(filename, root=static_dir)
+            except:
+                response.status = 404
+                return "Fichier non trouvé"
         
-        if self.check_admin_session():
-            return redirect('/admin/dashboard')
+        response.set_header('Last-Modified', asset.last_modified)
+        # URL empreintée: le contenu ne changera jamais à cette adresse
+        if request.query.get('v') == asset.fingerprint:
+            return self.send_variant(asset, 'public, max-age=31536000, immutable')
+        return self.send_variant(asset, 'no-cache')
+    
+    def send_variant(self, asset, cache_control):
+        """Envoie la variante d'encodage la plus adaptée au client, ou 304 si son ETag correspond"""
+        encoding, data, etag = self.static_assets.select(asset, request.headers.get('Accept-Encoding', ''))
+        response.set_header('ETag', etag)
+        response.set_header('Cache-Control', cache_control)
+        if len(asset.variants) > 1:
+            response.set_header('Vary', 'Accept-Encoding')
         
-        error_message = request.query.get('error', '')
+        if etag in request.headers.get('If-None-Match', ''):
+            response.status = 304
+            return b''
         
-        return f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Administration - Gaulix Alerte Réseau D'urgence Intervention Assistée Meshtastic - GARDIA-M</title>
-            <meta charset="utf-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1">
-            <style>
-                body {{
-                    font-family: Arial, sans-serif;
-                    background-color: #f5f5f5;
-                    display: flex;
-                    justify-content: center;
-                    align-items: center;
-                    min-height: 100vh;
-                    margin: 0;
-                }}
-                .login-container {{
-                    background: white;
-                    padding: 40px;
-                    border-radius: 10px;
-                    box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-                    width: 100%;
-                    max-width: 400px;
-                }}
-                h1 {{
-                    text-align: center;
-                    color: #333;
-                    margin-bottom: 30px;
-                }}
-                .form-group {{
-                    margin-bottom: 20px;
-                }}
-                label {{
-                    display: block;
-                    margin-bottom: 5px;
-                    font-weight: bold;
-                    color: #333;
-                }}
-                input[type="text"], input[type="password"] {{
-                    width: 100%;
-                    padding: 12px;
-                    border: 2px solid #ddd;
-                    border-radius: 5px;
-                    font-size: 16px;
-                    box-sizing: border-box;
-                }}
-                input[type="text"]:focus, input[type="password"]:focus {{
-                    border-color: #4CAF50;
-                    outline: none;
-                }}
-                .btn {{
-                    background-color: #2196F3;
-                    color: white;
-                    padding: 12px 24px;
-                    border: none;
-                    border-radius: 5px;
-                    font-size: 16px;
-                    cursor: pointer;
-                    width: 100%;
-                }}
-                .btn:hover {{
-                    background-color: #1976D2;
-                }}
-                .error {{
-                    background-color: #ffebee;
-                    color: #c62828;
-                    padding: 10px;
-                    border-radius: 5px;
-                    margin-bottom: 20px;
-                    border-left: 4px solid #f44336;
-                }}
-                .back-link {{
-                    text-align: center;
-                    margin-top: 20px;
-                }}
-                .back-link a {{
-                    color: #666;
-                    text-decoration: none;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="login-container">
-                <h1>🔐 Administration</h1>
-                
-                {f'<div class="error">{error_message}</div>' if error_message else ''}
-                
-                <form method="post" action="/admin/login">
-                    <div class="form-group">
-                        <label for="username">Nom d'utilisateur:</label>
-                        <input type="text" id="username" name="username" required>
-                    </div>
-                    
-                    <div class="form-group">
-                        <label for="password">Mot de passe:</label>
-                        <input type="password" id="password" name="password" required>
-                    </div>
-                    
-                    <button type="submit" class="btn">Se connecter</button>
-                </form>
-                
-                <div class="back-link">
-                    <a href="/">← Retour au formulaire d'urgence</a>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        response.content_type = asset.content_type
+        if encoding != 'identity':
+            response.set_header('Content-Encoding', encoding)
+        return data
+    
+    def health_check(self):
+        """Point de contrôle de santé du service"""
+        try:
+            connection_state = self.meshtastic_handler.connection_state()
+            template_dir = self.config.get('web.template_dir', './templates')
+            template_exists = os.path.exists(os.path.join(template_dir, 'index.html'))
+            
+            return {
+                "status": "OK",
+                "version": self.config.get('app.version', VERSION),
+                "meshtastic": CONNECTION_STATES[connection_state][0],
+                "meshtastic_state": connection_state,
+                "radios": self.meshtastic_handler.pool.status(),
+                "queue_length": len(self.meshtastic_handler.scheduler),
+                "scheduler": self.meshtastic_handler.get_scheduler_stats(),
+                "outbox_pending": len(self.meshtastic_handler.outbox.entries) if self.meshtastic_handler.outbox else None,
+                "web": self.web_server.srv.stats() if self.web_server and hasattr(self.web_server, 'srv') else None,
+                "template_file": "FOUND" if template_exists else "NOT_FOUND",
+                "template_cache": self.templates.stats(),
+                "logos_cache": dict(self.logos_stats, cached=self.logos_cache is not None),
+                "static_cache": self.static_assets.stats() if self.static_assets else None,
+                "compression": self.compressor.stats() if self.compressor else None,
+                "bundle": self.bundle.stats() if self.bundle else None,
+                "idempotency": self.idempotency.stats(),
+                "dedup": self.duplicates.stats() if self.duplicates else None,
+                "rate_limit": self.rate_limiter.stats(),
+                "admin_sessions": self.admin_sessions.stats(),
+                "logging": log_pipeline.stats() if log_pipeline else None,
+                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
+            }
+        except Exception as e:
+            response.status = 500
+            return {"status": "ERROR", "error": str(e), "version": VERSION}
+    
+    # === ADMINISTRATION ===
+    
+    def send_page(self, page, content_type='text/html; charset=utf-8'):
+        """Envoie une page HTML avec ETag: 304 sans corps si le navigateur possède déjà cette version"""
+        body = page.encode('utf-8')
+        etag = f'"{hashlib.sha1(body).hexdigest()[:20]}"'
+        response.set_header('ETag', etag)
+        response.set_header('Cache-Control', 'private, no-cache')
+        if etag in request.headers.get('If-None-Match', ''):
+            response.status = 304
+            return b''
+        response.content_type = content_type
+        return body
+    
+    def generate_session_id(self):
+        """Génère un ID de session unique"""
+        return hashlib.sha256(f"{time.time()}{os.urandom(16)}".encode()).hexdigest()
+    
+    def check_admin_session(self):
+        """Vérifie si l'utilisateur a une session admin valide"""
+        session_id = request.get_cookie('admin_session')
+        if self.admin_sessions.get(session_id) is None:
+            return False
+        
+        # Expiration glissante: le cookie est prolongé avec la session
+        if self.admin_sessions.sliding:
+            response.set_cookie('admin_session', session_id, max_age=self.admin_sessions.timeout)
+        return True
+    
+    def admin_login_page(self):
+        """Page de connexion administrateur"""
+        if not self.config.get('admin.enabled', True):
+            response.status = 404
+            return "Administration désactivée"
+        
+        if self.check_admin_session():
+            return redirect('/admin/dashboard')
+        
+        error_message = request.query.get('error', '')
+        
+        return self.send_page(self.admin_pages['login'].render({}, {
+            '{{error_block}}': f'<div class="error">{error_message}</div>' if error_message else ''
+        }))
     
     def admin_login(self):
         """Traitement de la connexion administrateur"""
@@ -870,11 +4670,7 @@ class EmergencyApp:
         if username == expected_username and password == expected_password:
             # Créer une session
             session_id = self.generate_session_id()
-            self.admin_sessions[session_id] = {
-                'created': time.time(),
-                'last_activity': time.time(),
-                'username': username
-            }
+            self.admin_sessions.create(session_id, username)
             
             response.set_cookie('admin_session', session_id, max_age=self.config.get('admin.session_timeout', 3600))
             logger.info(f"Connexion admin réussie pour {username} depuis {request.environ.get('REMOTE_ADDR', 'Unknown')}")
@@ -891,157 +4687,59 @@ class EmergencyApp:
         app_name = self.config.get('app.name', 'Gaulix Alerte Réseau D urgence Intervention Assistée Meshtastic - GARDIA-M')
         app_version = self.config.get('app.version', VERSION)
         
-        return f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Administration - {app_name}</title>
-            <meta charset="utf-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1">
-            <style>
-                body {{
-                    font-family: Arial, sans-serif;
-                    margin: 0;
-                    padding: 20px;
-                    background-color: #f5f5f5;
-                }}
-                .container {{
-                    max-width: 1200px;
-                    margin: 0 auto;
-                    background: white;
-                    padding: 30px;
-                    border-radius: 10px;
-                    box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-                }}
-                .header {{
-                    display: flex;
-                    justify-content: space-between;
-                    align-items: center;
-                    margin-bottom: 30px;
-                    padding-bottom: 20px;
-                    border-bottom: 2px solid #eee;
-                }}
-                h1 {{
-                    color: #333;
-                    margin: 0;
-                }}
-                .logout-btn {{
-                    background-color: #f44336;
-                    color: white;
-                    padding: 8px 16px;
-                    text-decoration: none;
-                    border-radius: 5px;
-                    font-size: 14px;
-                }}
-                .logout-btn:hover {{
-                    background-color: #d32f2f;
-                }}
-                .menu-grid {{
-                    display: grid;
-                    grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-                    gap: 20px;
-                    margin-bottom: 30px;
-                }}
-                .menu-card {{
-                    background: #f9f9f9;
-                    padding: 20px;
-                    border-radius: 8px;
-                    border-left: 4px solid #2196F3;
-                }}
-                .menu-card h3 {{
-                    margin-top: 0;
-                    color: #333;
-                }}
-                .btn {{
-                    background-color: #2196F3;
-                    color: white;
-                    padding: 10px 20px;
-                    text-decoration: none;
-                    border-radius: 5px;
-                    display: inline-block;
-                    margin-top: 10px;
-                }}
-                .btn:hover {{
-                    background-color: #1976D2;
-                }}
-                .btn-success {{
-                    background-color: #4CAF50;
-                }}
-                .btn-success:hover {{
-                    background-color: #45a049;
-                }}
-                .status {{
-                    display: flex;
-                    gap: 20px;
-                    margin-top: 20px;
-                }}
-                .status-item {{
-                    background: white;
-                    padding: 15px;
-                    border-radius: 5px;
-                    border: 1px solid #ddd;
-                    flex: 1;
-                }}
-                .status-ok {{
-                    border-left: 4px solid #4CAF50;
-                }}
-                .status-error {{
-                    border-left: 4px solid #f44336;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>🛠️ Administration - {app_name}</h1>
-                    <a href="/admin/logout" class="logout-btn">Déconnexion</a>
-                </div>
-                
-                <div class="menu-grid">
-                    <div class="menu-card">
-                        <h3>⚙️ Configuration</h3>
-                        <p>Modifier les paramètres du serveur, les types d'alerte, les logos et autres options.</p>
-                        <a href="/admin/config" class="btn">Éditer la configuration</a>
-                    </div>
-                    
-                    <div class="menu-card">
-                        <h3>📊 État du système</h3>
-                        <p>Vérifier l'état du serveur Meshtastic et des services.</p>
-                        <a href="/health" class="btn btn-success" target="_blank">Voir l'état</a>
-                    </div>
-                    
-                    <div class="menu-card">
-                        <h3>📋 Informations</h3>
-                        <p>Version du logiciel et informations techniques.</p>
-                        <a href="/version" class="btn" target="_blank">Voir les détails</a>
-                    </div>
-                </div>
-                
-                <div class="status">
-                    <div class="status-item status-ok">
-                        <strong>Version:</strong> {app_version}
-                    </div>
-                    <div class="status-item status-ok">
-                        <strong>Meshtastic:</strong> {'Connecté' if self.meshtastic_handler.interface else 'Déconnecté'}
-                    </div>
-                    <div class="status-item status-ok">
-                        <strong>Sessions admin:</strong> {len(self.admin_sessions)}
-                    </div>
-                </div>
-                
-                <div style="margin-top: 30px; text-align: center;">
-                    <a href="/" class="btn">← Retour au formulaire d'urgence</a>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        return self.send_page(self.admin_pages['dashboard'].render(
+            {'{{app_name}}': app_name, '{{app_version}}': app_version}, {
+                '{{meshtastic_state}}': CONNECTION_STATES[self.meshtastic_handler.connection_state()][1],
+                '{{admin_sessions}}': str(len(self.admin_sessions))
+            }))
     
     def admin_config_edit(self):
         """Page d'édition de la configuration"""
         if not self.check_admin_session():
             return redirect('/admin')
         
+        config_content, config_mtime = self.read_config_content()
+        
+        success_message = request.query.get('success', '')
+        error_message = request.query.get('error', '')
+        
+        # Décoder les messages pour corriger l'encodage
+        if success_message:
+            import urllib.parse
+            try:
+                success_message = urllib.parse.unquote(success_message)
+            except:
+                pass
+        
+        if error_message:
+            import urllib.parse
+            try:
+                error_message = urllib.parse.unquote(error_message)
+            except:
+                pass
+        
+        return self.send_page(self.admin_pages['config'].render({'{{config_file}}': self.config_file}, {
+            '{{success_block}}': f'<div class="success">✅ {success_message}</div>' if success_message else '',
+            '{{error_block}}': f'<div class="error">❌ {error_message}</div>' if error_message else '',
+            '{{config_content}}': config_content,
+            '{{config_mtime}}': config_mtime
+        }))
+    
+    def read_config_content(self):
+        """Contenu du fichier de configuration pour l'éditeur, relu seulement s'il a changé sur disque.
+        
+        Retourne (contenu échappé pour le HTML, date de modification affichable).
+        """
+        try:
+            stat = os.stat(self.config_file)
+        except OSError:
+            return html.escape(f"# Fichier {self.config_file} introuvable"), 'N/A'
+        
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self.config_content_cache
+        if cached and cached[0] == signature:
+            return cached[1], cached[2]
+        
         try:
             # Lire le fichier avec gestion d'encodage robuste
             with open(self.config_file, 'r', encoding='utf-8') as f:
@@ -1090,198 +4788,13 @@ class EmergencyApp:
             logger.error(f"Erreur générale de lecture: {e}")
             config_content = f"# Erreur lors du chargement: {e}"
         
-        success_message = request.query.get('success', '')
-        error_message = request.query.get('error', '')
-        
-        # Décoder les messages pour corriger l'encodage
-        if success_message:
-            import urllib.parse
-            try:
-                success_message = urllib.parse.unquote(success_message)
-            except:
-                pass
-        
-        if error_message:
-            import urllib.parse
-            try:
-                error_message = urllib.parse.unquote(error_message)
-            except:
-                pass
-        
-        return f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Édition Configuration - GARDIA-M</title>
-            <meta charset="utf-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1">
-            <style>
-                body {{
-                    font-family: Arial, sans-serif;
-                    margin: 0;
-                    padding: 20px;
-                    background-color: #f5f5f5;
-                }}
-                .container {{
-                    max-width: 1000px;
-                    margin: 0 auto;
-                    background: white;
-                    padding: 30px;
-                    border-radius: 10px;
-                    box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-                }}
-                .header {{
-                    display: flex;
-                    justify-content: space-between;
-                    align-items: center;
-                    margin-bottom: 30px;
-                    padding-bottom: 20px;
-                    border-bottom: 2px solid #eee;
-                }}
-                h1 {{
-                    color: #333;
-                    margin: 0;
-                }}
-                .back-btn {{
-                    background-color: #666;
-                    color: white;
-                    padding: 8px 16px;
-                    text-decoration: none;
-                    border-radius: 5px;
-                    font-size: 14px;
-                }}
-                .back-btn:hover {{
-                    background-color: #555;
-                }}
-                textarea {{
-                    width: 100%;
-                    height: 500px;
-                    font-family: 'Courier New', monospace;
-                    font-size: 14px;
-                    padding: 15px;
-                    border: 2px solid #ddd;
-                    border-radius: 5px;
-                    box-sizing: border-box;
-                    resize: vertical;
-                }}
-                textarea:focus {{
-                    border-color: #4CAF50;
-                    outline: none;
-                }}
-                .form-actions {{
-                    margin-top: 20px;
-                    display: flex;
-                    gap: 10px;
-                }}
-                .btn {{
-                    padding: 12px 24px;
-                    border: none;
-                    border-radius: 5px;
-                    font-size: 16px;
-                    cursor: pointer;
-                    text-decoration: none;
-                    display: inline-block;
-                }}
-                .btn-primary {{
-                    background-color: #4CAF50;
-                    color: white;
-                }}
-                .btn-primary:hover {{
-                    background-color: #45a049;
-                }}
-                .btn-secondary {{
-                    background-color: #2196F3;
-                    color: white;
-                }}
-                .btn-secondary:hover {{
-                    background-color: #1976D2;
-                }}
-                .success {{
-                    background-color: #e8f5e8;
-                    color: #2e7d32;
-                    padding: 10px;
-                    border-radius: 5px;
-                    margin-bottom: 20px;
-                    border-left: 4px solid #4CAF50;
-                }}
-                .error {{
-                    background-color: #ffebee;
-                    color: #c62828;
-                    padding: 10px;
-                    border-radius: 5px;
-                    margin-bottom: 20px;
-                    border-left: 4px solid #f44336;
-                }}
-                .warning {{
-                    background-color: #fff3e0;
-                    color: #ef6c00;
-                    padding: 15px;
-                    border-radius: 5px;
-                    margin-bottom: 20px;
-                    border-left: 4px solid #ff9800;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>⚙️ Édition de la configuration</h1>
-                    <a href="/admin/dashboard" class="back-btn">← Retour</a>
-                </div>
-                
-                {f'<div class="success">✅ {success_message}</div>' if success_message else ''}
-                {f'<div class="error">❌ {error_message}</div>' if error_message else ''}
-                
-                <div class="warning">
-                    <strong>⚠️ Attention:</strong> Modifiez cette configuration avec précaution. 
-                    Une erreur de syntaxe peut empêcher le serveur de fonctionner. 
-                    Sauvegardez toujours avant de modifier.
-                    <br><br>
-                    <strong>💡 Conseils:</strong>
-                    <ul>
-                        <li>Utilisez uniquement des guillemets droits (" et ') et non typographiques (" " ' ')</li>
-                        <li>Les caractères accentués (é, à, ç, etc.) sont autorisés et préservés</li>
-                        <li>Respectez l'indentation YAML (espaces, pas de tabulations)</li>
-                        <li>Les mots de passe peuvent contenir: lettres, chiffres, accents, !@#$%^&*()-_=+</li>
-                        <li>Évitez de copier-coller depuis Word (caractères invisibles)</li>
-                    </ul>
-                </div>
-                
-                <form method="post" action="/admin/config" accept-charset="UTF-8" enctype="application/x-www-form-urlencoded">
-                    <textarea name="config_content" required>{config_content}</textarea>
-                    
-                    <div class="form-actions">
-                        <button type="submit" class="btn btn-primary">💾 Sauvegarder</button>
-                        <button type="button" class="btn btn-secondary" onclick="location.reload()">🔄 Recharger</button>
-                        <a href="/admin/dashboard" class="btn" style="background-color: #666; color: white;">❌ Annuler</a>
-                    </div>
-                </form>
-                
-                <div style="margin-top: 30px; font-size: 12px; color: #666;">
-                    <strong>Fichier:</strong> {self.config_file}<br>
-                    <strong>Dernière modification:</strong> {time.strftime('%d/%m/%Y %H:%M:%S', time.localtime(os.path.getmtime(self.config_file))) if os.path.exists(self.config_file) else 'N/A'}
-                </div>
-            </div>
-            
-            <script>
-                // Avertissement avant de quitter si des modifications non sauvegardées
-                let originalContent = document.querySelector('textarea').value;
-                
-                window.addEventListener('beforeunload', function(e) {{
-                    if (document.querySelector('textarea').value !== originalContent) {{
-                        e.preventDefault();
-                        e.returnValue = '';
-                    }}
-                }});
-                
-                // Marquer comme sauvegardé lors de la soumission
-                document.querySelector('form').addEventListener('submit', function() {{
-                    originalContent = document.querySelector('textarea').value;
-                }});
-            </script>
-        </body>
-        </html>
-        """
+        # Échappé pour le <textarea>: le navigateur restitue le texte d'origine à l'envoi du formulaire
+        config_content = html.escape(config_content)
+        config_mtime = time.strftime('%d/%m/%Y %H:%M:%S', time.localtime(stat.st_mtime))
+        if not config_content.startswith("# Erreur lors du chargement"):
+            # Une correction d'encodage réécrit le fichier: la signature change et le cache se recharge
+            self.config_content_cache = (signature, config_content, config_mtime)
+        return config_content, config_mtime
     
     def admin_config_save(self):
         """Sauvegarde de la configuration avec correction d'encodage radicale"""
@@ -1309,7 +4822,6 @@ class EmergencyApp:
                 post_string = str(raw_post_data)
             
             # Extraire le contenu du formulaire (après config_content=)
-            import urllib.parse
             parsed_data = urllib.parse.parse_qs(post_string)
             
             if 'config_content' not in parsed_data:
@@ -1352,7 +4864,6 @@ class EmergencyApp:
         if '%C3%A0' in content:
             logger.info("Pattern détecté: Encodage URL")
             corruption_detected = True
-            import urllib.parse
             content = urllib.parse.unquote(content)
         
         # Pattern 3: Corrections directes textuelles
@@ -1399,10 +4910,15 @@ class EmergencyApp:
             logger.error(f"Erreur YAML: {yaml_err}")
             return redirect(f'/admin/config?error=YAML invalide')
         
+        # Types des paramètres: une configuration refusée au chargement ne doit pas être enregistrée
+        errors = validate_config(parsed) if isinstance(parsed, dict) else ["section racine attendue"]
+        if errors:
+            logger.error(f"Configuration invalide: {'; '.join(errors)}")
+            return redirect(f"/admin/config?error={urllib.parse.quote('Configuration invalide: ' + errors[0])}")
+        
         # Étape 4: Sauvegarde forcée en UTF-8
         try:
             # Créer une sauvegarde avant modification
-            import shutil
             backup_file = f"{self.config_file}.bak"
             if os.path.exists(self.config_file):
                 shutil.copy2(self.config_file, backup_file)
@@ -1445,6 +4961,16 @@ class EmergencyApp:
             
             logger.info("=== SAUVEGARDE TERMINEE AVEC SUCCES ===")
             
+            # Application immédiate, sans redémarrage ni coupure des radios
+            changed = self.reload_config('administration')
+            pending = restart_required(changed or ())
+            if changed is None:
+                success_msg += " - non appliquee, voir les logs"
+            elif pending:
+                success_msg += f" - appliquee sauf {', '.join(pending)} (au prochain redemarrage)"
+            elif changed:
+                success_msg += " - appliquee sans redemarrage"
+            
         except Exception as verify_err:
             logger.error(f"Erreur vérification: {verify_err}")
             # Même si la vérification échoue, le fichier est sauvé donc on considère que c'est OK
@@ -1453,16 +4979,39 @@ class EmergencyApp:
         
         # Toujours retourner un succès puisque le log dit "TERMINEE AVEC SUCCES"
         # Encoder le message pour éviter les problèmes d'affichage
-        import urllib.parse
         encoded_msg = urllib.parse.quote(success_msg)
         return redirect(f'/admin/config?success={encoded_msg}')
     
+    def admin_logs(self):
+        """Journal sur disque en flux (segments compressés compris), filtrable par ?alert=<id>"""
+        if not self.check_admin_session():
+            return redirect('/admin')
+        
+        stores = log_pipeline.stores if log_pipeline else {}
+        store = stores.get('json_file') or stores.get('file')
+        if store is None:
+            response.status = 404
+            return "Aucun journal sur disque (logging.file ou logging.json_file)"
+        
+        alert_id = request.query.get('alert', '').strip()
+        lines = store.read()
+        if alert_id:
+            if store is stores.get('json_file'):
+                needle = f'"alert_id":{COMPACT_JSON.encode(alert_id)}'
+            else:
+                needle = alert_id
+            lines = (line for line in lines if needle in line)
+        
+        response.content_type = ('application/x-ndjson; charset=utf-8' if store is stores.get('json_file')
+                                 else 'text/plain; charset=utf-8')
+        response.set_header('Cache-Control', 'no-store')
+        return lines
+    
     def admin_logout(self):
         """Déconnexion administrateur"""
-        session_id = request.get_cookie('admin_session')
-        if session_id and session_id in self.admin_sessions:
-            del self.admin_sessions[session_id]
-            logger.info(f"Déconnexion admin pour session {session_id}")
+        session = self.admin_sessions.remove(request.get_cookie('admin_session'))
+        if session:
+            logger.info(f"Déconnexion admin de {session['username']}")
         
         response.delete_cookie('admin_session')
         return redirect('/admin?success=Déconnexion réussie')
@@ -1478,7 +5027,7 @@ class EmergencyApp:
         print(f"📌 Version: {self.config.get('app.version', VERSION)} ({self.config.get('app.build_date', BUILD_DATE)})")
         print("=" * 60)
         print(f"🌐 Serveur web: http://{host}:{port}")
-        print(f"📡 Meshtastic: {self.config.get('meshtastic.device')}")
+        print(f"📡 Meshtastic: {', '.join(device.path for device in self.meshtastic_handler.pool.devices) or 'aucune radio'}")
         print(f"📱 Canal: {self.config.get('meshtastic.channel_index')} ({self.config.get('meshtastic.channel_name')})")
         print(f"📄 Template: {self.config.get('web.template_dir')}/index.html")
         if self.config.get('admin.enabled', True):
@@ -1486,15 +5035,56 @@ class EmergencyApp:
         print("=" * 60)
         
         try:
-            run(self.app, host=host, port=port, debug=debug, quiet=not debug)
+            self.serve(host, port, debug)
         except KeyboardInterrupt:
             print("\n🛑 Arrêt du serveur...")
             self.meshtastic_handler.close()
+            self.admin_sessions.stop()
             print("✅ Serveur arrêté proprement")
         except Exception as e:
             logger.error(f"Erreur fatale: {e}")
             self.meshtastic_handler.close()
 
+    def make_server_adapter(self, name, host, port):
+        """Construit l'adaptateur de serveur web demandé (web.server)"""
+        workers = self.config.get('web.workers', 8)
+        backlog = self.config.get('web.backlog', 64)
+        timeout = self.config.get('web.request_timeout', 30)
+        
+        if name == 'threaded':
+            return PooledServer(host=host, port=port, workers=workers,
+                                max_pending=self.config.get('web.max_pending', 32), backlog=backlog,
+                                request_timeout=timeout,
+                                keepalive_timeout=self.config.get('web.keepalive_timeout', 5),
+                                keepalive_requests=self.config.get('web.keepalive_requests', 100))
+        
+        # Adaptateurs Bottle: traduction des réglages communs vers leurs options propres
+        options = {
+            'waitress': {'threads': workers, 'backlog': backlog, 'channel_timeout': timeout},
+            'cheroot': {'numthreads': workers, 'request_queue_size': backlog, 'timeout': timeout},
+            'gevent': {'spawn': workers, 'backlog': backlog}
+        }.get(name, {})
+        options.update(self.config.get('web.server_options', {}) or {})
+        return name, options
+    
+    def serve(self, host, port, debug, name=None):
+        """Lance le serveur web configuré; repli sur le serveur intégré si l'adaptateur est indisponible"""
+        adapter = self.make_server_adapter(name or self.config.get('web.server', 'threaded'), host, port)
+        if isinstance(adapter, ServerAdapter):
+            self.web_server = adapter
+            logger.info(f"Serveur web intégré: {adapter.options['workers']} threads, "
+                        f"file d'attente {adapter.options['max_pending']}, backlog {adapter.options['backlog']}")
+            run(self.wsgi, server=adapter, debug=debug, quiet=not debug)
+            return
+        
+        name, options = adapter
+        logger.info(f"Serveur web: adaptateur Bottle '{name}'")
+        try:
+            run(self.wsgi, server=name, host=host, port=port, debug=debug, quiet=not debug, **options)
+        except ImportError as e:
+            logger.error(f"Serveur '{name}' indisponible ({e}), repli sur le serveur intégré")
+            self.serve(host, port, debug, 'threaded')
+
 def main():
     """Fonction principale"""
     config_file = 'config.yaml'
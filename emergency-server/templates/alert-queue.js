@@ -0,0 +1,85 @@
+// File d'alertes en attente d'envoi (IndexedDB), partagée entre la page du formulaire et le service worker.
+// Chaque alerte porte une clé d'idempotence: renvoyée plusieurs fois, elle n'est émise qu'une fois.
+var GardiaQueue = (function() {
+    var DB_NAME = 'gardia';
+    var STORE = 'outbox';
+    
+    function open() {
+        return new Promise(function(resolve, reject) {
+            var request = indexedDB.open(DB_NAME, 1);
+            request.onupgradeneeded = function() {
+                request.result.createObjectStore(STORE, {keyPath: 'key'});
+            };
+            request.onsuccess = function() { resolve(request.result); };
+            request.onerror = function() { reject(request.error); };
+        });
+    }
+    
+    function run(mode, action) {
+        return open().then(function(db) {
+            return new Promise(function(resolve, reject) {
+                var transaction = db.transaction(STORE, mode);
+                var request = action(transaction.objectStore(STORE));
+                transaction.oncomplete = function() { db.close(); resolve(request.result); };
+                transaction.onerror = function() { db.close(); reject(transaction.error); };
+            });
+        });
+    }
+    
+    function newKey() {
+        if (self.crypto && self.crypto.randomUUID) { return self.crypto.randomUUID(); }
+        return Date.now().toString(36) + '-' + Math.random().toString(36).slice(2) + Math.random().toString(36).slice(2);
+    }
+    
+    // Un envoi: résout {final, status, result}; rejette si le réseau est indisponible.
+    // final = réponse définitive (acceptée ou refusée); sinon (503, réponse illisible) l'alerte reste en file.
+    function submit(key, data) {
+        return fetch('/api/alerts', {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json', 'Idempotency-Key': key},
+            body: JSON.stringify(data)
+        }).then(function(response) {
+            return response.json().catch(function() { return null; }).then(function(result) {
+                var final = result !== null && response.status < 500 && response.status !== 429;
+                return {final: final, status: response.status, result: result};
+            });
+        });
+    }
+    
+    function all() {
+        return run('readonly', function(store) { return store.getAll(); });
+    }
+    
+    function remove(key) {
+        return run('readwrite', function(store) { return store.delete(key); });
+    }
+    
+    // Renvoie les alertes en attente dans leur ordre de saisie; résout le nombre d'alertes restantes.
+    // Rejette au premier échec réseau: les alertes suivantes restent en file pour le prochain essai.
+    function flush(onSent) {
+        return all().then(function(items) {
+            items.sort(function(a, b) { return a.ts - b.ts; });
+            return items.reduce(function(chain, item) {
+                return chain.then(function(remaining) {
+                    return submit(item.key, item.data).then(function(outcome) {
+                        if (!outcome.final) { return remaining + 1; }
+                        return remove(item.key).then(function() {
+                            if (onSent) { onSent(item, outcome.result); }
+                            return remaining;
+                        });
+                    });
+                });
+            }, Promise.resolve(0));
+        });
+    }
+    
+    return {
+        available: !!self.indexedDB,
+        newKey: newKey,
+        submit: submit,
+        put: function(item) { return run('readwrite', function(store) { return store.put(item); }); },
+        all: all,
+        remove: remove,
+        flush: flush
+    };
+})();
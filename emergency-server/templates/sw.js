@@ -0,0 +1,69 @@
+// Service worker GARDIA-M {{app_version}}
+// - Page du formulaire et logos servis depuis le cache (aucun accès réseau), actualisés en arrière-plan
+// - Alertes conservées sur le téléphone renvoyées au retour du réseau (Background Sync)
+importScripts('/alert-queue.js');
+
+var SHELL_CACHE = 'gardia-shell';
+var SYNC_TAG = 'gardia-alerts';
+
+self.addEventListener('install', function(event) {
+    event.waitUntil(caches.open(SHELL_CACHE).then(function(cache) {
+        return cache.addAll(['/', '/manifest.webmanifest']);
+    }).then(function() {
+        return self.skipWaiting();
+    }));
+});
+
+self.addEventListener('activate', function(event) {
+    event.waitUntil(self.clients.claim());
+});
+
+// Réponse du cache immédiate, mise à jour du cache par le réseau pour la visite suivante
+function staleWhileRevalidate(event, request) {
+    var network = fetch(request).then(function(response) {
+        if (response.ok) {
+            var copy = response.clone();
+            caches.open(SHELL_CACHE).then(function(cache) { cache.put(request, copy); });
+        }
+        return response;
+    });
+    event.waitUntil(network.catch(function() {}));
+    event.respondWith(caches.match(request).then(function(cached) { return cached || network; }));
+}
+
+self.addEventListener('fetch', function(event) {
+    var request = event.request;
+    var url = new URL(request.url);
+    if (request.method !== 'GET' || url.origin !== self.location.origin) { return; }
+    
+    if ((url.pathname === '/' && !url.search) || url.pathname.indexOf('/static/') === 0 ||
+            url.pathname === '/manifest.webmanifest') {
+        staleWhileRevalidate(event, request);
+    } else if (request.mode === 'navigate' && url.pathname === '/') {
+        // Page avec message (après envoi classique): réseau d'abord, formulaire en cache à défaut
+        event.respondWith(fetch(request).catch(function() { return caches.match('/'); }));
+    }
+});
+
+function notifyClients(item, result) {
+    self.clients.matchAll().then(function(clients) {
+        clients.forEach(function(client) {
+            client.postMessage({type: 'alert-sent', key: item.key, result: result});
+        });
+    });
+}
+
+// Rejet = nouvel essai programmé par le navigateur
+function flushQueue() {
+    return GardiaQueue.flush(notifyClients).then(function(remaining) {
+        if (remaining) { throw new Error(remaining + ' alerte(s) toujours en attente'); }
+    });
+}
+
+self.addEventListener('sync', function(event) {
+    if (event.tag === SYNC_TAG) { event.waitUntil(flushQueue()); }
+});
+
+self.addEventListener('message', function(event) {
+    if (event.data === 'flush') { event.waitUntil(flushQueue().catch(function() {})); }
+});